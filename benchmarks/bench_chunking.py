@@ -0,0 +1,62 @@
+# 청크 분할 프로세스 수별 확장성 벤치마크
+# bench_chunking.py
+#
+# 실행: python -m benchmarks.bench_chunking --scale 200 --workers 1 2 4 8
+# data/*.txt를 복제한 합성 말뭉치를 프로세스 수별로 분할하고, 청크 ID가 단일 프로세스 결과와 같은지 확인한다.
+
+import os
+import json
+import time
+import argparse
+import tempfile
+from modules.mmu_file_handler import DocumentProcessor
+from modules.mmu_metadata_index import MetadataIndex
+from benchmarks.bench_pipeline import make_corpus
+
+def run(data_dir, workers):
+    """한 번 분할하여 (소요 시간, 청크 ID 목록, 메타데이터 색인) 반환"""
+    metadata_index = MetadataIndex()
+    started = time.perf_counter()
+    chunk_ids = [chunk.metadata['chunk_id'] for chunk in DocumentProcessor.iter_chunks(metadata_index, data_dir, workers)]
+    return time.perf_counter() - started, chunk_ids, metadata_index
+
+def main():
+    parser = argparse.ArgumentParser(description="프로세스 수별 청크 분할 처리량과 결정성 확인")
+    parser.add_argument('--scale', type=int, default=200, help="data/*.txt 복제 배율 (파일 수 = 배율 x 원본 파일 수)")
+    parser.add_argument('--workers', type=int, nargs='+', default=[1, 2, 4, 8], help="비교할 프로세스 수")
+    parser.add_argument('--repeat', type=int, default=3, help="프로세스 수별 반복 횟수 (최솟값 사용)")
+    parser.add_argument('--json', help="결과를 저장할 JSON 파일 경로")
+    args = parser.parse_args()
+
+    results = []
+    with tempfile.TemporaryDirectory() as data_dir:
+        make_corpus(data_dir, args.scale)
+        file_count = len(os.listdir(data_dir))
+        _, serial_ids, serial_index = run(data_dir, 1)  # 기준 결과 (단일 프로세스)
+        serial_metadata = json.dumps(serial_index.chunks, sort_keys=True)
+
+        for workers in args.workers:
+            seconds, chunk_ids, metadata_index = min((run(data_dir, workers) for _ in range(args.repeat)), key=lambda item: item[0])
+            results.append({
+                'workers': workers,
+                'files': file_count,
+                'chunks': len(chunk_ids),
+                'seconds': seconds,
+                'chunks_per_sec': len(chunk_ids) / seconds if seconds else 0.0,
+                'identical': chunk_ids == serial_ids and json.dumps(metadata_index.chunks, sort_keys=True) == serial_metadata
+            })
+
+    baseline = results[0]['seconds']
+    print(f"CPU 코어 수: {os.cpu_count()}")
+    print(f"{'workers':>8}{'files':>8}{'chunks':>9}{'seconds':>10}{'chunks/s':>11}{'speedup':>9}{'identical':>11}")
+    for result in results:
+        print(
+            f"{result['workers']:>8}{result['files']:>8}{result['chunks']:>9}{result['seconds']:>10.2f}"
+            f"{result['chunks_per_sec']:>11.0f}{baseline / result['seconds']:>9.2f}{str(result['identical']):>11}"
+        )
+    if args.json:
+        with open(args.json, 'w', encoding='utf-8') as file:
+            json.dump({'args': vars(args), 'cpu_count': os.cpu_count(), 'results': results}, file, indent=2)
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,132 @@
+# 임베딩 백엔드 비교 벤치마크
+# bench_embeddings.py
+#
+# 실행: python -m benchmarks.bench_embeddings             (로컬 임베딩과 무작위 기준선, 네트워크 불필요)
+#       python -m benchmarks.bench_embeddings --remote    (GOOGLE_API_KEY로 원격 모델도 함께 측정)
+# data/ 말뭉치의 청크를 백엔드별로 임베딩하여 문서 임베딩 처리량, 질문 임베딩 지연 시간,
+# 정답 문구가 들어 있는 청크를 상위 k개 안에 찾는 비율(hit@k, MRR)을 비교한다.
+# 원격 모델을 함께 측정하면 원격 모델의 상위 k개 결과와 겹치는 비율도 보고한다.
+
+import json
+import time
+import argparse
+import numpy as np
+from modules.mmu_config import DATA_DIR, TOP_K, EMBEDDING_BATCH_SIZE, EMBEDDING_MODEL, GOOGLE_API_KEY
+from modules.mmu_fakes import FakeEmbeddings
+from modules.mmu_file_handler import DocumentProcessor
+from modules.mmu_metadata_index import MetadataIndex
+from modules.mmu_embedding_backend import HashedTfidfEmbeddings
+from benchmarks.bench_pipeline import summarize
+
+# (질문, 정답 청크에 들어 있는 문구) - 질문에는 정답 문구를 그대로 쓰지 않음
+EVAL_SET = [
+    ("수강 과목을 바꾸고 싶은데 언제까지 가능한가요?", "수강신청 변경"),
+    ("신청한 과목을 철회할 수 있나요?", "수강신청 취소"),
+    ("한 학기에 들을 수 있는 최대 학점은?", "최대 취득학점"),
+    ("시험을 못 봤을 때 다시 볼 수 있나요?", "추가시험"),
+    ("시험 중에 컨닝하면 어떻게 되나요?", "부정행위"),
+    ("학기말시험을 볼 수 있는 자격", "응시"),
+    ("성적이 나쁘면 경고를 받나요?", "학사경고"),
+    ("성적에 이의가 있으면 어떻게 정정하나요?", "성적정정"),
+    ("결석하면 출석 점수가 얼마나 깎이나요?", "출석성적"),
+    ("하루 수업은 몇 교시로 나뉘나요?", "교시"),
+    ("한 학기 수업은 몇 주 동안 하나요?", "15주"),
+    ("학년도 수업 일수는?", "수업일수"),
+    ("계절학기는 언제 열리나요?", "계절학기 기간"),
+    ("계절학기 과목이 없어지면 어떻게 되나요?", "폐강"),
+    ("계절학기 등록금은 얼마인가요?", "수업료"),
+    ("같은 과목을 다시 들으면 성적은?", "재수강")
+]
+
+def load_chunks(data_dir=DATA_DIR):
+    """data/ 말뭉치를 앱과 같은 방식으로 청크 분할 (청크 ID 기준 중복 제거)"""
+    documents_by_id = {}
+    for doc in DocumentProcessor.iter_chunks(MetadataIndex(), data_dir):
+        documents_by_id.setdefault(doc.metadata['chunk_id'], doc)
+    return list(documents_by_id.values())
+
+def make_backends(texts, remote):
+    """(이름, 임베딩) 목록과 로컬 IDF 학습 시간"""
+    started = time.perf_counter()
+    local = HashedTfidfEmbeddings(idf_path=None).fit(texts)  # 저장된 IDF를 건드리지 않음
+    fit_seconds = time.perf_counter() - started
+    backends = [('local', local), ('random', FakeEmbeddings())]
+    if remote:
+        from langchain_google_genai import GoogleGenerativeAIEmbeddings
+
+        # 원격 호출 지연을 그대로 재기 위해 디스크 캐시 없이 사용
+        backends.insert(0, ('google', GoogleGenerativeAIEmbeddings(model=EMBEDDING_MODEL, google_api_key=GOOGLE_API_KEY)))
+    return backends, fit_seconds
+
+def bench_backend(embeddings, texts, args):
+    import faiss
+
+    results = {}
+    started = time.perf_counter()
+    vectors = []
+    for start in range(0, len(texts), EMBEDDING_BATCH_SIZE):
+        vectors.extend(embeddings.embed_documents(texts[start:start + EMBEDDING_BATCH_SIZE]))
+    seconds = time.perf_counter() - started
+    results['documents_per_sec'] = len(texts) / seconds if seconds else 0.0
+    vectors = np.asarray(vectors, dtype=np.float32)
+    index = faiss.IndexFlatL2(vectors.shape[1])
+    index.add(vectors)
+    results['dimension'] = int(vectors.shape[1])
+
+    latencies, rankings = [], []
+    for repeat in range(args.repeat):
+        for question, _ in EVAL_SET:
+            started = time.perf_counter()
+            embedding = embeddings.embed_query(question)
+            latencies.append(time.perf_counter() - started)
+            if repeat == 0:
+                _, rows = index.search(np.asarray([embedding], dtype=np.float32), args.k)
+                rankings.append([int(row) for row in rows[0] if row >= 0])
+    results['query_latency'] = summarize(latencies)
+
+    hits, reciprocal_ranks = [], []
+    for (_, phrase), rows in zip(EVAL_SET, rankings):
+        rank = next((position for position, row in enumerate(rows, start=1) if phrase in texts[row]), None)
+        hits.append(rank is not None)
+        reciprocal_ranks.append(1.0 / rank if rank else 0.0)
+    results['hit_at_k'] = float(np.mean(hits))
+    results['mrr'] = float(np.mean(reciprocal_ranks))
+    return results, rankings
+
+def main():
+    parser = argparse.ArgumentParser(description="원격/로컬 임베딩 백엔드의 지연 시간과 검색 품질 비교")
+    parser.add_argument('--remote', action='store_true', help="원격 모델(GOOGLE_API_KEY 필요)도 측정")
+    parser.add_argument('--k', type=int, default=TOP_K, help="검색할 문서 수")
+    parser.add_argument('--repeat', type=int, default=5, help="질문 임베딩 지연 측정 반복 횟수")
+    parser.add_argument('--json', help="결과를 저장할 JSON 파일 경로")
+    args = parser.parse_args()
+
+    texts = [doc.page_content for doc in load_chunks()]
+    backends, fit_seconds = make_backends(texts, args.remote)
+    all_results, reference = {}, None
+    for name, embeddings in backends:
+        all_results[name], rankings = bench_backend(embeddings, texts, args)
+        if name == 'google':
+            reference = rankings
+        elif reference is not None:
+            # 원격 모델의 상위 k개 중 같은 청크를 찾은 비율
+            overlaps = [len(set(rows) & set(expected)) / max(len(expected), 1) for rows, expected in zip(rankings, reference)]
+            all_results[name]['overlap_with_remote'] = float(np.mean(overlaps))
+    all_results['local']['fit_seconds'] = fit_seconds
+
+    print(f"청크 {len(texts)}개, 평가 질문 {len(EVAL_SET)}개, k={args.k}")
+    print(f"{'backend':>8}{'dim':>6}{'docs/s':>10}{'query p50':>12}{'query p95':>12}{'hit@k':>8}{'MRR':>7}{'overlap':>9}")
+    for name, result in all_results.items():
+        overlap = result.get('overlap_with_remote')
+        print(
+            f"{name:>8}{result['dimension']:>6}{result['documents_per_sec']:>10.1f}"
+            f"{result['query_latency']['p50_ms']:>10.2f}ms{result['query_latency']['p95_ms']:>10.2f}ms"
+            f"{result['hit_at_k']:>8.2f}{result['mrr']:>7.2f}{'-' if overlap is None else f'{overlap:.2f}':>9}"
+        )
+    print(f"로컬 IDF 학습 {fit_seconds * 1000:.1f}ms")
+    if args.json:
+        with open(args.json, 'w', encoding='utf-8') as file:
+            json.dump({'args': vars(args), 'results': all_results}, file, indent=2)
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,132 @@
+# 데이터 변경 중 인덱스 무중단 교체 벤치마크 (오프라인)
+# bench_hot_swap.py
+#
+# 실행: python -m benchmarks.bench_hot_swap --scale 100 --readers 4 --seconds 2
+# 카테고리마다 섹션을 scale배로 늘린 말뭉치로 공유 저장소를 만든 뒤, 여러 읽기 스레드가 질문 검색을 반복하는 동안
+# 파일 하나를 고쳐 감시자가 새 버전을 만들고 교체하게 한다. 교체 전/재구성 중/교체 후 구간의 검색 지연 시간,
+# 다시 분할한 파일 수, 재구성 시간, 검색 실패 수, 이전 버전이 해제되었는지를 보고한다.
+
+import os
+import gc
+import json
+import time
+import argparse
+import tempfile
+import threading
+from modules.mmu_config import DATA_DIR, HYBRID_CANDIDATES
+from modules.mmu_fakes import FakeEmbeddings
+from modules.mmu_data_watcher import DataWatcher
+from modules.mmu_vector_store import SharedVectorStore
+from benchmarks.bench_pipeline import QUESTIONS, summarize
+from benchmarks.bench_shards import make_category_corpus
+
+def reader(handle, embeddings, stop, samples, errors):
+    """질문마다 현재 버전을 고정하여 라우팅과 검색을 수행하고 (완료 시각, 지연 시간, 버전) 기록"""
+    i = 0
+    while not stop.is_set():
+        question = QUESTIONS[i % len(QUESTIONS)]
+        embedding = embeddings.embed_query(question)
+        started = time.perf_counter()
+        try:
+            view = handle.pin()
+            view.similarity_search_by_vector(embedding, k=HYBRID_CANDIDATES, categories=view.route(question, embedding))
+            samples.append((time.perf_counter(), time.perf_counter() - started, view.index_version))
+        except Exception as e:
+            errors.append(str(e))
+        i += 1
+
+def run(args):
+    data_dir = os.path.join(os.getcwd(), "data")
+    make_category_corpus(data_dir, args.scale, args.source_dir)
+    embeddings = FakeEmbeddings(dimension=args.dimension)
+    started = time.perf_counter()
+    DataWatcher(data_dir=data_dir, embeddings=embeddings).load()
+    results = {'initial_build_seconds': time.perf_counter() - started}
+
+    # 재시작한 프로세스처럼 디스크의 인덱스를 메모리 매핑으로 불러온 저장소에서 시작
+    watcher = DataWatcher(data_dir=data_dir, embeddings=embeddings, settle=0.0)
+    started = time.perf_counter()
+    handle = SharedVectorStore.acquire(watcher.load)
+    results['load_seconds'] = time.perf_counter() - started
+    results['chunks'] = len(handle.lexical_index.chunk_ids)
+    old_version = handle.index_version
+
+    stop, samples, errors = threading.Event(), [], []
+    threads = [
+        threading.Thread(target=reader, args=(handle, embeddings, stop, samples, errors), daemon=True)
+        for _ in range(args.readers)
+    ]
+    for thread in threads:
+        thread.start()
+    time.sleep(args.seconds)
+
+    # 파일 하나에 섹션을 추가하고 감시자 한 번 실행 (감시 스레드와 같이 요청 경로 밖에서 재구성 후 교체)
+    changed = sorted(name for name in os.listdir(data_dir) if name.endswith('.txt'))[0]
+    with open(os.path.join(data_dir, changed), 'a', encoding='utf-8') as file:
+        file.write("\n\n추가 섹션\n벤치마크용으로 추가한 내용입니다.")
+    rechunked = watcher.stats['rechunked_files']
+    rebuild_started = time.perf_counter()
+    new_version = watcher.poll()
+    rebuild_finished = time.perf_counter()
+    results['rebuild_seconds'] = rebuild_finished - rebuild_started
+    results['rechunked_files'] = watcher.stats['rechunked_files'] - rechunked
+    results['versions_alive_after_swap'] = SharedVectorStore.live_versions()
+    time.sleep(args.seconds)
+    stop.set()
+    for thread in threads:
+        thread.join()
+    gc.collect()
+    results['versions_alive_after_readers'] = SharedVectorStore.live_versions()
+
+    phases = {
+        'before': [latency for finished, latency, _ in samples if finished < rebuild_started],
+        'during': [latency for finished, latency, _ in samples if rebuild_started <= finished < rebuild_finished],
+        'after': [latency for finished, latency, _ in samples if finished >= rebuild_finished]
+    }
+    for phase, latencies in phases.items():
+        results[phase] = summarize(latencies) if latencies else {'count': 0}
+        results[phase]['max_ms'] = max(latencies) * 1000 if latencies else 0.0
+    results['swapped'] = new_version is not None and new_version != old_version
+    results['versions_seen'] = len({version for _, _, version in samples})
+    results['errors'] = len(errors)
+    handle.release()
+    return results
+
+def main():
+    parser = argparse.ArgumentParser(description="데이터 변경 시 인덱스 재구성/교체 중 검색 지연 시간 측정")
+    parser.add_argument('--scale', type=int, default=100, help="카테고리별 섹션 복제 배율")
+    parser.add_argument('--readers', type=int, default=4, help="검색을 반복하는 스레드 수")
+    parser.add_argument('--seconds', type=float, default=2.0, help="교체 전후 측정 시간(초)")
+    parser.add_argument('--dimension', type=int, default=768, help="가짜 임베딩 차원")
+    parser.add_argument('--json', help="결과를 저장할 JSON 파일 경로")
+    args = parser.parse_args()
+    args.source_dir = os.path.abspath(DATA_DIR)
+
+    with tempfile.TemporaryDirectory() as workdir:
+        cwd = os.getcwd()
+        os.chdir(workdir)  # 실제 faiss_index를 건드리지 않도록 임시 디렉토리에서 실행
+        try:
+            results = run(args)
+        finally:
+            os.chdir(cwd)
+
+    print(f"청크 {results['chunks']}개, 최초 구성 {results['initial_build_seconds']:.2f}s, 불러오기 {results['load_seconds']:.2f}s, "
+          f"재구성 {results['rebuild_seconds']:.2f}s (다시 분할한 파일 {results['rechunked_files']}개)")
+    print(f"{'phase':>8}{'queries':>9}{'p50':>10}{'p95':>10}{'p99':>10}{'max':>10}")
+    for phase in ('before', 'during', 'after'):
+        result = results[phase]
+        if not result['count']:
+            print(f"{phase:>8}{0:>9}")
+            continue
+        print(
+            f"{phase:>8}{result['count']:>9}{result['p50_ms']:>8.2f}ms{result['p95_ms']:>8.2f}ms"
+            f"{result['p99_ms']:>8.2f}ms{result['max_ms']:>8.2f}ms"
+        )
+    print(f"교체 {'성공' if results['swapped'] else '실패'}, 읽기 중 본 버전 {results['versions_seen']}개, 검색 오류 {results['errors']}건, "
+          f"남은 버전 {results['versions_alive_after_swap']}개(교체 직후) -> {results['versions_alive_after_readers']}개(읽기 종료 후)")
+    if args.json:
+        with open(args.json, 'w', encoding='utf-8') as file:
+            json.dump({'args': vars(args), 'results': results}, file, indent=2)
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,83 @@
+# FAISS 인덱스 종류별 재현율/지연 시간 벤치마크
+# bench_index_types.py
+#
+# 실행: python -m benchmarks.bench_index_types --size 100000 --queries 500
+
+import argparse
+import json
+import time
+import numpy as np
+from modules.mmu_config import TOP_K
+from modules.mmu_vector_store import VectorStoreManager
+
+INDEX_TYPES = ['flat', 'ivf_flat', 'ivf_pq', 'hnsw']
+
+def make_corpus(size, queries, dimension, clusters, seed=0):
+    """실제 임베딩처럼 군집을 이루는 합성 벡터와 질의 생성"""
+    rng = np.random.default_rng(seed)
+    centers = rng.normal(size=(clusters, dimension)).astype(np.float32)
+    def sample(count):
+        labels = rng.integers(0, clusters, size=count)
+        vectors = centers[labels] + 0.35 * rng.normal(size=(count, dimension)).astype(np.float32)
+        return vectors / np.linalg.norm(vectors, axis=1, keepdims=True)
+    return sample(size), sample(queries)
+
+def run(index_type, corpus, queries, ground_truth, k):
+    """인덱스 하나를 구성하고 재현율, 지연 시간, 크기 측정"""
+    import faiss
+
+    started = time.perf_counter()
+    index = VectorStoreManager.build_faiss_index(corpus, index_type)
+    index.add(corpus)
+    build_seconds = time.perf_counter() - started
+
+    latencies = []
+    found = np.empty((len(queries), k), dtype=np.int64)
+    for i, query in enumerate(queries):
+        started = time.perf_counter()
+        _, indices = index.search(query[None, :], k)
+        latencies.append(time.perf_counter() - started)
+        found[i] = indices[0]
+
+    recall = np.mean([len(set(f) & set(g)) / k for f, g in zip(found, ground_truth)])
+    latencies = np.asarray(latencies) * 1000
+    return {
+        'index_type': index_type,
+        'recall_at_k': float(recall),
+        'latency_ms_p50': float(np.percentile(latencies, 50)),
+        'latency_ms_p95': float(np.percentile(latencies, 95)),
+        'index_bytes': int(faiss.serialize_index(index).size),
+        'build_seconds': build_seconds
+    }
+
+def main():
+    parser = argparse.ArgumentParser(description="FAISS 인덱스 종류별 recall@k, 지연 시간, 크기 비교")
+    parser.add_argument('--size', type=int, default=100000, help="합성 청크 수")
+    parser.add_argument('--queries', type=int, default=500, help="질의 수")
+    parser.add_argument('--dimension', type=int, default=768, help="임베딩 차원 (embedding-001은 768)")
+    parser.add_argument('--clusters', type=int, default=200, help="합성 군집 수")
+    parser.add_argument('--k', type=int, default=TOP_K, help="재현율 계산에 사용할 상위 k")
+    parser.add_argument('--types', nargs='+', default=INDEX_TYPES, choices=INDEX_TYPES)
+    parser.add_argument('--json', help="결과를 저장할 JSON 파일 경로")
+    args = parser.parse_args()
+
+    import faiss
+
+    corpus, queries = make_corpus(args.size, args.queries, args.dimension, args.clusters)
+    exact = faiss.IndexFlatL2(args.dimension)
+    exact.add(corpus)
+    _, ground_truth = exact.search(queries, args.k)  # 정확 검색 결과를 기준으로 재현율 계산
+
+    results = [run(index_type, corpus, queries, ground_truth, args.k) for index_type in args.types]
+    print(f"{'type':<10}{'recall@' + str(args.k):>10}{'p50 ms':>10}{'p95 ms':>10}{'MB':>10}{'build s':>10}")
+    for result in results:
+        print(
+            f"{result['index_type']:<10}{result['recall_at_k']:>10.3f}{result['latency_ms_p50']:>10.3f}"
+            f"{result['latency_ms_p95']:>10.3f}{result['index_bytes'] / 1e6:>10.1f}{result['build_seconds']:>10.1f}"
+        )
+    if args.json:
+        with open(args.json, 'w', encoding='utf-8') as file:
+            json.dump({'args': vars(args), 'results': results}, file, indent=2)
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,430 @@
+# 동시 사용자 부하 테스트와 SLO 보고 (오프라인)
+# bench_load.py
+#
+# 실행: python -m benchmarks.bench_load --users 5 20 50 --duration 30 --llm-latency 0.5 --token-delay 0.01
+#       python -m benchmarks.bench_load --target apptest --users 5 10   (Streamlit AppTest로 앱 스크립트를 세션마다 실행, 실행은 순차)
+#       python -m benchmarks.bench_load --target http --users 50 200     (가짜 모델 API 서버를 띄워 /ask/stream 호출)
+#       python -m benchmarks.bench_load --target http --url http://localhost:8000   (이미 실행 중인 API 서버)
+# 가상 사용자마다 대화 상태를 따로 두고 생각 시간(지수 분포)을 쉬어 가며, data/ 카테고리의 번호 조항 제목으로 만든 질문을
+# 카테고리 청크 수에 비례해 고른 뒤 카테고리 안에서는 지프 분포 인기도로 골라 묻는다 (검색 -> 컨텍스트 구성 -> 생성 -> 포매팅 전체 경로).
+# 채팅 모델은 지연 시간과 실패 확률을 정할 수 있는 가짜 모델(CHAT_BACKEND=fake)을, 임베딩은 로컬 CPU 임베딩을 사용하며
+# 실제 인덱스를 건드리지 않도록 임시 작업 디렉토리에서 실행한다. 사용자 수마다 처리량, 지연 시간/첫 토큰 백분위수,
+# 오류율, 세션당 메모리를 SLO와 비교하고 SLO를 만족한 최대 동시 사용자 수를 보고한다 (어긴 단계가 있으면 종료 코드 1).
+#
+# 설정 모듈이 환경 변수를 읽기 전에 가짜 모델을 설정해야 하므로 프로젝트 모듈은 작업 디렉토리를 준비한 뒤 함수 안에서 import한다.
+
+import os
+import re
+import gc
+import sys
+import json
+import time
+import random
+import asyncio
+import argparse
+import functools
+import tempfile
+import threading
+import subprocess
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+CLAUSE_TITLE_PATTERN = re.compile(r'^[ \t]*\d+\.[ \t]*([^\n.]{2,20}?)[ \t]*$', re.M)  # "3. 성적의평가" 같은 번호 조항 제목
+SKIPPED_TOPICS = {'관련규정', '담당부서'}
+QUESTION_TEMPLATES = ["{topic} 알려주세요", "{category} {topic}은 어떻게 되나요?", "{topic}에 대해 궁금해요"]
+ERROR_MESSAGE = "죄송합니다. 응답을 생성하는 중 문제가 발생했습니다."
+
+class QuestionSampler:
+    """카테고리는 청크 수에 비례(또는 균등)하게, 카테고리 안에서는 지프 분포 인기도로 질문 선택"""
+
+    def __init__(self, questions, weights, zipf=1.1, seed=0):
+        self.categories = sorted(questions)
+        shuffle = random.Random(seed)
+        self.questions = {}
+        for category in self.categories:
+            pool = list(questions[category])
+            shuffle.shuffle(pool)  # 인기 순위는 시드로 고정
+            self.questions[category] = pool
+        self.category_weights = [weights[category] for category in self.categories]
+        self.question_weights = {
+            category: [1.0 / (rank ** zipf) for rank in range(1, len(pool) + 1)]
+            for category, pool in self.questions.items()
+        }
+
+    def sample(self, rng):
+        category = rng.choices(self.categories, self.category_weights)[0]
+        return category, rng.choices(self.questions[category], self.question_weights[category])[0]
+
+def build_question_mix(data_dir, mix='chunks'):
+    """data/ 카테고리별 질문 목록과 카테고리 선택 가중치 (질문은 번호 조항 제목으로 생성)"""
+    from modules.mmu_file_handler import DocumentProcessor
+
+    questions, weights = {}, {}
+    for category, source, open_text in DocumentProcessor.iter_text_sources(data_dir):
+        urls = []
+        chunks = [chunk for chunk, _ in DocumentProcessor.iter_source_chunks(category, source, open_text, urls)]
+        with open_text() as stream:
+            topics = [topic for topic in CLAUSE_TITLE_PATTERN.findall(stream.read()) if topic not in SKIPPED_TOPICS]
+        topics = list(dict.fromkeys(topics)) or [category]
+        questions[category] = [
+            template.format(topic=topic, category=category) for topic in topics for template in QUESTION_TEMPLATES
+        ]
+        weights[category] = len(chunks) if mix == 'chunks' else 1
+    return questions, weights
+
+def process_rss(pid):
+    """프로세스와 하위 프로세스의 상주 메모리 합계(MB, /proc가 없으면 None)"""
+    try:
+        with open(f"/proc/{pid}/status", 'r') as file:
+            rss = next(int(line.split()[1]) for line in file if line.startswith('VmRSS:')) / 1024
+    except (OSError, StopIteration):
+        return None
+    try:
+        with open(f"/proc/{pid}/task/{pid}/children", 'r') as file:
+            children = [int(child) for child in file.read().split()]
+    except OSError:
+        children = []
+    return rss + sum(process_rss(child) or 0.0 for child in children)
+
+def prepare_workdir(args, workdir):
+    """임시 작업 디렉토리에 데이터를 연결하고 가짜 채팅 모델/로컬 임베딩 환경 변수 설정"""
+    os.environ.update({
+        'CHAT_BACKEND': 'fake',
+        'FAKE_CHAT_LATENCY': str(args.llm_latency),
+        'FAKE_CHAT_TOKEN_DELAY': str(args.token_delay),
+        'FAKE_CHAT_ERROR_RATE': str(args.error_rate),
+        'EMBEDDING_BACKEND': args.embedding,
+        'FAQ_AUTO_REFRESH': '1' if args.faq else '0'  # --faq면 시작할 때 가짜 모델로 FAQ 테이블 생성
+    })
+    sys.path.insert(0, ROOT)  # 작업 디렉토리를 옮긴 뒤에도 프로젝트 모듈과 앱 스크립트를 찾도록
+    from modules.mmu_config import DATA_DIR, FAQ_QUESTIONS_PATH
+
+    paths = [DATA_DIR] + ([FAQ_QUESTIONS_PATH] if args.faq else [])
+    for path in paths:
+        source = os.path.join(ROOT, path)
+        if os.path.exists(source):
+            os.symlink(source, os.path.join(workdir, path))
+    os.chdir(workdir)
+    return DATA_DIR
+
+def user_loop(user, args, sampler, stop_at, records, ask):
+    """가상 사용자 한 명: 시작 시각을 분산한 뒤 질문 -> 생각 시간을 반복 (ask는 (지연, 첫 토큰, 오류 여부) 반환)"""
+    rng = random.Random(args.seed * 100003 + user)
+    time.sleep(rng.uniform(0, args.ramp_up))
+    while time.perf_counter() < stop_at:
+        category, question = sampler.sample(rng)
+        started = time.perf_counter()
+        try:
+            latency, ttft, error = ask(question)
+        except Exception:
+            latency, ttft, error = time.perf_counter() - started, None, True
+        records.append({'user': user, 'category': category, 'started': started, 'latency': latency, 'ttft': ttft, 'error': error})
+        if args.think_time:
+            time.sleep(min(rng.expovariate(1.0 / args.think_time), max(stop_at - time.perf_counter(), 0)))
+
+def run_threads(users, args, sampler, make_ask):
+    """사용자마다 스레드 하나로 부하를 걸고 (기록, 경과 시간) 반환 (make_ask(user)는 사용자별 세션을 만들고 ask 함수 반환)"""
+    records, asks = [], [make_ask(user) for user in range(users)]
+    started = time.perf_counter()
+    stop_at = started + args.ramp_up + args.duration
+    threads = [
+        threading.Thread(target=user_loop, args=(user, args, sampler, stop_at, records, ask), daemon=True)
+        for user, ask in enumerate(asks)
+    ]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    return records, time.perf_counter() - started, asks
+
+def run_inprocess_level(users, args, sampler, loader):
+    """앱과 같은 순서로 세션별 대화 내역에 질문/답변을 쌓으며 ResponseGenerator와 스트리밍 포매터를 직접 호출"""
+    from modules.mmu_vector_store import SharedVectorStore
+    from modules.mmu_response_generator import ResponseGenerator
+    from modules.mmu_response_formatter import ResponseFormatter, StreamingResponseFormatter
+
+    def make_ask(user):
+        session = {'chat_history': [], 'vector_store': SharedVectorStore.acquire(loader)}
+
+        def ask(question):
+            errors = []
+            started, ttft = time.perf_counter(), None
+            session['chat_history'].append({'role': 'user', 'content': question, 'formatted': ResponseFormatter.format_response(question)})
+            formatter = StreamingResponseFormatter()
+            for chunk in ResponseGenerator.stream_question(question, session['vector_store'], session=session, on_error=errors.append):
+                if ttft is None:
+                    ttft = time.perf_counter() - started
+                formatter.feed(chunk)
+            formatted = formatter.finish()
+            session['chat_history'].append({'role': 'assistant', 'content': formatter.raw_text, 'formatted': formatted})
+            return time.perf_counter() - started, ttft, bool(errors)
+        ask.close = session['vector_store'].release
+        return ask
+
+    return run_threads(users, args, sampler, make_ask)
+
+def run_apptest_level(users, args, sampler, loader):
+    """사용자마다 Streamlit AppTest 세션 하나로 mmu_talk_app.py 스크립트 전체를 실행 (첫 토큰 시간은 측정하지 않음)
+    AppTest는 실행마다 프로세스 전역 Streamlit 런타임을 바꿔 끼우므로 스크립트 실행은 한 번에 하나씩 진행하고,
+    지연 시간은 대기 시간을 뺀 스크립트 실행 시간만 기록 (동시 처리 용량은 inprocess/http 대상으로 측정)"""
+    from streamlit.testing.v1 import AppTest
+
+    run_lock = threading.Lock()
+
+    def make_ask(user):
+        app = AppTest.from_file(os.path.join(ROOT, 'mmu_talk_app.py'), default_timeout=args.timeout)
+        with run_lock:
+            app.run()
+
+        def ask(question):
+            with run_lock:
+                started = time.perf_counter()
+                app.chat_input[0].set_value(question).run()
+                latency = time.perf_counter() - started
+            answer = app.chat_message[-1].markdown[-1].value if app.chat_message else ''
+            return latency, None, bool(app.error) or ERROR_MESSAGE in answer
+        ask.close = lambda: None  # 세션 상태의 공유 저장소 핸들은 AppTest가 정리될 때 해제
+        return ask
+
+    return run_threads(users, args, sampler, make_ask)
+
+async def ask_http(client, url, question, session, timeout):
+    """/ask/stream 호출 (첫 token 이벤트까지의 시간 측정, done 이벤트의 대화 상태로 세션 갱신)"""
+    import aiohttp
+
+    started, ttft, event = time.perf_counter(), None, None
+    async with client.post(url + '/ask/stream', json={'question': question, 'session': session},
+                           timeout=aiohttp.ClientTimeout(total=timeout)) as response:
+        if response.status != 200:
+            return time.perf_counter() - started, None, True
+        async for line in response.content:
+            line = line.decode('utf-8').strip()
+            if line.startswith('event: '):
+                event = line[len('event: '):]
+            elif line.startswith('data: '):
+                if event == 'token' and ttft is None:
+                    ttft = time.perf_counter() - started
+                elif event == 'done':
+                    session.update(json.loads(line[len('data: '):])['session'])
+                elif event == 'error':
+                    return time.perf_counter() - started, ttft, True
+    return time.perf_counter() - started, ttft, event != 'done'
+
+async def http_user(user, args, sampler, stop_at, records, client, url):
+    rng = random.Random(args.seed * 100003 + user)
+    session = {'last_department_info': None}
+    await asyncio.sleep(rng.uniform(0, args.ramp_up))
+    while time.perf_counter() < stop_at:
+        category, question = sampler.sample(rng)
+        started = time.perf_counter()
+        try:
+            latency, ttft, error = await ask_http(client, url, question, session, args.timeout)
+        except Exception:
+            latency, ttft, error = time.perf_counter() - started, None, True
+        records.append({'user': user, 'category': category, 'started': started, 'latency': latency, 'ttft': ttft, 'error': error})
+        if args.think_time:
+            await asyncio.sleep(min(rng.expovariate(1.0 / args.think_time), max(stop_at - time.perf_counter(), 0)))
+
+async def run_http_level(users, args, sampler, url):
+    """사용자마다 asyncio 작업 하나로 HTTP API에 부하 (서버는 대화 상태를 보관하지 않고 클라이언트가 주고받음)"""
+    import aiohttp
+
+    records = []
+    started = time.perf_counter()
+    stop_at = started + args.ramp_up + args.duration
+    async with aiohttp.ClientSession(connector=aiohttp.TCPConnector(limit=0)) as client:
+        await asyncio.gather(*(http_user(user, args, sampler, stop_at, records, client, url) for user in range(users)))
+    return records, time.perf_counter() - started
+
+def start_api_server(args):
+    """가짜 모델 API 서버를 하위 프로세스로 시작하고 /healthz가 응답할 때까지 대기"""
+    import urllib.request
+
+    server = subprocess.Popen([
+        sys.executable, os.path.join(ROOT, 'mmu_api.py'), '--fake', '--port', str(args.port), '--workers', str(args.workers),
+        '--llm-latency', str(args.llm_latency), '--token-delay', str(args.token_delay), '--error-rate', str(args.error_rate)
+    ], cwd=ROOT, stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL)
+    url = f"http://127.0.0.1:{args.port}"
+    deadline = time.perf_counter() + args.timeout
+    while time.perf_counter() < deadline:
+        if server.poll() is not None:
+            raise SystemExit("API 서버가 시작하지 못했습니다.")
+        try:
+            urllib.request.urlopen(url + '/healthz', timeout=1).read()
+            return server, url
+        except OSError:
+            time.sleep(0.5)
+    server.terminate()
+    raise SystemExit("API 서버가 시간 안에 준비되지 않았습니다.")
+
+def server_pid(url):
+    """같은 호스트에서 실행 중인 API 서버 워커의 PID (메모리 측정용)"""
+    import urllib.request
+
+    try:
+        return json.loads(urllib.request.urlopen(url + '/healthz', timeout=5).read())['pid']
+    except (OSError, ValueError, KeyError):
+        return None
+
+def report_level(users, records, elapsed, rss_before, rss_after, args):
+    """단계 하나의 처리량, 지연 시간, 오류율, 세션당 메모리와 SLO 판정"""
+    from benchmarks.bench_pipeline import summarize
+
+    latencies = [record['latency'] for record in records]
+    ttfts = [record['ttft'] for record in records if record['ttft'] is not None and not record['error']]
+    errors = sum(record['error'] for record in records)
+    result = {
+        'users': users,
+        'requests': len(records),
+        'throughput_rps': len(records) / elapsed if elapsed else 0.0,
+        'latency': dict(summarize(latencies), max_ms=max(latencies) * 1000) if latencies else None,
+        'ttft': summarize(ttfts) if ttfts else None,
+        'error_rate': errors / len(records) if records else 0.0,
+        'memory_per_session_mb': (rss_after - rss_before) / users if rss_before is not None and rss_after is not None else None,
+        'by_category': {
+            category: sum(record['category'] == category for record in records)
+            for category in sorted({record['category'] for record in records})
+        }
+    }
+    checks = {
+        'p95_s': (result['latency']['p95_ms'] / 1000 if result['latency'] else None, args.slo_p95, 'max'),
+        'p99_s': (result['latency']['p99_ms'] / 1000 if result['latency'] else None, args.slo_p99, 'max'),
+        'ttft_p95_s': (result['ttft']['p95_ms'] / 1000 if result['ttft'] else None, args.slo_ttft_p95, 'max'),
+        'error_rate': (result['error_rate'], args.slo_error_rate, 'max'),
+        'memory_per_session_mb': (result['memory_per_session_mb'], args.slo_memory_mb, 'max'),
+        'throughput_rps': (result['throughput_rps'], args.slo_throughput, 'min')
+    }
+    result['slo'] = {
+        name: {'value': value, 'limit': limit, 'ok': value <= limit if kind == 'max' else value >= limit}
+        for name, (value, limit, kind) in checks.items()
+        if limit is not None and value is not None  # 측정하지 않은 지표(AppTest 첫 토큰 등)는 판정하지 않음
+    }
+    result['slo_ok'] = bool(records) and all(check['ok'] for check in result['slo'].values())
+    return result
+
+def run(args):
+    if args.target == 'http':
+        server = None
+        if args.url is None:
+            server, url = start_api_server(args)
+        else:
+            url = args.url.rstrip('/')
+        pid = server.pid if server else server_pid(url)
+        try:
+            sys.path.insert(0, ROOT)
+            from modules.mmu_config import DATA_DIR
+            sampler = QuestionSampler(*build_question_mix(os.path.join(ROOT, DATA_DIR), args.mix), args.zipf, args.seed)
+            results = []
+            for users in args.users:
+                rss_before = process_rss(pid) if pid else None
+                records, elapsed = asyncio.run(run_http_level(users, args, sampler, url))
+                results.append(report_level(users, records, elapsed, rss_before, process_rss(pid) if pid else None, args))
+            return results
+        finally:
+            if server is not None:
+                server.terminate()
+                server.wait()
+
+    with tempfile.TemporaryDirectory() as workdir:
+        cwd = os.getcwd()
+        data_dir = prepare_workdir(args, workdir)  # 실제 faiss_index와 캐시를 건드리지 않도록 임시 디렉토리에서 실행
+        try:
+            from mmu_talk_app import load_vector_store
+            from modules.mmu_vector_store import SharedVectorStore
+            from modules.mmu_response_generator import ResponseGenerator
+
+            # 인덱스 구성과 지연 import는 측정 전에 끝내 두고, 측정 중에도 공유 저장소가 해제되지 않도록 핸들 유지
+            errors = []
+            loader = functools.partial(load_vector_store, on_error=errors.append)
+            handle = SharedVectorStore.acquire(loader)
+            if handle is None:
+                raise SystemExit(f"벡터 저장소를 구성하지 못했습니다: {'; '.join(errors)}")
+            if args.faq:
+                deadline = time.perf_counter() + args.timeout
+                while not ResponseGenerator.faq_table.is_fresh(handle.index_version) and time.perf_counter() < deadline:
+                    time.sleep(0.5)  # 백그라운드 FAQ 재생성이 측정과 겹치지 않도록 대기
+            ResponseGenerator.process_question("수강신청 기간은 언제인가요?", handle)
+            sampler = QuestionSampler(*build_question_mix(data_dir, args.mix), args.zipf, args.seed)
+            run_level = run_apptest_level if args.target == 'apptest' else run_inprocess_level
+
+            results = []
+            for users in args.users:
+                ResponseGenerator.answer_cache.clear()  # 단계마다 빈 답변 캐시에서 시작
+                cache_before = dict(ResponseGenerator.answer_cache.stats)
+                gc.collect()
+                rss_before = process_rss(os.getpid())
+                records, elapsed, asks = run_level(users, args, sampler, loader)
+                rss_after = process_rss(os.getpid())  # 세션이 살아 있는 동안 측정
+                result = report_level(users, records, elapsed, rss_before, rss_after, args)
+                cache = {key: value - cache_before.get(key, 0) for key, value in ResponseGenerator.answer_cache.stats.items()}
+                lookups = cache['exact_hits'] + cache['semantic_hits'] + cache['misses']
+                result['answer_cache_hit_rate'] = (cache['exact_hits'] + cache['semantic_hits']) / lookups if lookups else 0.0
+                results.append(result)
+                for ask in asks:
+                    ask.close()
+                del asks
+            handle.release()
+            return results
+        finally:
+            os.chdir(cwd)
+
+def main():
+    parser = argparse.ArgumentParser(description="동시 사용자 부하 테스트와 SLO 보고")
+    parser.add_argument('--target', choices=['inprocess', 'apptest', 'http'], default='inprocess',
+                        help="inprocess: 응답 생성 경로 직접 호출, apptest: Streamlit AppTest, http: mmu_api.py")
+    parser.add_argument('--users', type=int, nargs='+', default=[5, 20, 50], help="동시 사용자 수 (여러 개면 차례로 측정)")
+    parser.add_argument('--duration', type=float, default=30.0, help="단계별 측정 시간(초, 시작 분산 시간 제외)")
+    parser.add_argument('--ramp-up', type=float, default=5.0, help="사용자 시작 시각을 분산할 시간(초)")
+    parser.add_argument('--think-time', type=float, default=5.0, help="질문 사이 평균 생각 시간(초, 지수 분포, 0이면 쉬지 않음)")
+    parser.add_argument('--mix', choices=['chunks', 'uniform'], default='chunks', help="카테고리 선택 비율 (청크 수 비례 또는 균등)")
+    parser.add_argument('--zipf', type=float, default=1.1, help="카테고리 안 질문 인기도 지프 지수 (0이면 균등)")
+    parser.add_argument('--llm-latency', type=float, default=0.5, help="가짜 채팅 모델의 첫 토큰 지연 시간(초)")
+    parser.add_argument('--token-delay', type=float, default=0.01, help="가짜 채팅 모델의 토큰 간 지연 시간(초)")
+    parser.add_argument('--error-rate', type=float, default=0.0, help="가짜 채팅 모델의 실패 확률")
+    parser.add_argument('--embedding', choices=['local', 'google'], default='local', help="임베딩 백엔드 (inprocess/apptest)")
+    parser.add_argument('--faq', action='store_true', help="FAQ 질문 목록을 연결하여 미리 생성한 답변도 사용")
+    parser.add_argument('--url', help="이미 실행 중인 API 서버 주소 (http, 없으면 가짜 모델 서버를 띄움)")
+    parser.add_argument('--port', type=int, default=8765, help="띄울 API 서버 포트 (http)")
+    parser.add_argument('--workers', type=int, default=1, help="띄울 API 서버 워커 수 (http)")
+    parser.add_argument('--timeout', type=float, default=120.0, help="요청/준비 대기 제한 시간(초)")
+    parser.add_argument('--seed', type=int, default=0)
+    parser.add_argument('--slo-p95', type=float, default=5.0, help="응답 완료 p95 상한(초)")
+    parser.add_argument('--slo-p99', type=float, default=None, help="응답 완료 p99 상한(초)")
+    parser.add_argument('--slo-ttft-p95', type=float, default=2.0, help="첫 토큰 p95 상한(초)")
+    parser.add_argument('--slo-error-rate', type=float, default=0.01, help="오류율 상한")
+    parser.add_argument('--slo-memory-mb', type=float, default=5.0, help="세션당 메모리 상한(MB)")
+    parser.add_argument('--slo-throughput', type=float, default=None, help="처리량 하한(요청/초)")
+    parser.add_argument('--json', help="결과를 저장할 JSON 파일 경로")
+    args = parser.parse_args()
+    if args.json:
+        args.json = os.path.abspath(args.json)
+
+    results = run(args)
+
+    print(f"대상 {args.target}, 단계별 {args.duration:.0f}s, 생각 시간 평균 {args.think_time}s, "
+          f"LLM 지연 {args.llm_latency}s + 토큰당 {args.token_delay}s, 실패 확률 {args.error_rate}")
+    print(f"{'users':>6}{'reqs':>7}{'req/s':>8}{'p50':>9}{'p95':>9}{'p99':>9}{'max':>9}{'ttft p95':>10}{'errors':>8}"
+          f"{'MB/sess':>9}{'cache':>7}{'SLO':>6}")
+    for result in results:
+        latency, ttft = result['latency'] or {}, result['ttft'] or {}
+        memory, cache = result['memory_per_session_mb'], result.get('answer_cache_hit_rate')
+        print(
+            f"{result['users']:>6}{result['requests']:>7}{result['throughput_rps']:>8.2f}"
+            f"{latency.get('p50_ms', 0) / 1000:>8.2f}s{latency.get('p95_ms', 0) / 1000:>8.2f}s"
+            f"{latency.get('p99_ms', 0) / 1000:>8.2f}s{latency.get('max_ms', 0) / 1000:>8.2f}s"
+            f"{'-' if not ttft else format(ttft['p95_ms'] / 1000, '.2f') + 's':>10}{result['error_rate']:>8.1%}"
+            f"{'-' if memory is None else format(memory, '.2f'):>9}{'-' if cache is None else format(cache, '.0%'):>7}"
+            f"{'OK' if result['slo_ok'] else 'FAIL':>6}"
+        )
+        for name, check in result['slo'].items():
+            if not check['ok']:
+                print(f"{'':>6}  {name}: {check['value']:.3g} (기준 {check['limit']:.3g})")
+    passed = [result['users'] for result in results if result['slo_ok']]
+    print(f"SLO를 만족한 최대 동시 사용자 수: {max(passed) if passed else '없음'}")
+    if args.json:
+        with open(args.json, 'w', encoding='utf-8') as file:
+            json.dump({'args': vars(args), 'results': results}, file, indent=2, ensure_ascii=False)
+    if len(passed) < len(results):
+        sys.exit(1)
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,192 @@
+# 질문 처리 파이프라인 단계별 마이크로 벤치마크 (오프라인)
+# bench_pipeline.py
+#
+# 실행: python -m benchmarks.bench_pipeline --scales 10 100 1000 --output bench_results.json
+# 가짜 임베딩/채팅 모델을 사용하므로 네트워크와 API 키 없이 실행된다.
+
+import os
+import time
+import json
+import shutil
+import argparse
+import platform
+import tempfile
+import tracemalloc
+import numpy as np
+from modules.mmu_config import DATA_DIR, INDEX_DIR
+from modules.mmu_fakes import FakeEmbeddings, FakeChatModel
+from modules.mmu_file_handler import DocumentProcessor
+from modules.mmu_metadata_index import MetadataIndex
+from modules.mmu_vector_store import VectorStoreManager
+from modules.mmu_response_generator import ResponseGenerator
+from modules.mmu_response_formatter import ResponseFormatter
+
+QUESTIONS = [
+    "수강신청 기간은 언제인가요?",
+    "계절학기 수강 가능 학점은?",
+    "성적 평가 기준 알려주세요",
+    "학기말시험 응시 자격",
+    "재수강하면 성적은 어떻게 되나요?",
+    "수업 시간표는 몇 교시까지 있나요?",
+    "추가시험 신청 방법",
+    "학점포기 제도가 있나요?"
+]
+
+def make_corpus(target_dir, scale, source_dir=DATA_DIR):
+    """data/*.txt를 scale배로 복제한 합성 말뭉치 생성 (복제본마다 제목을 달리해 청크 ID가 겹치지 않게 함)"""
+    os.makedirs(target_dir, exist_ok=True)
+    for name in sorted(os.listdir(source_dir)):
+        if not name.endswith('.txt'):
+            continue
+        with open(os.path.join(source_dir, name), 'r', encoding='utf-8') as file:
+            text = file.read()
+        stem = os.path.splitext(name)[0]
+        for copy in range(scale):
+            sections = [f"{section.strip()} #{copy}" for section in text.split('\n\n') if section.strip()]
+            with open(os.path.join(target_dir, f"{stem}_{copy:04d}.txt"), 'w', encoding='utf-8') as file:
+                file.write('\n\n'.join(sections))
+
+def summarize(latencies, items=None):
+    """지연 시간 목록(초)의 백분위수 요약"""
+    values = np.asarray(latencies) * 1000
+    summary = {
+        'count': len(values),
+        'mean_ms': float(values.mean()),
+        'p50_ms': float(np.percentile(values, 50)),
+        'p95_ms': float(np.percentile(values, 95)),
+        'p99_ms': float(np.percentile(values, 99))
+    }
+    if items is not None:
+        summary['items_per_sec'] = items / (summary['p50_ms'] / 1000) if summary['p50_ms'] else 0.0
+    return summary
+
+def timed(function, repeat):
+    """함수를 repeat번 실행한 지연 시간 목록과 마지막 결과 반환"""
+    latencies, result = [], None
+    for _ in range(repeat):
+        started = time.perf_counter()
+        result = function()
+        latencies.append(time.perf_counter() - started)
+    return latencies, result
+
+def peak_memory_mb(function):
+    """함수 한 번 실행 시 Python 힙 최대 사용량(MB)"""
+    tracemalloc.start()
+    try:
+        function()
+        return tracemalloc.get_traced_memory()[1] / 1e6
+    finally:
+        tracemalloc.stop()
+
+def bench_scale(scale, args):
+    """한 배율에 대해 단계별 측정"""
+    results = {}
+    data_dir = os.path.join(os.getcwd(), f"data_x{scale}")
+    make_corpus(data_dir, scale)
+    embeddings = FakeEmbeddings(dimension=args.dimension)
+    chat_model = FakeChatModel()
+
+    # 1. 문서 수집 및 청크 분할
+    ingest = lambda: DocumentProcessor.process_multiple_text_files(MetadataIndex(), data_dir)
+    latencies, chunks = timed(ingest, args.repeat)
+    results['ingest'] = summarize(latencies, items=len(chunks))
+    results['ingest']['chunks'] = len(chunks)
+    results['ingest']['peak_mb'] = peak_memory_mb(ingest)
+
+    # 2. 벡터 저장소 전체 구성 (매번 빈 인덱스에서 시작)
+    metadata_index = MetadataIndex()
+    chunks = DocumentProcessor.process_multiple_text_files(metadata_index, data_dir)
+    def build():
+        shutil.rmtree(INDEX_DIR, ignore_errors=True)  # 샤드 하위 디렉토리까지 삭제
+        os.makedirs(INDEX_DIR)
+        return VectorStoreManager.create_vector_store(chunks, metadata_index, embeddings)
+    latencies, vector_store = timed(build, max(1, min(args.repeat, 3)))
+    results['create_vector_store'] = summarize(latencies, items=len(chunks))
+    results['create_vector_store']['peak_mb'] = peak_memory_mb(build)
+    vector_store = VectorStoreManager.create_vector_store(chunks, metadata_index, embeddings)  # 변경 없음 -> 메모리 매핑 로드
+
+    questions = [QUESTIONS[i % len(QUESTIONS)] for i in range(args.queries)]
+
+    # 3. 검색 (어휘 검색 + 질문 임베딩 + 벡터 검색 + 융합)
+    def retrieve(question):
+        lexical_ids, confident = ResponseGenerator.search_lexical(question, vector_store)
+        embedding = None if confident else vector_store.embedding_function.embed_query(question)
+        return ResponseGenerator.retrieve_documents(question, vector_store, embedding, lexical_ids)
+    retrieved, latencies = [], []
+    for question in questions:
+        started = time.perf_counter()
+        retrieved.append(retrieve(question))
+        latencies.append(time.perf_counter() - started)
+    results['retrieval'] = summarize(latencies)
+
+    # 4. 컨텍스트 구성 (겹침 병합/중복 제거/토큰 예산 적용 포함)
+    latencies, contexts, saved = [], [], []
+    for docs in retrieved:
+        started = time.perf_counter()
+        context, _, context_stats = ResponseGenerator.build_context(docs, vector_store)
+        latencies.append(time.perf_counter() - started)
+        contexts.append(context)
+        saved.append(context_stats['chars_saved'])
+    results['context'] = summarize(latencies)
+    results['context']['mean_chars'] = float(np.mean([len(context) for context in contexts]))
+    results['context']['mean_chars_saved'] = float(np.mean(saved))
+
+    # 5. 응답 포매팅
+    chain = ResponseGenerator.get_enhanced_rag_chain(chat_model)
+    responses = [chain.invoke({'question': q, 'context': c}) for q, c in zip(questions[:20], contexts[:20])]
+    latencies = []
+    for i in range(args.queries):
+        response = responses[i % len(responses)]
+        started = time.perf_counter()
+        ResponseFormatter.format_response(response)
+        latencies.append(time.perf_counter() - started)
+    results['format_response'] = summarize(latencies)
+
+    # 6. 전체 질문 처리 (답변 캐시를 비워 매번 생성)
+    latencies = []
+    for question in questions[:min(args.queries, 50)]:
+        ResponseGenerator.answer_cache.clear()
+        started = time.perf_counter()
+        ResponseGenerator.process_question(question, vector_store, chat_model)
+        latencies.append(time.perf_counter() - started)
+    results['process_question'] = summarize(latencies)
+    return results
+
+def main():
+    parser = argparse.ArgumentParser(description="오프라인 단계별 성능 측정 (가짜 임베딩/채팅 모델 사용)")
+    parser.add_argument('--scales', type=int, nargs='+', default=[10, 100], help="data/*.txt 복제 배율 (예: 10 100 1000)")
+    parser.add_argument('--repeat', type=int, default=5, help="수집/구성 단계 반복 횟수")
+    parser.add_argument('--queries', type=int, default=200, help="검색/포매팅 단계 질의 수")
+    parser.add_argument('--dimension', type=int, default=768, help="가짜 임베딩 차원")
+    parser.add_argument('--output', default='bench_results.json', help="결과 JSON 파일 경로")
+    args = parser.parse_args()
+
+    output_path = os.path.abspath(args.output)
+    source_dir = os.path.abspath(DATA_DIR)
+    report = {
+        'meta': {
+            'timestamp': time.strftime('%Y-%m-%dT%H:%M:%S'),
+            'python': platform.python_version(),
+            'machine': platform.machine(),
+            'args': vars(args)
+        },
+        'results': {}
+    }
+    original_dir = os.getcwd()
+    with tempfile.TemporaryDirectory() as work_dir:
+        os.chdir(work_dir)  # 인덱스와 캐시를 임시 디렉토리에 생성
+        try:
+            os.symlink(source_dir, DATA_DIR)
+            for scale in args.scales:
+                report['results'][f"x{scale}"] = bench_scale(scale, args)
+                for stage, summary in report['results'][f"x{scale}"].items():
+                    print(f"x{scale:<6}{stage:<22}p50 {summary['p50_ms']:>10.2f} ms  p95 {summary['p95_ms']:>10.2f} ms  p99 {summary['p99_ms']:>10.2f} ms")
+        finally:
+            os.chdir(original_dir)
+
+    with open(output_path, 'w', encoding='utf-8') as file:
+        json.dump(report, file, ensure_ascii=False, indent=2)
+    print(f"결과 저장: {output_path}")
+
+if __name__ == "__main__":
+    main()
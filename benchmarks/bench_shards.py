@@ -0,0 +1,132 @@
+# 단일 인덱스와 카테고리 샤드 인덱스 비교 벤치마크 (오프라인)
+# bench_shards.py
+#
+# 실행: python -m benchmarks.bench_shards --scales 10 100 --queries 200
+# 카테고리(파일)마다 섹션을 scale배로 늘린 말뭉치에서 질의 지연 시간, 라우팅 후 재현율,
+# 정답 문구가 든 청크를 상위 k개 안에 찾는 비율(hit@k), 파일 하나가 바뀌었을 때의 재구성 시간을 단일 인덱스와 비교한다.
+# 재현율과 hit@k가 의미 있도록 기본으로 로컬 임베딩을 사용한다 (--embedding fake는 무작위 벡터라 지연 시간 비교용).
+
+import os
+import json
+import time
+import argparse
+import tempfile
+import numpy as np
+from modules.mmu_config import DATA_DIR, HYBRID_CANDIDATES
+from modules.mmu_fakes import FakeEmbeddings
+from modules.mmu_embedding_backend import HashedTfidfEmbeddings
+from modules.mmu_file_handler import DocumentProcessor
+from modules.mmu_metadata_index import MetadataIndex
+from modules.mmu_vector_store import VectorStoreManager
+from benchmarks.bench_pipeline import QUESTIONS, summarize
+from benchmarks.bench_embeddings import EVAL_SET
+
+def make_category_corpus(target_dir, scale, source_dir=DATA_DIR):
+    """카테고리 수는 그대로 두고 카테고리마다 섹션을 scale배로 늘린 말뭉치 생성"""
+    os.makedirs(target_dir, exist_ok=True)
+    for name in sorted(os.listdir(source_dir)):
+        if not name.endswith('.txt'):
+            continue
+        with open(os.path.join(source_dir, name), 'r', encoding='utf-8') as file:
+            sections = [section.strip() for section in file.read().split('\n\n') if section.strip()]
+        with open(os.path.join(target_dir, name), 'w', encoding='utf-8') as file:
+            file.write('\n\n'.join(f"{section} #{copy}" for copy in range(scale) for section in sections))
+
+def build(data_dir, embeddings, sharded):
+    metadata_index = MetadataIndex()
+    started = time.perf_counter()
+    vector_store = VectorStoreManager.create_vector_store(
+        DocumentProcessor.iter_chunks(metadata_index, data_dir), metadata_index, embeddings, sharded=sharded
+    )
+    return vector_store, time.perf_counter() - started
+
+def bench_scale(scale, args, source_dir):
+    results = {}
+    data_dir = os.path.join(os.getcwd(), f"data_x{scale}")
+    make_category_corpus(data_dir, scale, source_dir)
+    if args.embedding == 'local':
+        embeddings = HashedTfidfEmbeddings(idf_path=None)  # IDF는 구성할 때 말뭉치로 학습 (저장된 IDF를 건드리지 않음)
+    else:
+        embeddings = FakeEmbeddings(dimension=args.dimension)
+    single, results['single_build_seconds'] = build(data_dir, embeddings, False)
+    sharded, results['sharded_build_seconds'] = build(data_dir, embeddings, True)
+    results['chunks'] = len(sharded.docstore._chunk_shards)
+    results['shards'] = len(sharded.shards)
+
+    questions = [QUESTIONS[i % len(QUESTIONS)] for i in range(args.queries)]
+    single_latencies, routed_latencies, recalls, searched = [], [], [], []
+    for question in questions:
+        embedding = embeddings.embed_query(question)
+        started = time.perf_counter()
+        single.similarity_search_by_vector(embedding, k=HYBRID_CANDIDATES)
+        single_latencies.append(time.perf_counter() - started)
+
+        started = time.perf_counter()
+        categories = sharded.route(question, embedding)
+        routed = sharded.similarity_search_by_vector(embedding, k=HYBRID_CANDIDATES, categories=categories)
+        routed_latencies.append(time.perf_counter() - started)
+
+        # 라우팅으로 놓친 결과 비율 (전체 샤드 검색 결과 대비)
+        everything = sharded.similarity_search_by_vector(embedding, k=HYBRID_CANDIDATES)
+        expected = {doc.metadata['chunk_id'] for doc in everything}
+        recalls.append(len(expected & {doc.metadata['chunk_id'] for doc in routed}) / max(len(expected), 1))
+        searched.append(len(categories or sharded.shards))
+    results['single_search'] = summarize(single_latencies)
+    results['routed_search'] = summarize(routed_latencies)
+    results['routed_recall'] = float(np.mean(recalls))
+    results['mean_shards_searched'] = float(np.mean(searched))
+
+    # 정답 문구가 든 청크를 상위 k개 안에 찾은 비율 (단일 인덱스 / 라우팅)
+    single_hits, routed_hits = [], []
+    for question, answer in EVAL_SET:
+        embedding = embeddings.embed_query(question)
+        single_docs = single.similarity_search_by_vector(embedding, k=HYBRID_CANDIDATES)
+        routed_docs = sharded.similarity_search_by_vector(embedding, k=HYBRID_CANDIDATES, categories=sharded.route(question, embedding))
+        single_hits.append(any(answer in doc.page_content for doc in single_docs))
+        routed_hits.append(any(answer in doc.page_content for doc in routed_docs))
+    results['single_hit_at_k'] = float(np.mean(single_hits))
+    results['routed_hit_at_k'] = float(np.mean(routed_hits))
+
+    # 파일 하나에 섹션을 추가한 뒤 재구성 (샤드는 해당 카테고리만 다시 저장)
+    changed = sorted(name for name in os.listdir(data_dir) if name.endswith('.txt'))[0]
+    with open(os.path.join(data_dir, changed), 'a', encoding='utf-8') as file:
+        file.write("\n\n추가 섹션\n벤치마크용으로 추가한 내용입니다.")
+    _, results['single_rebuild_seconds'] = build(data_dir, embeddings, False)
+    _, results['sharded_rebuild_seconds'] = build(data_dir, embeddings, True)
+    return results
+
+def main():
+    parser = argparse.ArgumentParser(description="단일 인덱스와 카테고리 샤드 인덱스의 검색/재구성 비교")
+    parser.add_argument('--scales', type=int, nargs='+', default=[10, 100], help="카테고리별 섹션 복제 배율")
+    parser.add_argument('--queries', type=int, default=200, help="측정할 질의 수")
+    parser.add_argument('--embedding', choices=['local', 'fake'], default='local', help="임베딩 (fake는 무작위 벡터라 재현율이 의미 없음)")
+    parser.add_argument('--dimension', type=int, default=768, help="가짜 임베딩 차원")
+    parser.add_argument('--json', help="결과를 저장할 JSON 파일 경로")
+    args = parser.parse_args()
+
+    all_results = {}
+    with tempfile.TemporaryDirectory() as workdir:
+        cwd, source_dir = os.getcwd(), os.path.abspath(DATA_DIR)
+        os.chdir(workdir)  # 실제 faiss_index를 건드리지 않도록 임시 디렉토리에서 실행
+        try:
+            for scale in args.scales:
+                all_results[scale] = bench_scale(scale, args, source_dir)
+        finally:
+            os.chdir(cwd)
+
+    print(f"{'scale':>6}{'chunks':>8}{'shards':>8}{'single p50':>12}{'routed p50':>12}{'shards/q':>10}{'recall':>8}"
+          f"{'hit single':>12}{'hit routed':>12}{'rebuild single':>16}{'rebuild shard':>15}")
+    for scale, result in all_results.items():
+        print(
+            f"{scale:>6}{result['chunks']:>8}{result['shards']:>8}"
+            f"{result['single_search']['p50_ms']:>10.2f}ms{result['routed_search']['p50_ms']:>10.2f}ms"
+            f"{result['mean_shards_searched']:>10.2f}{result['routed_recall']:>8.2f}"
+            f"{result['single_hit_at_k']:>12.2f}{result['routed_hit_at_k']:>12.2f}"
+            f"{result['single_rebuild_seconds']:>15.2f}s{result['sharded_rebuild_seconds']:>14.2f}s"
+        )
+    if args.json:
+        with open(args.json, 'w', encoding='utf-8') as file:
+            json.dump({'args': vars(args), 'results': all_results}, file, indent=2)
+
+if __name__ == "__main__":
+    main()
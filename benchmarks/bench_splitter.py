@@ -0,0 +1,159 @@
+# 조항 단위 분할기와 기존 재귀 분할기 비교 벤치마크
+# bench_splitter.py
+#
+# 실행: python -m benchmarks.bench_splitter --scale 200
+# data/*.txt 섹션 본문을 scale배로 늘려 두 분할기의 처리량과 분할 중 최대 할당량(tracemalloc)을 재고,
+# 원본 섹션에서 청크 경계 품질(번호 조항이 여러 청크로 잘린 비율, 줄 시작에서 시작/문장 끝에서 끝난 청크 비율)을 비교한다.
+
+import json
+import time
+import argparse
+import tracemalloc
+import numpy as np
+from modules.mmu_config import DATA_DIR, CHUNK_SIZE, CHUNK_OVERLAP
+from modules.mmu_file_handler import DocumentProcessor
+from modules.mmu_chunker import SectionChunker, SUBITEM
+
+def make_recursive_splitter():
+    """이전까지 사용하던 재귀 분할기 (같은 구분자 목록)"""
+    from langchain.text_splitter import RecursiveCharacterTextSplitter
+
+    return RecursiveCharacterTextSplitter(
+        chunk_size=CHUNK_SIZE,
+        chunk_overlap=CHUNK_OVERLAP,
+        separators=["\n\n", "\n1. ", "\n2. ", "\n3. ", "\n가. ", "\n나. ", "\n다. ", "\n라. ", "\n", ". ", ", ", " "],
+        length_function=len,
+        is_separator_regex=False
+    )
+
+def load_sections(data_dir=DATA_DIR):
+    """(섹션, 본문 시작 위치) 목록 (본문 = 첫 줄 제목 제외)"""
+    sections = []
+    for _, _, open_text in DocumentProcessor.iter_text_sources(data_dir):
+        with open_text() as stream:
+            for _, section in DocumentProcessor.iter_sections(stream):
+                newline = section.find('\n')
+                sections.append((section, newline + 1 if newline >= 0 else 0))
+    return sections
+
+def recursive_spans(splitter, section, content_start):
+    """재귀 분할기의 청크 문자열을 섹션 위의 구간으로 환산 (겹치는 청크는 앞 청크 시작 이후에서 찾음)"""
+    spans, cursor = [], content_start
+    for chunk in splitter.split_text(section[content_start:]):
+        start = section.find(chunk, cursor)
+        spans.append((start, start + len(chunk)))
+        cursor = start + 1
+    return spans
+
+def split_recursive(splitter, sections):
+    return [splitter.split_text(section[content_start:]) for section, content_start in sections]
+
+def split_section_spans(sections):
+    return [SectionChunker.split(section, content_start) for section, content_start in sections]
+
+def split_section_texts(sections):
+    return [[section[start:end] for start, end in SectionChunker.split(section, content_start)]
+            for section, content_start in sections]
+
+def measure(function, repeat):
+    """(최소 소요 시간, 분할 중 최대 할당량 KB, 결과)"""
+    seconds = min(timed(function) for _ in range(repeat))
+    tracemalloc.start()
+    result = function()
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return seconds, peak / 1024, result
+
+def timed(function):
+    started = time.perf_counter()
+    function()
+    return time.perf_counter() - started
+
+def clause_regions(section, content_start):
+    """번호 조항/항목 구간 목록 (다음 같은 수준 이상의 조항 시작 또는 본문 끝까지)"""
+    boundaries = [boundary for boundary in SectionChunker.find_boundaries(section, content_start) if boundary[2] <= SUBITEM]
+    regions = []
+    for i, (_, start, level) in enumerate(boundaries):
+        end = next((position for position, _, other in boundaries[i + 1:] if other <= level), len(section))
+        regions.append((start, end))
+    return regions
+
+def boundary_quality(sections, spans_by_section):
+    """청크 경계 품질 지표"""
+    clauses = broken = at_line = at_sentence = chunks = 0
+    lengths = []
+    for (section, content_start), spans in zip(sections, spans_by_section):
+        for start, end in clause_regions(section, content_start):
+            text = section[start:end].strip()
+            if not text or len(text) > CHUNK_SIZE:
+                continue  # 한 청크에 들어갈 수 없는 조항은 제외
+            clauses += 1
+            if not any(text in section[chunk_start:chunk_end] for chunk_start, chunk_end in spans):
+                broken += 1
+        for start, end in spans:
+            chunks += 1
+            lengths.append(end - start)
+            at_line += start == content_start or section[start - 1] == '\n' or section[content_start:start].strip() == ''
+            at_sentence += end == len(section) or section[end] == '\n' or section[end - 1] in '.?!'
+    return {
+        'chunks': chunks,
+        'mean_chars': float(np.mean(lengths)) if lengths else 0.0,
+        'max_chars': int(max(lengths)) if lengths else 0,
+        'clauses': clauses,
+        'broken_clause_rate': broken / clauses if clauses else 0.0,
+        'start_at_line_rate': at_line / chunks if chunks else 0.0,
+        'end_at_sentence_rate': at_sentence / chunks if chunks else 0.0
+    }
+
+def main():
+    parser = argparse.ArgumentParser(description="조항 단위 분할기와 재귀 분할기의 처리량, 메모리, 경계 품질 비교")
+    parser.add_argument('--scale', type=int, default=200, help="처리량 측정용 섹션 복제 배율")
+    parser.add_argument('--repeat', type=int, default=3, help="반복 횟수 (최솟값 사용)")
+    parser.add_argument('--json', help="결과를 저장할 JSON 파일 경로")
+    args = parser.parse_args()
+
+    splitter = make_recursive_splitter()
+    sections = load_sections()
+    scaled = sections * args.scale
+    characters = sum(len(section) - content_start for section, content_start in scaled)
+    runs = {
+        'recursive': lambda: split_recursive(splitter, scaled),
+        'section_spans': lambda: split_section_spans(scaled),
+        'section_texts': lambda: split_section_texts(scaled)
+    }
+
+    results = {}
+    for name, function in runs.items():
+        seconds, peak_kb, output = measure(function, args.repeat)
+        results[name] = {
+            'seconds': seconds,
+            'mb_per_sec': characters / seconds / 1e6 if seconds else 0.0,
+            'chunks_per_sec': sum(len(chunks) for chunks in output) / seconds if seconds else 0.0,
+            'peak_kb': peak_kb
+        }
+        del output
+
+    quality = {
+        'recursive': boundary_quality(sections, [recursive_spans(splitter, section, start) for section, start in sections]),
+        'section': boundary_quality(sections, split_section_spans(sections))
+    }
+
+    print(f"섹션 {len(scaled)}개, {characters / 1e6:.1f}M 글자")
+    print(f"{'splitter':>14}{'seconds':>10}{'M chars/s':>11}{'chunks/s':>11}{'peak KB':>10}")
+    for name, result in results.items():
+        print(
+            f"{name:>14}{result['seconds']:>10.3f}{result['mb_per_sec']:>11.2f}{result['chunks_per_sec']:>11.0f}"
+            f"{result['peak_kb']:>10.0f}"
+        )
+    print(f"\n{'splitter':>14}{'chunks':>8}{'mean':>8}{'max':>6}{'clauses':>9}{'broken':>8}{'line start':>12}{'sentence end':>14}")
+    for name, result in quality.items():
+        print(
+            f"{name:>14}{result['chunks']:>8}{result['mean_chars']:>8.0f}{result['max_chars']:>6}{result['clauses']:>9}"
+            f"{result['broken_clause_rate']:>8.2f}{result['start_at_line_rate']:>12.2f}{result['end_at_sentence_rate']:>14.2f}"
+        )
+    if args.json:
+        with open(args.json, 'w', encoding='utf-8') as file:
+            json.dump({'args': vars(args), 'throughput': results, 'quality': quality}, file, indent=2)
+
+if __name__ == "__main__":
+    main()
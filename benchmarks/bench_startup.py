@@ -0,0 +1,115 @@
+# 앱 시작 시간과 첫 답변까지 걸리는 시간 벤치마크 (오프라인)
+# bench_startup.py
+#
+# 실행: python -m benchmarks.bench_startup --repeat 5
+# 1) 새 프로세스에서 mmu_talk_app를 import하는 데 걸리는 시간과, import 직후 무거운 모듈이 올라왔는지 확인한다.
+# 2) 가짜 모델로 임시 작업 디렉토리에 인덱스 스냅샷을 미리 만든 뒤, 새 프로세스에서
+#    import -> 스냅샷 로딩 -> 첫 답변까지의 시간을 잰다 (재시작한 서버가 첫 질문에 답하기까지의 시간).
+
+import os
+import sys
+import json
+import argparse
+import statistics
+import subprocess
+import tempfile
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+HEAVY_MODULES = ['langchain_google_genai', 'google.generativeai', 'faiss', 'scipy', 'langchain_community.vectorstores']
+
+IMPORT_SCRIPT = """
+import sys, time, json
+started = time.perf_counter()
+import mmu_talk_app
+seconds = time.perf_counter() - started
+print(json.dumps({'seconds': seconds, 'loaded': [name for name in %r if name in sys.modules]}))
+""" % (HEAVY_MODULES,)
+
+FIRST_ANSWER_SCRIPT = """
+import sys, time, json
+started = time.perf_counter()
+sys.path.insert(0, %r)
+import mmu_talk_app
+from modules.mmu_fakes import FakeEmbeddings, FakeChatModel
+from modules.mmu_metadata_index import MetadataIndex
+from modules.mmu_file_handler import DocumentProcessor
+from modules.mmu_vector_store import VectorStoreManager, SharedVectorStore
+from modules.mmu_response_generator import ResponseGenerator
+imported = time.perf_counter()
+
+def load_vector_store(on_error=print):
+    metadata_index = MetadataIndex()
+    chunks = DocumentProcessor.iter_chunks(metadata_index)
+    return VectorStoreManager.create_vector_store(chunks, metadata_index, FakeEmbeddings(dimension=%d), on_error=on_error)
+
+SharedVectorStore.start_warm_up(load_vector_store)
+ready, errors = SharedVectorStore.wait_warm_up()
+vector_store = SharedVectorStore.acquire(load_vector_store)
+loaded = time.perf_counter()
+answer = ResponseGenerator.process_question(%r, vector_store, FakeChatModel(), session={})
+answered = time.perf_counter()
+print(json.dumps({
+    'import': imported - started,
+    'load': loaded - imported,
+    'answer': answered - loaded,
+    'total': answered - started,
+    'ready': ready,
+    'errors': errors,
+    'answered': bool(answer)
+}))
+"""
+
+def run_script(script, cwd):
+    result = subprocess.run(
+        [sys.executable, '-c', script], cwd=cwd, capture_output=True, text=True,
+        env={**os.environ, 'PYTHONPATH': ROOT}
+    )
+    if result.returncode != 0:
+        raise RuntimeError(result.stderr.strip())
+    return json.loads(result.stdout.strip().splitlines()[-1])
+
+def main():
+    parser = argparse.ArgumentParser(description="앱 import 시간과 첫 답변까지의 시간 측정")
+    parser.add_argument('--repeat', type=int, default=5, help="측정 반복 횟수 (중앙값 사용)")
+    parser.add_argument('--dimension', type=int, default=768, help="가짜 임베딩 차원")
+    parser.add_argument('--question', default="수강신청 기간은 언제인가요?")
+    parser.add_argument('--json', help="결과를 저장할 JSON 파일 경로")
+    args = parser.parse_args()
+
+    imports = [run_script(IMPORT_SCRIPT, ROOT) for _ in range(args.repeat)]
+    import_seconds = statistics.median(item['seconds'] for item in imports)
+    loaded_heavy = sorted({name for item in imports for name in item['loaded']})
+
+    with tempfile.TemporaryDirectory() as workdir:
+        # 가짜 벡터가 실제 인덱스를 덮어쓰지 않도록 임시 작업 디렉토리에서 실행
+        os.symlink(os.path.join(ROOT, 'data'), os.path.join(workdir, 'data'))
+        script = FIRST_ANSWER_SCRIPT % (ROOT, args.dimension, args.question)
+        cold = run_script(script, workdir)  # 스냅샷이 없는 상태에서 인덱스 구성
+        warm = [run_script(script, workdir) for _ in range(args.repeat)]  # 저장된 스냅샷을 불러오는 재시작
+
+    first_answer = {
+        key: statistics.median(item[key] for item in warm)
+        for key in ('import', 'load', 'answer', 'total')
+    }
+    print(f"mmu_talk_app import 시간 (중앙값): {import_seconds * 1000:.0f} ms")
+    print(f"import 직후 올라온 무거운 모듈: {', '.join(loaded_heavy) or '없음'}")
+    print(f"인덱스 최초 구성 후 첫 답변: {cold['total'] * 1000:.0f} ms (구성 {cold['load'] * 1000:.0f} ms)")
+    print(
+        f"스냅샷 재시작 후 첫 답변 (중앙값): {first_answer['total'] * 1000:.0f} ms "
+        f"(import {first_answer['import'] * 1000:.0f} ms, 로딩 {first_answer['load'] * 1000:.0f} ms, "
+        f"답변 {first_answer['answer'] * 1000:.0f} ms)"
+    )
+    if not all(item['ready'] and item['answered'] for item in [cold] + warm):
+        print(f"경고: 일부 실행에서 답변을 얻지 못했습니다. {cold['errors'] or ''}")
+    if args.json:
+        with open(args.json, 'w', encoding='utf-8') as file:
+            json.dump({
+                'args': vars(args),
+                'import_seconds': import_seconds,
+                'loaded_heavy_modules': loaded_heavy,
+                'cold': cold,
+                'first_answer': first_answer
+            }, file, indent=2)
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,253 @@
+# HTTP API 서버
+# mmu_api.py
+#
+# 실행: python mmu_api.py --port 8000 --workers 2
+#       python mmu_api.py --fake --llm-latency 0.5 --token-delay 0.01  (가짜 모델로 부하 테스트)
+#
+# POST /ask         {"question": "...", "session": {"last_department_info": null}} -> 답변 JSON
+# POST /ask/stream  같은 요청 -> text/event-stream (token 이벤트 여러 개, 마지막에 done 이벤트)
+#                   (생성 대기열이 가득 차면 두 경로 모두 503)
+# GET  /healthz     인덱스 버전과 처리 중인 요청 수
+# GET  /metrics     Prometheus 형식 지표
+
+import os
+import json
+import time
+import asyncio
+import logging
+import argparse
+import functools
+import multiprocessing
+from aiohttp import web
+from modules.mmu_config import (
+    DATA_DIR, API_HOST, API_PORT, API_MAX_CONCURRENT_LLM, API_MAX_PENDING_QUESTIONS, API_FAKE_WORKDIR,
+    FAQ_QUESTIONS_PATH, FAQ_AUTO_REFRESH
+)
+from modules.mmu_file_handler import DocumentProcessor
+from modules.mmu_vector_store import VectorStoreManager, SharedVectorStore
+from modules.mmu_data_watcher import DataWatcher
+from modules.mmu_metadata_index import MetadataIndex
+from modules.mmu_response_generator import ResponseGenerator, GenerationBacklogFull
+from modules.mmu_response_formatter import ResponseFormatter
+from modules.mmu_faq import FaqRunner
+from modules.mmu_metrics import metrics
+
+logger = logging.getLogger(__name__)
+
+ARGS_KEY = web.AppKey("args", argparse.Namespace)
+STORE_KEY = web.AppKey("vector_store", SharedVectorStore)
+CHAT_MODEL_KEY = web.AppKey("chat_model", object)
+IN_FLIGHT_KEY = web.AppKey("in_flight", dict)
+
+ERROR_MESSAGE = "죄송합니다. 응답을 생성하는 중 문제가 발생했습니다."
+BUSY_MESSAGE = "요청이 많아 지금은 답변할 수 없습니다. 잠시 후 다시 시도해주세요."
+
+def get_models(args):
+    """실행 옵션에 따른 (임베딩, 채팅 모델) 반환 (None이면 기본 Google 모델)"""
+    if not args.fake:
+        return None, None
+    from modules.mmu_fakes import FakeEmbeddings, FakeChatModel
+    return (
+        FakeEmbeddings(dimension=args.dimension),
+        FakeChatModel(latency=args.llm_latency, token_delay=args.token_delay, error_rate=args.error_rate)
+    )
+
+def load_vector_store(embeddings=None):
+    """텍스트 파일을 처리하여 벡터 저장소 생성 (워커 시작 전 주 프로세스에서 한 번 실행)"""
+    metadata_index = MetadataIndex()  # 담당부서/URL 색인
+    chunks = DocumentProcessor.iter_chunks(metadata_index)  # 텍스트 파일과 압축 파일을 읽으며 청크를 차례로 생성
+    return VectorStoreManager.create_vector_store(chunks, metadata_index, embeddings)
+
+def bad_request(message):
+    return web.HTTPBadRequest(text=json.dumps({'error': message}, ensure_ascii=False), content_type='application/json')
+
+async def read_request(request):
+    """요청 본문에서 질문과 대화 상태 추출"""
+    try:
+        body = await request.json()
+    except (json.JSONDecodeError, UnicodeDecodeError):
+        body = None
+    if not isinstance(body, dict):
+        raise bad_request("JSON 객체 본문이 필요합니다.")
+    question = body.get('question')
+    if not isinstance(question, str) or not question.strip():
+        raise bad_request("question 필드가 필요합니다.")
+    session = body.get('session') if isinstance(body.get('session'), dict) else {}
+    # 서버는 대화 상태를 보관하지 않으므로 클라이언트가 이전 담당부서 정보를 보내고 응답으로 갱신값을 받음
+    return question.strip(), {'last_department_info': session.get('last_department_info')}
+
+def busy_response(session):
+    return web.json_response({'error': BUSY_MESSAGE, 'session': session}, status=503, headers={'Retry-After': '1'})
+
+def describe_sources(docs):
+    return [
+        {key: doc.metadata.get(key) for key in ('source', 'category', 'section', 'title', 'chunk_id')}
+        for doc in docs or []
+    ]
+
+async def ask(request):
+    question, session = await read_request(request)
+    started = time.perf_counter()
+    in_flight = request.app[IN_FLIGHT_KEY]
+    in_flight['requests'] += 1
+    try:
+        flight = ResponseGenerator.start_question(question, request.app[STORE_KEY], request.app[CHAT_MODEL_KEY], session)
+        async for _ in flight.asubscribe():
+            pass  # 생성 완료까지 이벤트 루프를 막지 않고 대기
+        result = flight.result
+        ResponseGenerator.apply_result(result, session)
+        metrics.record_duration('question_total', max(flight.finished_at - started, 0.0))
+        return web.json_response({
+            'answer': result['response'],
+            'formatted': result['formatted'] or ResponseFormatter.format_response(result['response']),
+            'sources': describe_sources(result['docs']),
+            'session': session
+        })
+    except GenerationBacklogFull:
+        return busy_response(session)
+    except Exception as e:
+        metrics.increment('question_errors')
+        logger.error(f"질문 처리 중 오류 발생: {e}")
+        return web.json_response({'error': ERROR_MESSAGE, 'session': session}, status=500)
+    finally:
+        in_flight['requests'] -= 1
+
+async def send_event(stream, event, data):
+    await stream.write(f"event: {event}\ndata: {json.dumps(data, ensure_ascii=False)}\n\n".encode('utf-8'))
+
+async def ask_stream(request):
+    question, session = await read_request(request)
+    started = time.perf_counter()
+    try:
+        # 응답 헤더를 보내기 전에 생성을 시작해야 대기열이 가득 찼을 때 503으로 응답할 수 있음
+        flight = ResponseGenerator.start_question(question, request.app[STORE_KEY], request.app[CHAT_MODEL_KEY], session)
+    except GenerationBacklogFull:
+        return busy_response(session)
+    stream = web.StreamResponse(headers={'Content-Type': 'text/event-stream', 'Cache-Control': 'no-cache'})
+    await stream.prepare(request)
+    in_flight = request.app[IN_FLIGHT_KEY]
+    in_flight['requests'] += 1
+    try:
+        async for chunk in flight.asubscribe():  # 먼저 시작된 같은 질문의 토큰 스트림을 처음부터 구독
+            await send_event(stream, 'token', {'text': chunk})
+        result = flight.result
+        ResponseGenerator.apply_result(result, session)
+        metrics.record_duration('question_total', max(flight.finished_at - started, 0.0))
+        await send_event(stream, 'done', {
+            'formatted': result['formatted'] or ResponseFormatter.format_response(result['response']),
+            'sources': describe_sources(result['docs']),
+            'session': session
+        })
+    except (ConnectionResetError, asyncio.CancelledError):
+        raise  # 클라이언트 연결 종료 (생성 작업은 다른 구독자를 위해 계속 진행)
+    except Exception as e:
+        metrics.increment('question_errors')
+        logger.error(f"질문 처리 중 오류 발생: {e}")
+        await send_event(stream, 'error', {'error': ERROR_MESSAGE, 'session': session})
+    finally:
+        in_flight['requests'] -= 1
+    await stream.write_eof()
+    return stream
+
+async def healthz(request):
+    return web.json_response({
+        'status': 'ok',
+        'pid': os.getpid(),
+        'index_version': request.app[STORE_KEY].index_version,
+        'in_flight_requests': request.app[IN_FLIGHT_KEY]['requests'],
+        'in_flight_llm': ResponseGenerator.llm_active,
+        'pending_generations': ResponseGenerator.generation_pending,
+        'coalescing_questions': len(ResponseGenerator.in_flight)
+    })
+
+async def metrics_handler(request):
+    return web.Response(text=metrics.to_prometheus(), content_type='text/plain')
+
+async def on_startup(app):
+    """워커 시작 시 인덱스를 한 번 불러오고 채팅 모델을 준비"""
+    embeddings, chat_model = get_models(app[ARGS_KEY])
+    loop = asyncio.get_running_loop()
+    def refresh_faq(vector_store):
+        if FAQ_AUTO_REFRESH:
+            FaqRunner.refresh_in_background(vector_store, chat_model)  # 인덱스가 바뀌었으면 FAQ 테이블 재생성
+
+    # 워커마다 데이터 디렉토리를 감시하여 바뀐 파일을 반영한 새 인덱스 버전으로 교체
+    vector_store = await loop.run_in_executor(
+        None, SharedVectorStore.acquire, functools.partial(DataWatcher.load_and_watch, embeddings, on_swap=refresh_faq)
+    )
+    if vector_store is None:
+        raise RuntimeError("벡터 저장소를 불러오지 못했습니다.")
+    app[STORE_KEY] = vector_store
+    app[CHAT_MODEL_KEY] = chat_model
+    # 답변 생성을 LLM 동시 호출 수만큼의 작업자 풀에서 실행하고, 대기열이 가득 차면 새 질문 거절
+    ResponseGenerator.limit_llm_concurrency(app[ARGS_KEY].max_concurrent_llm, app[ARGS_KEY].max_pending)
+    refresh_faq(vector_store)
+    logger.info(f"워커 {os.getpid()} 준비 완료 (인덱스 버전 {vector_store.index_version})")
+
+async def on_cleanup(app):
+    if STORE_KEY in app:
+        app[STORE_KEY].release()
+
+def create_app(args):
+    app = web.Application()
+    app[ARGS_KEY] = args
+    app[IN_FLIGHT_KEY] = {'requests': 0}
+    app.on_startup.append(on_startup)
+    app.on_cleanup.append(on_cleanup)
+    app.router.add_post('/ask', ask)
+    app.router.add_post('/ask/stream', ask_stream)
+    app.router.add_get('/healthz', healthz)
+    app.router.add_get('/metrics', metrics_handler)
+    return app
+
+def run_worker(args):
+    logging.basicConfig(level=logging.INFO, format="%(asctime)s %(process)d %(levelname)s %(message)s")
+    web.run_app(create_app(args), host=args.host, port=args.port, reuse_port=args.workers > 1, print=None)
+
+def main():
+    parser = argparse.ArgumentParser(description="뮤톡 질의응답 HTTP API 서버")
+    parser.add_argument('--host', default=API_HOST)
+    parser.add_argument('--port', type=int, default=API_PORT)
+    parser.add_argument('--workers', type=int, default=1, help="워커 프로세스 수 (같은 포트를 SO_REUSEPORT로 공유)")
+    parser.add_argument('--max-concurrent-llm', type=int, default=API_MAX_CONCURRENT_LLM, help="워커당 동시 LLM 호출 수")
+    parser.add_argument('--max-pending', type=int, default=API_MAX_PENDING_QUESTIONS,
+                        help="워커당 대기하거나 진행 중인 답변 생성 수 상한 (넘으면 503)")
+    parser.add_argument('--fake', action='store_true', help="가짜 임베딩/채팅 모델 사용 (네트워크와 API 키 불필요)")
+    parser.add_argument('--dimension', type=int, default=768, help="가짜 임베딩 차원")
+    parser.add_argument('--llm-latency', type=float, default=0.0, help="가짜 채팅 모델의 첫 토큰 지연 시간(초)")
+    parser.add_argument('--token-delay', type=float, default=0.0, help="가짜 채팅 모델의 토큰 간 지연 시간(초)")
+    parser.add_argument('--error-rate', type=float, default=0.0, help="가짜 채팅 모델의 실패 확률")
+    args = parser.parse_args()
+
+    if args.fake:
+        # 가짜 벡터가 실제 인덱스를 덮어쓰지 않도록 별도 작업 디렉토리에서 실행
+        sources = {path: os.path.abspath(path) for path in (DATA_DIR, FAQ_QUESTIONS_PATH) if os.path.exists(path)}
+        os.makedirs(API_FAKE_WORKDIR, exist_ok=True)
+        os.chdir(API_FAKE_WORKDIR)
+        for path, source in sources.items():
+            if not os.path.lexists(path):
+                os.symlink(source, path)
+
+    if args.workers <= 1:
+        run_worker(args)
+        return
+
+    # 워커들이 동시에 인덱스를 구성하지 않도록 먼저 한 번 구성해 두고, 워커는 디스크에서 메모리 매핑으로 불러옴
+    logging.basicConfig(level=logging.INFO, format="%(asctime)s %(process)d %(levelname)s %(message)s")
+    vector_store = load_vector_store(get_models(args)[0])
+    if vector_store is None:
+        raise SystemExit("벡터 저장소를 구성하지 못했습니다.")
+    del vector_store
+    context = multiprocessing.get_context('spawn')
+    workers = [context.Process(target=run_worker, args=(args,)) for _ in range(args.workers)]
+    for worker in workers:
+        worker.start()
+    try:
+        for worker in workers:
+            worker.join()
+    except KeyboardInterrupt:
+        for worker in workers:
+            worker.terminate()
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,63 @@
+# 임베딩 백엔드 전환용 재임베딩
+# mmu_embedding_migrate.py
+#
+# 실행: python mmu_embedding_migrate.py --check   (저장된 인덱스와 현재 임베딩 설정의 호환성만 확인)
+#       python mmu_embedding_migrate.py           (호환되지 않으면 모든 청크를 다시 임베딩하여 인덱스 교체)
+#       python mmu_embedding_migrate.py --refit   (로컬 임베딩 IDF를 현재 말뭉치로 다시 학습한 뒤 재임베딩)
+#
+# EMBEDDING_BACKEND(.env 또는 mmu_config)를 바꾼 뒤 실행하면 앱을 시작하기 전에 새 인덱스를 미리 만들어 둔다.
+# 새 인덱스는 별도 디렉토리에 만든 뒤 교체하므로 도중에 실패해도 기존 인덱스는 그대로 남는다.
+
+import sys
+import logging
+import argparse
+from modules.mmu_config import EMBEDDING_BACKEND, INDEX_DIR
+from modules.mmu_file_handler import DocumentProcessor
+from modules.mmu_vector_store import VectorStoreManager
+from modules.mmu_metadata_index import MetadataIndex
+from modules.mmu_embedding_backend import EmbeddingBackend, HashedTfidfEmbeddings
+
+def main():
+    parser = argparse.ArgumentParser(description="저장된 벡터 인덱스를 현재 임베딩 백엔드로 다시 임베딩")
+    parser.add_argument('--check', action='store_true', help="호환성만 확인 (맞지 않으면 종료 코드 1)")
+    parser.add_argument('--refit', action='store_true', help="로컬 임베딩 IDF를 현재 말뭉치로 다시 학습")
+    parser.add_argument('--force', action='store_true', help="호환되더라도 다시 임베딩")
+    args = parser.parse_args()
+    logging.basicConfig(level=logging.INFO, format="%(asctime)s %(levelname)s %(message)s")
+
+    embeddings = EmbeddingBackend.create()
+    if args.check:
+        # 확인만 할 때는 IDF를 학습하거나 저장하지 않음 (저장된 IDF가 없으면 호환되지 않는 것으로 보고)
+        print(f"임베딩 백엔드: {EMBEDDING_BACKEND} ({EmbeddingBackend.model_name(embeddings)})")
+        problems = VectorStoreManager.check_index(embeddings)
+        for problem in problems:
+            print(f"- {problem}")
+        print("호환됩니다." if not problems else "다시 임베딩해야 합니다.")
+        sys.exit(1 if problems else 0)
+
+    metadata_index = MetadataIndex()
+    documents = list(DocumentProcessor.iter_chunks(metadata_index))
+    if args.refit:
+        if not isinstance(embeddings, HashedTfidfEmbeddings):
+            sys.exit("--refit은 로컬 임베딩 백엔드(EMBEDDING_BACKEND=local)에서만 사용할 수 있습니다.")
+        embeddings.fit(doc.page_content for doc in documents)  # 교체가 끝난 뒤에 저장
+    else:
+        EmbeddingBackend.prepare(embeddings, [doc.page_content for doc in documents])
+
+    print(f"임베딩 백엔드: {EMBEDDING_BACKEND} ({EmbeddingBackend.model_name(embeddings)})")
+    problems = VectorStoreManager.check_index(embeddings)
+    for problem in problems:
+        print(f"- {problem}")
+    if not problems and not args.force and not args.refit:
+        print("저장된 인덱스가 현재 임베딩과 호환되어 다시 임베딩하지 않습니다. (--force로 강제)")
+        return
+
+    index_version = VectorStoreManager.migrate_index(documents, metadata_index, embeddings)
+    if index_version is None:
+        sys.exit("재임베딩에 실패하여 기존 인덱스를 유지합니다.")
+    if args.refit:
+        embeddings.save()
+    print(f"{INDEX_DIR}를 새 임베딩으로 교체했습니다. (청크 {len(documents)}개, 인덱스 버전 {index_version})")
+
+if __name__ == "__main__":
+    main()
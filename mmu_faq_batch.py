@@ -0,0 +1,72 @@
+# FAQ 답변 배치 생성
+# mmu_faq_batch.py
+#
+# 실행: python mmu_faq_batch.py --questions faq_questions.txt --workers 4 --retries 3
+#       python mmu_faq_batch.py --fake  (가짜 모델로 동작 확인)
+#
+# 질문 파일의 질문들을 작업자 풀에서 병렬로 답변하여 FAQ 테이블(현재 인덱스 버전, 검색 문서 ID, 포맷된 답변)을 만든다.
+# 앱과 API 서버는 질문을 처리할 때 이 테이블을 가장 먼저 확인한다.
+
+import os
+import sys
+import logging
+import argparse
+from modules.mmu_config import (
+    DATA_DIR, API_FAKE_WORKDIR, FAQ_QUESTIONS_PATH, FAQ_TABLE_PATH, FAQ_WORKERS, FAQ_MAX_RETRIES, FAQ_RETRY_BACKOFF
+)
+from modules.mmu_file_handler import DocumentProcessor
+from modules.mmu_vector_store import VectorStoreManager
+from modules.mmu_metadata_index import MetadataIndex
+from modules.mmu_faq import FaqTable, FaqRunner
+
+def main():
+    parser = argparse.ArgumentParser(description="자주 묻는 질문의 답변을 미리 생성하여 FAQ 테이블 저장")
+    parser.add_argument('--questions', default=FAQ_QUESTIONS_PATH, help="질문 파일 (한 줄에 한 질문)")
+    parser.add_argument('--table', default=FAQ_TABLE_PATH, help="FAQ 테이블 저장 경로")
+    parser.add_argument('--workers', type=int, default=FAQ_WORKERS, help="동시에 답변을 생성할 작업자 수")
+    parser.add_argument('--retries', type=int, default=FAQ_MAX_RETRIES, help="질문별 최대 재시도 횟수")
+    parser.add_argument('--backoff', type=float, default=FAQ_RETRY_BACKOFF, help="첫 재시도 대기 시간(초)")
+    parser.add_argument('--force', action='store_true', help="테이블이 현재 인덱스 버전이어도 모든 질문을 다시 생성")
+    parser.add_argument('--fake', action='store_true', help="가짜 임베딩/채팅 모델 사용 (네트워크와 API 키 불필요)")
+    args = parser.parse_args()
+    logging.basicConfig(level=logging.INFO, format="%(asctime)s %(levelname)s %(message)s")
+
+    embeddings, chat_model = None, None
+    if args.fake:
+        from modules.mmu_fakes import FakeEmbeddings, FakeChatModel
+        embeddings, chat_model = FakeEmbeddings(), FakeChatModel()
+        # 가짜 벡터가 실제 인덱스를 덮어쓰지 않도록 가짜 API 서버와 같은 작업 디렉토리에서 실행
+        args.questions = os.path.abspath(args.questions)
+        data_dir = os.path.abspath(DATA_DIR)
+        os.makedirs(API_FAKE_WORKDIR, exist_ok=True)
+        os.chdir(API_FAKE_WORKDIR)
+        if not os.path.lexists(DATA_DIR):
+            os.symlink(data_dir, DATA_DIR)
+
+    metadata_index = MetadataIndex()
+    vector_store = VectorStoreManager.create_vector_store(DocumentProcessor.iter_chunks(metadata_index), metadata_index, embeddings)
+    if vector_store is None:
+        sys.exit("벡터 저장소를 불러오지 못했습니다.")
+
+    table = FaqTable(args.table)
+    if table.is_fresh(vector_store.index_version) and not args.force:
+        print(f"FAQ 테이블이 이미 현재 인덱스 버전({vector_store.index_version})입니다. (--force로 다시 생성)")
+        return
+
+    with VectorStoreManager.file_lock(table.path) as locked:
+        if not locked:
+            sys.exit("다른 프로세스가 FAQ 테이블을 생성하고 있습니다.")
+        questions = FaqRunner.load_questions(args.questions)
+        stats = FaqRunner.run(
+            vector_store, questions, chat_model, table, args.workers, args.retries, args.backoff,
+            on_progress=lambda done, total: print(f"\r{done}/{total}", end='', flush=True), reuse=not args.force
+        )
+
+    print(f"\n답변 {stats['answered']}/{stats['questions']}개 (재사용 {stats['reused']}개), {stats['seconds']:.1f}초, 인덱스 버전 {stats['index_version']}")
+    for failure in stats['failed']:
+        print(f"실패: {failure['question']} - {failure['error']}")
+    if stats['failed']:
+        sys.exit(1)
+
+if __name__ == "__main__":
+    main()
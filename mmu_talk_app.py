@@ -1,79 +1,181 @@
 # 메인
 # mmu_talk_app.py
 
+import hmac
 import streamlit as st
 from modules.mmu_file_handler import DocumentProcessor
-from modules.mmu_vector_store import VectorStoreManager
+from modules.mmu_vector_store import SharedVectorStore
+from modules.mmu_data_watcher import DataWatcher
 from modules.mmu_response_generator import ResponseGenerator
-from modules.mmu_response_formatter import ResponseFormatter
+from modules.mmu_response_formatter import ResponseFormatter, StreamingResponseFormatter
+from modules.mmu_metrics import metrics
+from modules.mmu_faq import FaqRunner
+from modules.mmu_config import METRICS_PORT, ADMIN_METRICS, ADMIN_METRICS_TOKEN, HISTORY_PAGE_SIZE, FAQ_AUTO_REFRESH
+
+def refresh_faq(vector_store):
+    """인덱스가 바뀌었으면 FAQ 테이블 재생성"""
+    if FAQ_AUTO_REFRESH:
+        FaqRunner.refresh_in_background(vector_store)
+
+def load_vector_store(on_error=st.error):
+    """텍스트 파일을 처리하여 벡터 저장소 생성 (프로세스당 한 번 실행, 이후 바뀐 파일은 감시자가 새 버전으로 교체)"""
+    vector_store = DataWatcher.load_and_watch(on_error=on_error, on_swap=refresh_faq)
+    if vector_store is not None:
+        refresh_faq(vector_store)
+    return vector_store
+
+def wait_for_vector_store():
+    """백그라운드 로딩이 끝날 때까지 기다렸다가 세션에 공유 저장소 핸들 보관 (실패 시 None)"""
+    SharedVectorStore.start_warm_up(load_vector_store)
+    ready, errors = SharedVectorStore.wait_warm_up()
+    for error in errors:
+        st.error(error)
+    if not ready:
+        return None
+    st.session_state.vector_store = SharedVectorStore.acquire(load_vector_store)  # 세션에는 공유 저장소 핸들만 보관
+    return st.session_state.vector_store
+
+@st.fragment(run_every=1)
+def show_warm_up_status():
+    """로딩 상태를 1초마다 갱신하고 준비되면 전체 화면을 다시 실행"""
+    if SharedVectorStore.is_ready():
+        st.rerun()
+    elif SharedVectorStore.is_warming_up():
+        st.info("데이터를 불러오고 있습니다... 질문을 먼저 남기시면 준비되는 대로 답변합니다.")
+    else:
+        for error in SharedVectorStore.wait_warm_up(timeout=0)[1]:
+            st.error(error)
+        st.error("데이터 처리에 실패했습니다.")  # 다음 입력 시 다시 시도
+
+def add_message(role, content, formatted=None):
+    """대화 내역에 원본과 포맷 결과를 함께 저장 (포매팅은 메시지당 한 번)"""
+    if formatted is None:
+        with metrics.span('format'):
+            formatted = ResponseFormatter.format_response(content)
+    message = {"role": role, "content": content, "formatted": formatted}
+    st.session_state.chat_history.append(message)
+    return message
+
+def is_admin(token):
+    """?admin= 쿼리 값이 설정된 관리자 토큰과 같은지 여부 (토큰을 설정하지 않았으면 항상 False)"""
+    return bool(ADMIN_METRICS_TOKEN) and token is not None and hmac.compare_digest(token, ADMIN_METRICS_TOKEN)
+
+def show_metrics_panel():
+    """단계별 최근 지연 시간 백분위수와 캐시 적중률을 보여주는 관리자 패널"""
+    snapshot = metrics.snapshot()
+    with st.expander("성능 지표", expanded=False):
+        rows = [
+            {
+                "단계": stage,
+                "횟수": data['count'],
+                "p50 (ms)": round(data['quantiles'].get(0.5, 0.0) * 1000, 1),
+                "p95 (ms)": round(data['quantiles'].get(0.95, 0.0) * 1000, 1),
+                "p99 (ms)": round(data['quantiles'].get(0.99, 0.0) * 1000, 1)
+            }
+            for stage, data in sorted(snapshot['stages'].items())
+        ]
+        if rows:
+            st.dataframe(rows, hide_index=True)
+        for name, data in sorted(snapshot['values'].items()):
+            st.caption(f"{name}: p50 {data['quantiles'].get(0.5, 0):.0f}, p95 {data['quantiles'].get(0.95, 0):.0f}")
+        for name, value in sorted({**snapshot['counters'], **snapshot['gauges']}.items()):
+            st.caption(f"{name}: {value:.3g}")
+        st.download_button("Prometheus 형식 다운로드", metrics.to_prometheus(), file_name="metrics.prom")
 
 def main():
     # 페이지 설정
     st.set_page_config(page_title="대화형 검색 시스템", layout="wide")  # Streamlit 페이지 설정
     
+    # 지표 HTTP 서버 (설정된 경우 프로세스당 한 번 시작)
+    if METRICS_PORT:
+        try:
+            metrics.start_http_server(METRICS_PORT)
+        except OSError:
+            pass  # 다른 프로세스가 이미 포트를 사용 중
+
     # 세션 상태 초기화
     if 'chat_history' not in st.session_state:
         st.session_state.chat_history = []  # 대화 내역 초기화
+    if 'history_window' not in st.session_state:
+        st.session_state.history_window = HISTORY_PAGE_SIZE  # 표시할 최근 메시지 수
     
     st.title("목포해양대생을 위한 챗봇 - 뮤톡🐬")  # 페이지 제목
     st.subheader("🏫학교 생활에 대한 모든 것을 물어보세요🔎", divider='rainbow')  # 서브헤더 설정
     
-    # 데이터 초기 처리
+    # 데이터 초기 처리 (인덱스는 백그라운드에서 불러오고 화면과 입력창은 바로 표시)
     if 'vector_store' not in st.session_state:
-        with st.spinner("데이터를 처리하고 있습니다..."):  # 데이터 처리 중 스피너 표시
-            # 처리된 파일 정보 표시
-            text_files = DocumentProcessor.get_text_files()  # 텍스트 파일 목록 가져오기
-            if text_files:
-                st.info(f"발견된 데이터 파일: {', '.join(text_files.keys())}")  # 발견된 파일 정보 표시
-                chunks = DocumentProcessor.process_multiple_text_files()  # 텍스트 파일 처리
-                
-                if chunks:
-                    st.session_state.vector_store = VectorStoreManager.create_vector_store(chunks)  # 벡터 저장소 생성
-                    st.success(f"총 {len(text_files)} 개의 파일 처리 완료!")  # 성공 메시지
-                else:
-                    st.error("데이터 처리에 실패했습니다.")  # 오류 메시지
-                    st.stop()  # 실행 중단
+        # 처리된 파일 정보 표시
+        text_files = DocumentProcessor.get_text_files(on_error=st.error)  # 텍스트 파일 목록 가져오기
+        if text_files:
+            st.info(f"발견된 데이터 파일: {', '.join(text_files.keys())}")  # 발견된 파일 정보 표시
+            if SharedVectorStore.is_ready():
+                st.session_state.vector_store = SharedVectorStore.acquire(load_vector_store)  # 프로세스 공유 벡터 저장소 획득
+                st.success(f"총 {len(text_files)} 개의 파일 처리 완료!")  # 성공 메시지
             else:
-                st.error(f"'data' 경로에서 텍스트 파일을 찾을 수 없습니다.")  # 파일 없음 메시지
-                st.stop()  # 실행 중단
+                SharedVectorStore.start_warm_up(load_vector_store)  # 프로세스당 한 번 백그라운드 로딩
+                show_warm_up_status()
+        else:
+            st.error(f"'data' 경로에서 텍스트 파일을 찾을 수 없습니다.")  # 파일 없음 메시지
+            st.stop()  # 실행 중단
 
     # 사이드바에 대화 내역 지우기 버튼
     with st.sidebar:
         st.title("설정")  # 사이드바 제목
         if st.button('대화 내역 지우기'):  # 버튼 클릭 시
             st.session_state.chat_history = []  # 대화 내역 초기화
+            st.session_state.history_window = HISTORY_PAGE_SIZE
             st.rerun()  # 페이지 새로고침
+        if ADMIN_METRICS or is_admin(st.query_params.get("admin")):
+            show_metrics_panel()  # 관리자용 성능 지표
 
     # 채팅 인터페이스
     if not st.session_state.chat_history:  # 대화 내역이 없는 경우
-        st.session_state.chat_history.append({
-            "role": "assistant",
-            "content": "찾으시는 정보를 뮤톡🐬에게 남겨주세요!"  # 초기 안내 메시지
-        })
+        add_message("assistant", "찾으시는 정보를 뮤톡🐬에게 남겨주세요!")  # 초기 안내 메시지
 
-    # 이전 대화 내용 표시
-    for message in st.session_state.chat_history:
-        with st.chat_message(message["role"]):  # 사용자 또는 어시스턴트 메시지 표시
-            st.markdown(ResponseFormatter.format_response(message["content"]))  # 포맷된 응답 표시
+    # 이전 대화 내용 표시 (최근 메시지만, 포맷 결과는 저장된 것을 재사용)
+    history = st.session_state.chat_history
+    hidden = max(0, len(history) - st.session_state.history_window)
+    if hidden and st.button(f"이전 메시지 더 보기 ({hidden}개)"):
+        st.session_state.history_window += HISTORY_PAGE_SIZE
+        st.rerun()
+    with metrics.span('render_history'):
+        for message in history[hidden:]:
+            if "formatted" not in message:  # 포맷 결과 없이 저장된 메시지
+                with metrics.span('format'):
+                    message["formatted"] = ResponseFormatter.format_response(message["content"])
+            with st.chat_message(message["role"]):  # 사용자 또는 어시스턴트 메시지 표시
+                st.markdown(message["formatted"])  # 포맷된 응답 표시
 
     # 새로운 사용자 입력 처리
     if prompt := st.chat_input("질문을 입력하세요"):  # 사용자 입력 받기
         # 사용자 메시지 추가
-        st.session_state.chat_history.append({"role": "user", "content": prompt})  # 대화 내역에 추가
+        message = add_message("user", prompt)  # 대화 내역에 추가
         
-        # 어시스턴트 응답 생성
-        with st.spinner("답변을 생성하고 있습니다..."):  # 응답 생성 중 스피너 표시
-            response, docs = ResponseGenerator.process_question(prompt, st.session_state.vector_store)  # 질문 처리
-            formatted_response = ResponseFormatter.format_response(response)  # 응답 포맷팅
-            
-            # 응답을 대화 기록에 추가
-            st.session_state.chat_history.append({
-                "role": "assistant",
-                "content": response  # 어시스턴트 응답 추가
-            })
+        with st.chat_message("user"):
+            st.markdown(message["formatted"])  # 사용자 질문 바로 표시
+
+        # 어시스턴트 응답을 생성되는 대로 표시
+        with st.chat_message("assistant"):
+            placeholder = st.empty()  # 스트리밍 출력 영역
+            vector_store = st.session_state.get('vector_store')
+            if vector_store is None:  # 로딩 전에 들어온 질문은 준비될 때까지 대기
+                placeholder.markdown("데이터를 불러오고 있습니다. 준비되면 바로 답변합니다...")
+                vector_store = wait_for_vector_store()
+                if vector_store is None:
+                    placeholder.markdown("데이터 처리에 실패했습니다. 잠시 후 다시 질문해주세요.")
+                    st.stop()  # 실행 중단
+            placeholder.markdown("답변을 생성하고 있습니다...")
+            formatter = StreamingResponseFormatter()
+            for chunk in ResponseGenerator.stream_question(  # 질문 처리
+                prompt, vector_store, session=st.session_state, on_error=st.error
+            ):
+                placeholder.markdown(formatter.feed(chunk))  # 확정된 부분까지 포맷하여 표시
+            formatted = formatter.finish()
+            placeholder.markdown(formatted)  # 최종 포맷 결과 표시
             
-            # 페이지 새로고침
-            st.rerun()  # 페이지 새로고침
+        # 응답을 대화 기록에 추가 (스트리밍 중 만든 포맷 결과 재사용)
+        add_message("assistant", formatter.raw_text, formatted)
+        # 새 메시지는 이미 화면에 있으므로 전체 대화를 다시 그리는 새로고침은 하지 않음
 
 if __name__ == "__main__":
     main()  # 메인 함수 실행
\ No newline at end of file
@@ -0,0 +1,133 @@
+# 답변 캐시
+# mmu_answer_cache.py
+
+import re
+import time
+import threading
+from collections import OrderedDict
+import numpy as np
+from modules.mmu_config import ANSWER_CACHE_MAX_ENTRIES, ANSWER_CACHE_TTL, ANSWER_CACHE_SIMILARITY
+
+# 질문 정규화 시 단어 끝에서 제거할 조사 및 어미 (긴 것부터 검사)
+PARTICLES = sorted(
+    ['에서는', '에서', '으로', '에게', '까지', '부터', '은', '는', '이', '가', '을', '를', '에', '의', '도', '로', '와', '과', '요'],
+    key=len, reverse=True
+)
+PUNCTUATION_PATTERN = re.compile(r'[^\w\s]')
+
+class AnswerCache:
+    """정규화된 질문의 정확 일치와 질문 임베딩 유사도로 답변을 재사용하는 2단계 캐시"""
+
+    def __init__(self, max_entries=ANSWER_CACHE_MAX_ENTRIES, ttl=ANSWER_CACHE_TTL, threshold=ANSWER_CACHE_SIMILARITY):
+        self.max_entries = max_entries  # 최대 항목 수 (LRU 제거)
+        self.ttl = ttl  # 항목 유효 시간(초)
+        self.threshold = threshold  # 유사 질문으로 판단할 코사인 유사도
+        self.index_version = None  # 캐시된 답변이 기반한 인덱스 버전
+        self.stats = {'exact_hits': 0, 'semantic_hits': 0, 'misses': 0}
+        self._entries = OrderedDict()  # 정규화된 질문 -> 항목 (최근 사용 순)
+        self._expiry = OrderedDict()  # 정규화된 질문 -> 저장 시각 (저장 순 = 만료 순이므로 앞에서부터 제거)
+        self._lock = threading.Lock()
+
+    @staticmethod
+    def normalize_question(question):
+        """공백, 문장부호, 조사를 정리한 질문 키 생성"""
+        text = PUNCTUATION_PATTERN.sub(' ', question.lower())
+        words = []
+        for word in text.split():
+            for particle in PARTICLES:
+                if word.endswith(particle) and len(word) > len(particle) + 1:
+                    word = word[:-len(particle)]
+                    break
+            words.append(word)
+        return ' '.join(words)
+
+    @staticmethod
+    def _unit_vector(embedding):
+        vector = np.asarray(embedding, dtype=np.float32)
+        norm = np.linalg.norm(vector)
+        return vector / norm if norm else vector
+
+    def _check_version(self, index_version):
+        """인덱스 버전이 바뀌면 모든 항목 무효화"""
+        if index_version != self.index_version:
+            self._entries.clear()
+            self._expiry.clear()
+            self.index_version = index_version
+
+    def _expire(self, now):
+        while self._expiry:
+            key, created = next(iter(self._expiry.items()))
+            if now - created <= self.ttl:
+                break
+            del self._expiry[key]
+            del self._entries[key]
+
+    def get(self, question, index_version, embedding=None):
+        """캐시된 항목 반환 (정확 일치 우선, 없으면 임베딩 유사도 검사)"""
+        return self.get_exact(question, index_version) or self.get_similar(index_version, embedding)
+
+    def get_exact(self, question, index_version):
+        """정규화된 질문이 정확히 일치하는 항목 반환 (질문 임베딩 없이 조회하며, 없어도 실패로 세지 않음)"""
+        key = AnswerCache.normalize_question(question)
+        with self._lock:
+            self._check_version(index_version)
+            self._expire(time.time())
+
+            entry = self._entries.get(key)
+            if entry is not None:
+                self._entries.move_to_end(key)
+                self.stats['exact_hits'] += 1
+            return entry
+
+    def get_similar(self, index_version, embedding):
+        """질문 임베딩과 가장 유사한 항목이 기준 이상이면 반환 (정확 일치 조회 후 호출)"""
+        with self._lock:
+            self._check_version(index_version)
+            self._expire(time.time())
+            if embedding is not None:
+                candidates = [(k, e) for k, e in self._entries.items() if e['embedding'] is not None]
+                if candidates:
+                    matrix = np.stack([e['embedding'] for _, e in candidates])
+                    scores = matrix @ AnswerCache._unit_vector(embedding)
+                    best = int(np.argmax(scores))
+                    if scores[best] >= self.threshold:
+                        best_key, entry = candidates[best]
+                        self._entries.move_to_end(best_key)
+                        self.stats['semantic_hits'] += 1
+                        return entry
+
+            self.stats['misses'] += 1
+            return None
+
+    def put(self, question, index_version, response, doc_ids, embedding=None, department_info=None):
+        """답변과 검색된 문서 ID 저장"""
+        key = AnswerCache.normalize_question(question)
+        created = time.time()
+        with self._lock:
+            self._check_version(index_version)
+            self._entries[key] = {
+                'response': response,
+                'doc_ids': list(doc_ids),
+                'department_info': department_info,
+                'embedding': AnswerCache._unit_vector(embedding) if embedding is not None else None,
+                'created': created
+            }
+            self._entries.move_to_end(key)
+            self._expiry.pop(key, None)
+            self._expiry[key] = created
+            while len(self._entries) > self.max_entries:
+                evicted, _ = self._entries.popitem(last=False)  # 가장 오래 사용되지 않은 항목 제거
+                del self._expiry[evicted]
+
+    def __len__(self):
+        return len(self._entries)
+
+    def hit_rate(self):
+        hits = self.stats['exact_hits'] + self.stats['semantic_hits']
+        total = hits + self.stats['misses']
+        return hits / total if total else 0.0
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+            self._expiry.clear()
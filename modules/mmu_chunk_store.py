@@ -0,0 +1,130 @@
+# 청크 저장소
+# mmu_chunk_store.py
+
+import os
+import json
+from collections.abc import Mapping
+import numpy as np
+
+TEXT_FILE = 'chunks.bin'  # UTF-8 텍스트를 이어 붙인 파일
+OFFSETS_FILE = 'chunk_offsets.npy'  # 청크별 바이트 오프셋 (청크 수 + 1)
+IDS_FILE = 'chunk_ids.npy'  # 청크 ID (고정 길이 바이트열)
+SCHEMA_FILE = 'chunk_schema.json'  # 메타데이터 열 정의와 문자열 테이블
+
+class ChunkStore:
+    """텍스트 blob, 오프셋 배열, 메타데이터 열 배열을 메모리 매핑하여 검색된 청크만 Document로 만드는 저장소"""
+
+    def __init__(self, directory):
+        with open(os.path.join(directory, SCHEMA_FILE), 'r', encoding='utf-8') as file:
+            self.schema = json.load(file)
+        self.offsets = np.load(os.path.join(directory, OFFSETS_FILE), mmap_mode='r')
+        self.ids = np.load(os.path.join(directory, IDS_FILE), mmap_mode='r')
+        text_path = os.path.join(directory, TEXT_FILE)
+        # 빈 파일은 메모리 매핑할 수 없으므로 빈 배열 사용
+        self.text = np.memmap(text_path, dtype=np.uint8, mode='r') if os.path.getsize(text_path) else np.zeros(0, np.uint8)
+        self.columns = {
+            name: np.load(os.path.join(directory, f"chunk_meta_{name}.npy"), mmap_mode='r')
+            for name in self.schema['columns']
+        }
+        self._rows = None  # 청크 ID -> 행 번호 (첫 조회 시 생성)
+
+    @staticmethod
+    def exists(directory):
+        return all(os.path.exists(os.path.join(directory, name)) for name in (TEXT_FILE, OFFSETS_FILE, IDS_FILE, SCHEMA_FILE))
+
+    @staticmethod
+    def _save_array(directory, name, array):
+        path = os.path.join(directory, name)
+        with open(path + '.tmp', 'wb') as file:
+            np.save(file, array)
+        os.replace(path + '.tmp', path)  # 읽는 중인 프로세스가 깨지지 않도록 교체
+
+    @staticmethod
+    def write(directory, documents):
+        """Document 목록을 행 순서대로 열 형식 파일에 기록"""
+        encoded = [doc.page_content.encode('utf-8') for doc in documents]
+        offsets = np.zeros(len(encoded) + 1, dtype=np.int64)
+        offsets[1:] = np.cumsum([len(data) for data in encoded])
+
+        # 메타데이터 열: 정수 값은 그대로, 그 외 값은 문자열 테이블 ID로 저장
+        keys = sorted({key for doc in documents for key in doc.metadata if key != 'chunk_id'})
+        columns, strings = {}, {}
+        for key in keys:
+            values = [doc.metadata.get(key) for doc in documents]
+            if all(isinstance(value, int) and not isinstance(value, bool) for value in values):
+                columns[key] = 'int'
+                ChunkStore._save_array(directory, f"chunk_meta_{key}.npy", np.asarray(values, dtype=np.int64))
+            else:
+                table, ids = {}, []
+                for value in values:
+                    ids.append(table.setdefault(json.dumps(value, ensure_ascii=False), len(table)))
+                columns[key] = 'str'
+                strings[key] = list(table)
+                ChunkStore._save_array(directory, f"chunk_meta_{key}.npy", np.asarray(ids, dtype=np.int32))
+
+        chunk_ids = [doc.metadata.get('chunk_id', '') for doc in documents]
+        ChunkStore._save_array(directory, IDS_FILE, np.asarray(chunk_ids, dtype='S64'))
+        ChunkStore._save_array(directory, OFFSETS_FILE, offsets)
+        text_path = os.path.join(directory, TEXT_FILE)
+        with open(text_path + '.tmp', 'wb') as file:
+            for data in encoded:
+                file.write(data)
+        os.replace(text_path + '.tmp', text_path)
+        schema_path = os.path.join(directory, SCHEMA_FILE)
+        with open(schema_path + '.tmp', 'w', encoding='utf-8') as file:
+            json.dump({'columns': columns, 'strings': strings}, file, ensure_ascii=False)
+        os.replace(schema_path + '.tmp', schema_path)
+
+    def __len__(self):
+        return len(self.offsets) - 1
+
+    def chunk_id(self, row):
+        return self.ids[int(row)].decode('ascii')
+
+    def row(self, chunk_id):
+        """청크 ID의 행 번호 (없으면 None)"""
+        if self._rows is None:
+            self._rows = {chunk_id.decode('ascii'): row for row, chunk_id in enumerate(self.ids)}
+        return self._rows.get(chunk_id)
+
+    def document(self, row):
+        """한 행을 Document로 변환"""
+        from langchain_core.documents.base import Document
+
+        row = int(row)
+        text = bytes(self.text[self.offsets[row]:self.offsets[row + 1]]).decode('utf-8')
+        metadata = {}
+        for key, kind in self.schema['columns'].items():
+            value = self.columns[key][row]
+            metadata[key] = int(value) if kind == 'int' else json.loads(self.schema['strings'][key][value])
+        metadata['chunk_id'] = self.chunk_id(row)
+        return Document(page_content=text, metadata=metadata)
+
+    def search(self, chunk_id):
+        """LangChain Docstore와 같은 방식의 조회 (없으면 메시지 문자열 반환)"""
+        row = self.row(chunk_id)
+        if row is None:
+            return f"ID {chunk_id} not found."
+        return self.document(row)
+
+    def documents(self):
+        """전체 청크를 행 순서대로 반환"""
+        return [self.document(row) for row in range(len(self))]
+
+
+class ChunkIdMapping(Mapping):
+    """FAISS 행 번호 -> 청크 ID 매핑 (청크 저장소의 ID 배열을 그대로 사용)"""
+
+    def __init__(self, chunk_store):
+        self.chunk_store = chunk_store
+
+    def __getitem__(self, row):
+        if not 0 <= int(row) < len(self.chunk_store):
+            raise KeyError(row)
+        return self.chunk_store.chunk_id(row)
+
+    def __iter__(self):
+        return iter(range(len(self.chunk_store)))
+
+    def __len__(self):
+        return len(self.chunk_store)
@@ -0,0 +1,125 @@
+# 조항 단위 청크 분할
+# mmu_chunker.py
+
+import re
+from bisect import bisect_left, bisect_right
+from modules.mmu_config import CHUNK_SIZE, CHUNK_OVERLAP, CHUNK_MIN_FILL
+
+# 분할 위치 수준 (숫자가 작을수록 우선)
+CLAUSE, ITEM, SUBITEM, LINE, SENTENCE, PHRASE = range(6)
+
+# 줄 단위 분할 후보 (빈 그룹 번호 = 수준)
+LINE_BOUNDARY_PATTERN = re.compile(
+    r'\n(?:'
+    r'(?=[ \t]*\d+\.\s)()'  # "1. 관련규정" 같은 번호 조항
+    r'|(?=[ \t]*[가-힣]\.\s)()'  # "가. ..." 같은 세부 항목
+    r'|(?=[ \t]*(?:\d+\)|\(\d+\)|[①-⑳]))()'  # "1) ...", "(1) ...", "① ..." 같은 하위 항목
+    r'|())'  # 일반 줄바꿈
+)
+# 줄 안의 분할 후보 (줄바꿈 없이 긴 표나 문단에서만 탐색)
+SENTENCE_BOUNDARY_PATTERN = re.compile(r'[.?!]()[ \t]+|,()[ \t]+')
+LINE_START_PATTERN = re.compile(r'[^\s]')
+
+class SectionChunker:
+    """규정 형식 문서를 조항 경계 우선으로 나누어 원문 위의 (시작, 끝) 구간만 반환하는 분할기
+    (줄 단위 분할 후보를 미리 컴파일한 패턴으로 한 번만 찾고, 부분 문자열은 호출자가 필요할 때 한 번만 잘라 씀)"""
+
+    @staticmethod
+    def find_boundaries(text, start=0, end=None):
+        """[start, end) 안의 줄 단위 분할 후보를 (앞 청크의 끝, 다음 청크의 시작, 수준) 목록으로 반환 (위치 순)"""
+        return [
+            (match.start(), match.end(), match.lastindex - 1)
+            for match in LINE_BOUNDARY_PATTERN.finditer(text, start, len(text) if end is None else end)
+        ]
+
+    @staticmethod
+    def find_sentence_boundaries(text, start, end):
+        """[start, end) 안의 문장/구문 분할 후보 (문장 부호 바로 뒤에서 자름)"""
+        return [
+            (match.start() + 1, match.end(), SENTENCE + match.lastindex - 1)
+            for match in SENTENCE_BOUNDARY_PATTERN.finditer(text, start, end)
+        ]
+
+    @staticmethod
+    def trim(text, start, end):
+        """구간 앞뒤의 공백을 제외한 구간 (원문을 복사하지 않음)"""
+        match = LINE_START_PATTERN.search(text, start, end)
+        if match is None:
+            return end, end
+        start = match.start()
+        while end > start and text[end - 1].isspace():
+            end -= 1
+        return start, end
+
+    @staticmethod
+    def best_boundary(candidates):
+        """가장 높은 수준의 후보 중 마지막 후보"""
+        level = min(candidate[2] for candidate in candidates)
+        return next(candidate for candidate in reversed(candidates) if candidate[2] == level)
+
+    @staticmethod
+    def append_span(spans, span):
+        """구간 추가 (비었거나 앞 구간 안에서 끝나는 구간은 버리고, 앞 구간을 포함하는 구간이면 앞 구간과 교체)
+        겹쳐서 다시 시작한 청크가 공백만 더 읽고 끝나면 앞 청크에 포함되므로, 구간의 끝은 항상 증가함"""
+        chunk_start, chunk_end = span
+        if chunk_end <= chunk_start or (spans and chunk_end <= spans[-1][1]):
+            return
+        if spans and chunk_start <= spans[-1][0]:
+            spans[-1] = span
+        else:
+            spans.append(span)
+
+    @staticmethod
+    def split(text, start=0, end=None, chunk_size=CHUNK_SIZE, chunk_overlap=CHUNK_OVERLAP, min_fill=CHUNK_MIN_FILL):
+        """text[start:end]를 chunk_size 이하의 (시작, 끝) 구간 목록으로 분할
+        창 안에서 가장 높은 수준의 분할 위치 중 마지막 위치에서 자르므로 번호 조항은 가능한 한 한 청크에 남고,
+        조항 중간에서 자른 경우에만 다음 청크가 chunk_overlap 안의 조항/줄 시작부터 앞 청크와 겹침"""
+        end = len(text) if end is None else end
+        start, _ = SectionChunker.trim(text, start, end)
+        if end - start <= chunk_size:
+            return [SectionChunker.trim(text, start, end)] if start < end else []  # 대부분의 짧은 섹션은 탐색 없이 한 청크
+
+        boundaries = SectionChunker.find_boundaries(text, start, end)
+        positions = [boundary[0] for boundary in boundaries]  # 이진 탐색용 (앞 청크의 끝 위치)
+        starts = [boundary[1] for boundary in boundaries]
+        spans = []
+        previous_cut = start  # 앞 청크를 자른 위치 (겹쳐서 다시 시작한 청크는 이 위치를 넘어서 잘라야 앞 청크에 포함되지 않음)
+        while start < end:
+            if end - start <= chunk_size:
+                SectionChunker.append_span(spans, SectionChunker.trim(text, start, end))
+                break
+
+            # 창 (start, start + chunk_size] 안의 분할 후보 (너무 짧은 청크가 생기지 않도록 min_fill 이후를 우선)
+            limit, floor = start + chunk_size, max(start, previous_cut)
+            fill = max(start + int(chunk_size * min_fill), floor)
+            candidates = boundaries[bisect_right(positions, fill):bisect_right(positions, limit)]
+            if not candidates:
+                # 줄바꿈이 부족한 구간은 문장/구문 경계에서 자름
+                sentences = SectionChunker.find_sentence_boundaries(text, floor + 1, limit)
+                candidates = [boundary for boundary in sentences if boundary[0] > fill]
+                candidates = candidates or boundaries[bisect_right(positions, floor):bisect_right(positions, limit)] or sentences
+            if candidates:
+                cut, next_start, level = SectionChunker.best_boundary(candidates)
+            else:
+                level = PHRASE + 1
+                space = text.rfind(' ', floor + 1, limit)  # 구분 위치가 없는 긴 줄은 단어 경계, 그것도 없으면 글자 수로 자름
+                cut = space if space > floor else limit
+                next_start = cut + 1 if space > floor else cut
+            previous_cut = cut
+            SectionChunker.append_span(spans, SectionChunker.trim(text, start, cut))
+
+            # 조항 경계에서 잘랐으면 겹침 없이 다음 조항부터 시작하고, 조항 중간에서 잘랐으면 겹침 구간
+            # (최대 chunk_overlap, 앞 청크 길이의 절반) 안의 마지막 조항 시작, 없으면 가장 이른 줄(다음으로 문장) 시작부터 다시 포함
+            if level > SUBITEM:
+                overlap_from = max(cut - min(chunk_overlap, (cut - start) // 2), start + 1)
+                overlap = boundaries[bisect_left(starts, overlap_from):bisect_left(starts, cut)]
+                overlap_start = (
+                    next((boundary[1] for boundary in reversed(overlap) if boundary[2] <= SUBITEM), None)
+                    or next((boundary[1] for boundary in overlap if boundary[2] == LINE), None)
+                    or next((boundary[1] for boundary in SectionChunker.find_sentence_boundaries(text, overlap_from, cut)
+                             if boundary[2] == SENTENCE and boundary[1] < cut), None)
+                )
+                if overlap_start is not None:
+                    next_start = overlap_start
+            start = next_start
+        return spans
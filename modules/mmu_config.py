@@ -18,4 +18,122 @@ CHAT_MODEL = "gemini-1.5-flash"  # 채팅 모델
 # 청크 설정
 CHUNK_SIZE = 800  # 청크 크기
 CHUNK_OVERLAP = 300  # 청크 겹침 크기
+CHUNK_MIN_FILL = 0.5  # 조항 경계에서 자를 때 청크가 채워야 할 최소 비율 (CHUNK_SIZE 대비)
 TOP_K = 4  # 검색할 문서의 수
+
+# 인덱스 설정
+INDEX_DIR = "faiss_index"  # 벡터 인덱스 저장 디렉토리
+INDEX_MANIFEST = "manifest.json"  # 청크 해시 매니페스트 파일명
+
+# 임베딩 백엔드 설정
+EMBEDDING_BACKEND = os.getenv("EMBEDDING_BACKEND", "google")  # google(원격 API) 또는 local(CPU 해시 문자 n-gram TF-IDF 투영)
+LOCAL_EMBEDDING_DIMENSION = 512  # 로컬 임베딩 벡터 차원
+LOCAL_EMBEDDING_FEATURES = 2 ** 18  # 문자 n-gram을 모을 해시 버킷 수
+LOCAL_EMBEDDING_NGRAM_RANGE = (1, 3)  # 로컬 임베딩에 사용할 문자 n-gram 길이
+LOCAL_EMBEDDING_PROJECTION_NNZ = 4  # 해시 버킷 하나가 투영되는 차원 수
+LOCAL_EMBEDDING_IDF_PATH = ".cache/local_embedding_idf.npy"  # 말뭉치로 학습한 IDF (바꾸면 전체 재임베딩)
+
+# 채팅 모델 백엔드 설정
+CHAT_BACKEND = os.getenv("CHAT_BACKEND", "google")  # google(원격 API) 또는 fake(네트워크 없이 부하 테스트용 가짜 모델)
+FAKE_CHAT_LATENCY = float(os.getenv("FAKE_CHAT_LATENCY", "0"))  # 가짜 채팅 모델의 첫 토큰 지연 시간(초)
+FAKE_CHAT_TOKEN_DELAY = float(os.getenv("FAKE_CHAT_TOKEN_DELAY", "0"))  # 가짜 채팅 모델의 토큰 간 지연 시간(초)
+FAKE_CHAT_ERROR_RATE = float(os.getenv("FAKE_CHAT_ERROR_RATE", "0"))  # 가짜 채팅 모델의 호출 실패 확률
+
+# 임베딩 캐시 설정
+EMBEDDING_CACHE_PATH = ".cache/embeddings.sqlite3"  # 임베딩 캐시 파일 경로
+EMBEDDING_CACHE_MAX_ENTRIES = 100000  # 캐시에 보관할 최대 임베딩 수
+EMBEDDING_CACHE_EVICT_FRACTION = 0.1  # 최대 항목 수를 넘으면 이 비율만큼 여유가 생기도록 한 번에 제거
+EMBEDDING_CACHE_ACCESS_FLUSH = 1000  # 메모리에 모아 둔 접근 시각이 이만큼 쌓이면 조회 중에도 기록
+
+# 임베딩 파이프라인 설정
+EMBEDDING_BATCH_SIZE = 100  # 임베딩 요청당 청크 수
+EMBEDDING_MAX_WORKERS = 4  # 동시 임베딩 요청 수
+EMBEDDING_MAX_RETRIES = 6  # 할당량 오류 시 최대 재시도 횟수
+EMBEDDING_CHECKPOINT_PATH = ".cache/embedding_checkpoint.jsonl"  # 중단된 임베딩 재개용 체크포인트
+
+# 답변 캐시 설정
+ANSWER_CACHE_MAX_ENTRIES = 1000  # 캐시에 보관할 최대 답변 수
+ANSWER_CACHE_TTL = 6 * 60 * 60  # 답변 유효 시간(초)
+ANSWER_CACHE_SIMILARITY = 0.95  # 유사 질문으로 판단할 코사인 유사도 기준
+
+# 하이브리드 검색 설정
+LEXICAL_NGRAM_RANGE = (2, 3)  # 어휘 색인에 사용할 문자 n-gram 길이
+BM25_K1 = 1.2  # BM25 용어 빈도 포화 계수
+BM25_B = 0.75  # BM25 문서 길이 정규화 계수
+HYBRID_CANDIDATES = 20  # 융합 전 각 검색 방식에서 가져올 후보 수
+RRF_K = 60  # Reciprocal Rank Fusion 상수
+LEXICAL_FAST_PATH_COVERAGE = 0.9  # 어휘 단독 검색을 위한 최소 질의 n-gram 포함 비율
+LEXICAL_FAST_PATH_MARGIN = 1.5  # 어휘 단독 검색을 위한 1위/2위 점수 비율
+
+# 컨텍스트 압축 설정
+CONTEXT_MIN_OVERLAP = 20  # 같은 섹션의 청크를 이어 붙이기 위한 최소 겹침 문자 수
+CONTEXT_DEDUP_NGRAM = 5  # 유사 중복 판단에 사용할 문자 n-gram 길이
+CONTEXT_DEDUP_THRESHOLD = 0.9  # 유사 중복으로 판단할 n-gram 자카드 유사도 기준
+CONTEXT_TOKEN_BUDGET = 2000  # 컨텍스트 본문에 쓸 최대 추정 토큰 수
+CONTEXT_CHARS_PER_TOKEN = 2.0  # 토큰 수 추정에 쓰는 토큰당 문자 수
+
+# 중복 질문 병합 설정
+SINGLE_FLIGHT_ENABLED = True  # 생성 중인 같은 질문은 새로 생성하지 않고 같은 답변 스트림을 구독
+
+# FAQ 사전 계산 설정
+FAQ_QUESTIONS_PATH = "faq_questions.txt"  # 미리 답변할 질문 목록 (한 줄에 한 질문)
+FAQ_TABLE_PATH = ".cache/faq_table.json"  # 미리 생성한 답변 테이블
+FAQ_WORKERS = 4  # 동시에 답변을 생성할 작업자 수
+FAQ_MAX_RETRIES = 3  # 질문별 최대 재시도 횟수
+FAQ_RETRY_BACKOFF = 2.0  # 재시도 대기 시간(초, 시도마다 2배)
+FAQ_AUTO_REFRESH = os.getenv("FAQ_AUTO_REFRESH") == "1"  # 인덱스 버전이 바뀌면 백그라운드에서 FAQ 테이블 재생성 (질문 수만큼 유료 LLM 호출이 생기므로 명시적으로 켤 때만)
+
+# 카테고리 샤드 설정
+SHARDED_INDEX = False  # 카테고리별 하위 인덱스를 만들고 질문마다 일부 샤드만 검색 (카테고리마다 청크가 수만 개 이상인 말뭉치에서만 사용)
+SHARD_DIR = "shards"  # INDEX_DIR 아래 샤드 저장 디렉토리
+SHARD_MANIFEST = "shards.json"  # 샤드 목록, 버전, 중심점 기록 파일
+SHARD_ROUTE_MAX = 2  # 질문당 검색할 최대 샤드 수
+SHARD_ROUTE_MARGIN = 0.05  # 중심점 라우팅 시 1위와의 유사도 차이가 이 값 이하인 샤드도 함께 검색
+SHARD_KEYWORD_MIN_HITS = 2  # 키워드 라우팅에 필요한 1위 카테고리의 최소 키워드 일치 수 (미만이거나 동률이면 전체 샤드 검색)
+SHARD_KEYWORDS = {  # 카테고리 이름 외에 라우팅에 쓰는 키워드
+    '계절학기': ['계절', '하계', '동계', '여름학기', '겨울학기'],
+    '성적': ['학점', '평점', '등급', '재수강', '학사경고', '성적정정', '출석점수', '결석'],
+    '수강신청': ['수강', '신청학점', '수강정정', '수강취소'],
+    '수업': ['교시', '시간표', '학년도', '수업일수', '휴강', '보강'],
+    '시험': ['중간고사', '기말', '학기말', '추가시험', '부정행위', '출제', '응시', '수험']
+}
+
+# 데이터 변경 감지 설정
+DATA_WATCH_ENABLED = True  # DATA_DIR를 주기적으로 확인하여 바뀐 파일만 반영한 새 인덱스 버전으로 무중단 교체
+DATA_WATCH_INTERVAL = 5.0  # 파일 변경 확인 주기(초)
+DATA_WATCH_SETTLE = 2.0  # 마지막 수정 후 이 시간(초)이 지난 파일만 반영 (복사 중인 파일 제외)
+
+# FAISS 인덱스 종류 설정
+INDEX_TYPE = "flat"  # flat, ivf_flat, ivf_pq, hnsw 중 선택
+IVF_NLIST = 1024  # IVF 클러스터 수 (데이터가 적으면 자동으로 줄임)
+IVF_NPROBE = 16  # 검색 시 탐색할 IVF 클러스터 수
+PQ_M = 64  # PQ 서브벡터 수 (임베딩 차원의 약수)
+PQ_NBITS = 8  # 서브벡터당 비트 수 (학습 벡터가 부족하면 자동으로 줄임)
+PQ_MIN_NBITS = 4  # 이보다 적은 비트 수로만 학습할 수 있으면 IVF-Flat 사용
+HNSW_M = 32  # HNSW 노드당 연결 수
+HNSW_EF_CONSTRUCTION = 200  # HNSW 구성 시 탐색 폭
+HNSW_EF_SEARCH = 64  # HNSW 검색 시 탐색 폭
+INDEX_TRAIN_SAMPLE = 50000  # IVF/PQ 학습에 사용할 최대 벡터 수
+INDEX_RETRAIN_GROWTH = 2.0  # 학습 표본이 학습 당시의 이 배수보다 커지면 증분 추가 대신 다시 학습
+
+# 성능 지표 설정
+METRICS_WINDOW = 1000  # 백분위수 계산에 사용할 단계별 최근 관측 수
+METRICS_PORT = None  # Prometheus/OTLP JSON 지표 HTTP 포트 (None이면 사용 안 함)
+METRICS_HOST = "127.0.0.1"  # 지표 HTTP 서버 주소 (외부 스크레이퍼가 직접 접근해야 할 때만 0.0.0.0)
+ADMIN_METRICS = False  # 모든 방문자에게 사이드바 지표 패널 표시 여부
+ADMIN_METRICS_TOKEN = os.getenv("ADMIN_METRICS_TOKEN")  # 설정하면 ?admin=<토큰> 쿼리로 접속한 경우에만 지표 패널 표시
+
+# 대화 표시 설정
+HISTORY_PAGE_SIZE = 20  # 한 번에 표시할 최근 메시지 수 ("이전 메시지 더 보기"마다 이만큼 추가)
+
+# API 서버 설정
+API_HOST = "0.0.0.0"  # HTTP API 바인드 주소
+API_PORT = 8000  # HTTP API 포트
+API_MAX_CONCURRENT_LLM = 8  # 워커당 동시에 진행할 수 있는 LLM 호출 수 (답변 생성 작업자 수)
+API_MAX_PENDING_QUESTIONS = 64  # 워커당 대기하거나 진행 중인 답변 생성 수 상한 (넘는 새 질문은 503)
+API_FAKE_WORKDIR = ".cache/fake_api"  # 가짜 모델 실행 시 인덱스를 만들 작업 디렉토리 (실제 인덱스와 분리)
+
+# 스트리밍 수집 설정
+INGEST_READ_SIZE = 64 * 1024  # 파일/압축 파일 멤버를 한 번에 읽을 글자 수
+INGEST_BATCH_SIZE = 2000  # 한 번에 임베딩하여 인덱스에 추가할 청크 수
+INGEST_WORKERS = 1  # 청크 분할 프로세스 수 (1이면 단일 프로세스, 0이면 CPU 코어 수)
@@ -0,0 +1,153 @@
+# 컨텍스트 압축
+# mmu_context_compactor.py
+
+from modules.mmu_config import (
+    CONTEXT_MIN_OVERLAP, CONTEXT_DEDUP_NGRAM, CONTEXT_DEDUP_THRESHOLD,
+    CONTEXT_TOKEN_BUDGET, CONTEXT_CHARS_PER_TOKEN
+)
+
+class ContextCompactor:
+    """검색된 청크를 LLM에 넘기기 전에 겹침 병합, 중복 제거, 토큰 예산 적용으로 줄이는 도구"""
+
+    @staticmethod
+    def estimate_tokens(text):
+        """문자 수 기반 토큰 수 추정 (한국어는 대략 2자당 1토큰)"""
+        return int(len(text) / CONTEXT_CHARS_PER_TOKEN) + 1
+
+    @staticmethod
+    def find_overlap(head, tail, min_overlap=CONTEXT_MIN_OVERLAP):
+        """head의 끝과 tail의 시작이 겹치는 가장 긴 길이 반환 (min_overlap 미만이면 0)"""
+        if min(len(head), len(tail)) < min_overlap:
+            return 0
+        probe = tail[:min_overlap]
+        start = head.find(probe, max(0, len(head) - len(tail)))
+        while start != -1:
+            if tail.startswith(head[start:]):
+                return len(head) - start  # 가장 앞에서 시작하는 후보가 가장 긴 겹침
+            start = head.find(probe, start + 1)
+        return 0
+
+    @staticmethod
+    def merge_texts(first, second, min_overlap=CONTEXT_MIN_OVERLAP):
+        """두 청크가 같은 섹션의 이웃 구간이면 이어 붙인 텍스트 반환 (포함 관계 포함, 아니면 None)"""
+        if second in first:
+            return first
+        if first in second:
+            return second
+        overlap = ContextCompactor.find_overlap(first, second, min_overlap)
+        if overlap:
+            return first + second[overlap:]
+        overlap = ContextCompactor.find_overlap(second, first, min_overlap)
+        if overlap:
+            return second + first[overlap:]
+        return None
+
+    @staticmethod
+    def span_of(doc):
+        """청크의 원문 위치 (start, end) 반환 (위치 메타데이터가 없거나 본문 길이와 맞지 않으면 None)"""
+        start, end = doc.metadata.get('start'), doc.metadata.get('end')
+        if start is None or end is None or end - start != len(doc.page_content):
+            return None
+        return start, end
+
+    @staticmethod
+    def merge_spans(first, second):
+        """원문 위치가 맞닿거나 겹치는 두 구간 (텍스트, (시작, 끝))을 이어 붙여 반환 (떨어져 있으면 None)"""
+        (head, (head_start, head_end)), (tail, (tail_start, tail_end)) = sorted(
+            [first, second], key=lambda passage: passage[1]
+        )
+        if tail_start > head_end:
+            return None
+        if tail_end <= head_end:
+            return head, (head_start, head_end)
+        return head + tail[head_end - tail_start:], (head_start, tail_end)
+
+    @staticmethod
+    def merge_adjacent(docs):
+        """같은 출처/섹션의 청크를 연속 구간으로 병합하여 [(순위, 텍스트)] 반환 (순위 = 가장 높은 구성 청크의 순위)
+        원문 위치(start/end)가 있으면 위치가 맞닿거나 겹치는 청크만 병합하고, 없을 때만 텍스트 겹침으로 판단"""
+        passages = []  # [순위, 텍스트, (출처, 섹션), 원문 위치]
+        for rank, doc in enumerate(docs):
+            key = (doc.metadata.get('source'), doc.metadata.get('section'))
+            span = ContextCompactor.span_of(doc)
+            text = doc.page_content if span is not None else doc.page_content.strip()
+            passages.append([rank, text, key, span])
+
+        merged = True
+        while merged:  # 병합으로 생긴 구간이 다른 청크와 다시 이어질 수 있으므로 변화가 없을 때까지 반복
+            merged = False
+            for i in range(len(passages)):
+                for j in range(i + 1, len(passages)):
+                    if passages[i][2] != passages[j][2] or passages[i][2] == (None, None):
+                        continue
+                    if passages[i][3] is not None and passages[j][3] is not None:
+                        result = ContextCompactor.merge_spans(
+                            (passages[i][1], passages[i][3]), (passages[j][1], passages[j][3])
+                        )
+                        if result is None:
+                            continue
+                        text, span = result
+                    else:
+                        text, span = ContextCompactor.merge_texts(passages[i][1], passages[j][1]), None
+                        if text is None:
+                            continue
+                    passages[i] = [min(passages[i][0], passages[j][0]), text, passages[i][2], span]
+                    del passages[j]
+                    merged = True
+                    break
+                if merged:
+                    break
+        return [(rank, text) for rank, text, _, _ in passages]
+
+    @staticmethod
+    def shingles(text, n=CONTEXT_DEDUP_NGRAM):
+        compact = ''.join(text.split())  # 공백 차이는 무시
+        return {compact[i:i + n] for i in range(max(len(compact) - n + 1, 1))}
+
+    @staticmethod
+    def drop_duplicates(passages, threshold=CONTEXT_DEDUP_THRESHOLD):
+        """순위가 높은 구간부터 남기고, 이미 남긴 구간에 포함되거나 문자 n-gram 자카드 유사도가 기준 이상인 구간 제거"""
+        kept = []  # [(순위, 텍스트, n-gram 집합)]
+        for rank, text in sorted(passages):
+            grams = ContextCompactor.shingles(text)
+            duplicate = False
+            for _, kept_text, kept_grams in kept:
+                if text in kept_text or len(grams & kept_grams) / len(grams | kept_grams) >= threshold:
+                    duplicate = True
+                    break
+            if not duplicate:
+                kept.append((rank, text, grams))
+        return [(rank, text) for rank, text, _ in kept]
+
+    @staticmethod
+    def apply_budget(passages, token_budget=CONTEXT_TOKEN_BUDGET):
+        """순위 순으로 토큰 예산 안에 드는 구간만 선택 (첫 구간이 예산을 넘으면 예산 길이로 자름)"""
+        selected = []
+        remaining = token_budget
+        for rank, text in sorted(passages):
+            tokens = ContextCompactor.estimate_tokens(text)
+            if tokens <= remaining:
+                selected.append(text)
+                remaining -= tokens
+            elif not selected:
+                selected.append(text[:int(token_budget * CONTEXT_CHARS_PER_TOKEN)])
+                remaining = 0
+        return selected
+
+    @staticmethod
+    def compact(docs, token_budget=CONTEXT_TOKEN_BUDGET):
+        """관련도 순으로 정렬된 문서로 압축한 컨텍스트 본문과 통계 반환
+        통계: 원본/압축 문자 수, 절약한 문자 수, 병합/중복/예산 초과로 줄어든 구간 수"""
+        original = "\n\n".join(doc.page_content for doc in docs)  # 압축 전 컨텍스트 (기존 방식)
+        merged = ContextCompactor.merge_adjacent(docs)
+        unique = ContextCompactor.drop_duplicates(merged)
+        selected = ContextCompactor.apply_budget(unique, token_budget)
+        text = "\n\n".join(selected)
+        return text, {
+            'original_chars': len(original),
+            'compacted_chars': len(text),
+            'chars_saved': len(original) - len(text),
+            'merged': len(docs) - len(merged),
+            'duplicates': len(merged) - len(unique),
+            'over_budget': len(unique) - len(selected)
+        }
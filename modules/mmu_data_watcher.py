@@ -0,0 +1,158 @@
+# 데이터 디렉토리 변경 감지와 인덱스 무중단 교체
+# mmu_data_watcher.py
+
+import time
+import logging
+import threading
+from modules.mmu_config import DATA_DIR, INDEX_DIR, DATA_WATCH_ENABLED, DATA_WATCH_INTERVAL, DATA_WATCH_SETTLE
+from modules.mmu_file_handler import DocumentProcessor
+from modules.mmu_metadata_index import MetadataIndex
+from modules.mmu_vector_store import VectorStoreManager, SharedVectorStore
+from modules.mmu_metrics import metrics
+
+logger = logging.getLogger(__name__)
+
+class DataWatcher:
+    """DATA_DIR를 주기적으로 확인하여 바뀐 파일만 다시 분할/임베딩한 새 인덱스 버전으로 공유 저장소를 교체하는 감시자
+    새 버전은 요청 경로 밖의 감시 스레드에서 만들고 참조만 바꾸므로 검색은 대기하지 않으며,
+    진행 중인 질문은 고정한 이전 버전으로 끝까지 처리됨 (이전 버전은 마지막 질문이 끝나면 해제)"""
+    _default = None  # 프로세스 공용 감시자
+    _default_lock = threading.Lock()
+
+    def __init__(self, data_dir=DATA_DIR, embeddings=None, index_dir=INDEX_DIR, interval=DATA_WATCH_INTERVAL,
+                 settle=DATA_WATCH_SETTLE, on_swap=None):
+        self.data_dir = data_dir
+        self.embeddings = embeddings
+        self.index_dir = index_dir
+        self.interval = interval
+        self.settle = settle
+        self.on_swap = on_swap  # 교체 후 새 저장소로 호출 (FAQ 재생성 등)
+        self.stats = {'polls': 0, 'rebuilds': 0, 'swaps': 0, 'rechunked_files': 0, 'errors': 0}
+        self._signatures = {}  # 출처 -> (크기, 수정 시각)
+        self._files = {}  # 출처 -> ([(청크, 담당부서)], URL 목록)
+        self._build_lock = threading.Lock()  # 최초 로딩과 감시 스레드의 재구성이 겹치지 않도록 보호
+        self._stop = threading.Event()
+        self._thread = None
+
+    @classmethod
+    def get_default(cls, **kwargs):
+        """프로세스 공용 감시자 (처음 호출할 때의 인자로 생성)"""
+        with cls._default_lock:
+            if cls._default is None:
+                cls._default = cls(**kwargs)
+            return cls._default
+
+    @classmethod
+    def load_and_watch(cls, embeddings=None, on_error=logger.error, on_swap=None, enabled=DATA_WATCH_ENABLED):
+        """공유 저장소 로더: 벡터 저장소를 만들고 공용 감시자 시작
+        (감시하지 않으면 파일별 청크를 기억하지 않는 스트리밍 수집 경로 사용)"""
+        if not enabled:
+            metadata_index = MetadataIndex()  # 담당부서/URL 색인
+            chunks = DocumentProcessor.iter_chunks(metadata_index)
+            with VectorStoreManager.file_lock(INDEX_DIR, blocking=True):  # load와 같이 한 프로세스만 인덱스 생성
+                return VectorStoreManager.create_vector_store(chunks, metadata_index, embeddings, on_error)
+        watcher = cls.get_default(embeddings=embeddings, on_swap=on_swap)
+        vector_store = watcher.load(on_error)
+        if vector_store is not None:
+            watcher.start()
+        return vector_store
+
+    def scan(self):
+        """{출처: (카테고리, 열기 함수, 서명)} (파일 목록과 크기/수정 시각만 확인하며 내용은 읽지 않음)"""
+        return {
+            source: (category, open_text, DocumentProcessor.source_signature(open_text))
+            for category, source, open_text in DocumentProcessor.iter_text_sources(self.data_dir)
+        }
+
+    def build(self, sources, on_error=logger.error):
+        """바뀐 출처만 다시 분할하고 나머지는 기억해 둔 청크를 재사용하여 벡터 저장소 생성
+        (임베딩은 증분 재구성이 새 청크에 대해서만 수행하며, 실패하면 기억한 상태를 그대로 유지)"""
+        files, rechunked = {}, 0
+        for source, (category, open_text, signature) in sources.items():
+            if source in self._files and self._signatures.get(source) == signature:
+                files[source] = self._files[source]
+            else:
+                files[source] = DocumentProcessor.chunk_source(category, source, open_text, True)
+                rechunked += 1
+
+        metadata_index = MetadataIndex()
+        chunks = []
+        for file_chunks, urls in files.values():
+            chunk_refs = [(chunk.metadata['chunk_id'], department) for chunk, department in file_chunks]
+            DocumentProcessor.record_file_metadata(metadata_index, chunk_refs, urls)
+            chunks.extend(chunk for chunk, _ in file_chunks)
+        vector_store = VectorStoreManager.create_vector_store(chunks, metadata_index, self.embeddings, on_error, self.index_dir)
+        if vector_store is None:
+            return None
+
+        self._signatures = {source: signature for source, (_, _, signature) in sources.items()}
+        self._files = files
+        self.embeddings = self.embeddings or vector_store.embedding_function  # 이후 재구성은 같은 임베딩 사용
+        self.stats['rebuilds'] += 1
+        self.stats['rechunked_files'] += rechunked
+        metrics.observe('rechunked_files', rechunked)
+        return vector_store
+
+    def load(self, on_error=logger.error):
+        """전체 파일을 분할하여 벡터 저장소 생성 (파일별 청크를 기억해 두고 이후에는 바뀐 파일만 다시 분할)
+        여러 워커 프로세스가 동시에 시작하면 한 프로세스만 인덱스를 만들고, 나머지는 잠금을 기다렸다가
+        매니페스트가 일치하는 디스크의 인덱스를 임베딩 없이 불러옴"""
+        with self._build_lock, VectorStoreManager.file_lock(self.index_dir, blocking=True):
+            return self.build(self.scan(), on_error)
+
+    def poll(self, on_error=logger.error):
+        """바뀐 파일이 있으면 새 버전을 만들어 공유 저장소와 교체하고 새 인덱스 버전 반환 (교체하지 않았으면 None)"""
+        self.stats['polls'] += 1
+        sources = self.scan()
+        changed = [signature for source, (_, _, signature) in sources.items() if self._signatures.get(source) != signature]
+        if not changed and sources.keys() == self._signatures.keys():
+            return None
+        if any(time.time_ns() - mtime < self.settle * 1e9 for _, mtime in changed):
+            return None  # 아직 쓰는 중일 수 있는 파일은 다음 확인 때 반영
+
+        # 여러 워커 프로세스 중 하나만 재구성하고, 나머지는 다음 확인 때 디스크의 새 버전을 불러와 교체
+        with VectorStoreManager.file_lock(self.index_dir) as locked:
+            if not locked:
+                return None
+            with self._build_lock, metrics.span('index_rebuild'):
+                vector_store = self.build(sources, on_error)
+        if vector_store is None:
+            self.stats['errors'] += 1
+            return None
+        if vector_store.index_version == SharedVectorStore.current_version():
+            return None  # 내용이 같은 변경 (수정 시각만 바뀐 파일 등)
+        if not SharedVectorStore.swap(vector_store):
+            return None  # 사용 중인 핸들이 없으면 다음 로딩 때 반영
+
+        self.stats['swaps'] += 1
+        metrics.increment('index_swaps')
+        logger.info(f"데이터 변경을 반영한 인덱스 버전 {vector_store.index_version}으로 교체했습니다.")
+        if self.on_swap:
+            self.on_swap(vector_store)
+        return vector_store.index_version
+
+    def start(self):
+        """감시 스레드 시작 (이미 실행 중이면 무시)"""
+        with DataWatcher._default_lock:
+            if self._thread is not None and self._thread.is_alive():
+                return
+            self._stop.clear()
+            self._thread = threading.Thread(target=self._run, name="data-watcher", daemon=True)
+            self._thread.start()
+
+    def stop(self, timeout=None):
+        """감시 스레드 종료"""
+        self._stop.set()
+        if self._thread is not None:
+            self._thread.join(timeout)
+
+    def _run(self):
+        while not self._stop.wait(self.interval):
+            try:
+                self.poll()
+            except Exception as e:
+                self.stats['errors'] += 1
+                logger.error(f"데이터 변경 반영 중 오류 발생: {e}")
+
+
+metrics.register_gauge('index_versions_alive', SharedVectorStore.live_versions)
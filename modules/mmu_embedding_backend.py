@@ -0,0 +1,176 @@
+# 임베딩 백엔드
+# mmu_embedding_backend.py
+
+import os
+import zlib
+import hashlib
+import logging
+from functools import lru_cache
+import numpy as np
+from langchain_core.embeddings import Embeddings
+from modules.mmu_config import (
+    GOOGLE_API_KEY, EMBEDDING_BACKEND, EMBEDDING_MODEL, LOCAL_EMBEDDING_DIMENSION, LOCAL_EMBEDDING_FEATURES,
+    LOCAL_EMBEDDING_NGRAM_RANGE, LOCAL_EMBEDDING_PROJECTION_NNZ, LOCAL_EMBEDDING_IDF_PATH
+)
+from modules.mmu_lexical_index import LexicalIndex
+
+logger = logging.getLogger(__name__)
+
+class HashedTfidfEmbeddings(Embeddings):
+    """문자 n-gram을 해시 버킷으로 모은 TF-IDF 벡터를 희소 랜덤 투영으로 줄인 CPU 임베딩
+    (네트워크 호출 없이 배치 단위 희소 행렬 곱으로 계산하며, IDF는 말뭉치에서 한 번 학습하여 파일로 고정)"""
+
+    def __init__(self, dimension=LOCAL_EMBEDDING_DIMENSION, n_features=LOCAL_EMBEDDING_FEATURES,
+                 ngram_range=LOCAL_EMBEDDING_NGRAM_RANGE, nnz=LOCAL_EMBEDDING_PROJECTION_NNZ,
+                 idf_path=LOCAL_EMBEDDING_IDF_PATH, seed=0):
+        from scipy import sparse
+
+        self.dimension = dimension  # 출력 벡터 차원
+        self.n_features = n_features  # 해시 버킷 수
+        self.ngram_range = tuple(ngram_range)  # 문자 n-gram 길이
+        self.nnz = nnz  # 버킷당 투영 차원 수
+        self.idf_path = idf_path  # 학습한 IDF 저장 경로 (None이면 저장하지 않음)
+        self.idf = None  # 버킷별 IDF (fit 또는 load 전에는 None)
+        self.idf_digest = None  # 모델 식별자에 포함할 IDF 해시
+
+        # 버킷마다 nnz개 차원에 ±1/sqrt(nnz)를 두는 희소 투영 행렬 (시드가 같으면 항상 같은 행렬)
+        rng = np.random.default_rng(seed)
+        rows = np.repeat(np.arange(n_features), nnz)
+        cols = rng.integers(0, dimension, size=n_features * nnz)
+        signs = rng.choice(np.array([-1.0, 1.0], dtype=np.float32), size=n_features * nnz) / np.sqrt(nnz)
+        self.projection = sparse.csr_matrix((signs.astype(np.float32), (rows, cols)), shape=(n_features, dimension))
+        self.load()
+
+    @property
+    def model_name(self):
+        """인덱스 매니페스트와 캐시 구분에 쓰는 모델 식별자 (투영 파라미터나 IDF가 바뀌면 달라짐)"""
+        min_n, max_n = self.ngram_range
+        return f"local-tfidf/d{self.dimension}/f{self.n_features}/n{min_n}-{max_n}/k{self.nnz}/{self.idf_digest}"
+
+    @property
+    def is_fitted(self):
+        return self.idf is not None
+
+    @staticmethod
+    @lru_cache(maxsize=2 ** 18)
+    def bucket(gram, n_features):
+        """n-gram의 해시 버킷 (프로세스마다 달라지는 hash() 대신 CRC32 사용)"""
+        return zlib.crc32(gram.encode('utf-8')) % n_features
+
+    def term_frequencies(self, texts):
+        """텍스트 목록의 버킷별 로그 용어 빈도 희소 행렬 (텍스트 수 x 버킷 수)"""
+        from scipy import sparse
+
+        indptr, indices, counts = [0], [], []
+        for text in texts:
+            buckets = [HashedTfidfEmbeddings.bucket(gram, self.n_features)
+                       for gram in LexicalIndex.tokenize(text, self.ngram_range)]
+            unique, count = np.unique(np.asarray(buckets, dtype=np.int64), return_counts=True)
+            indices.append(unique)
+            counts.append(count)
+            indptr.append(indptr[-1] + len(unique))
+        data = 1.0 + np.log(np.concatenate(counts).astype(np.float32)) if counts else np.zeros(0, dtype=np.float32)
+        indices = np.concatenate(indices) if indices else np.zeros(0, dtype=np.int64)
+        return sparse.csr_matrix((data, indices, indptr), shape=(len(texts), self.n_features))
+
+    def fit(self, texts):
+        """말뭉치의 버킷별 문서 빈도로 IDF 학습"""
+        tf = self.term_frequencies(list(texts))
+        document_frequency = np.bincount(tf.indices, minlength=self.n_features)
+        self.idf = (np.log((1.0 + tf.shape[0]) / (1.0 + document_frequency)) + 1.0).astype(np.float32)
+        self.idf_digest = hashlib.sha256(self.idf.tobytes()).hexdigest()[:12]
+        return self
+
+    def load(self):
+        """저장된 IDF 불러오기 (없거나 버킷 수가 다르면 학습 전 상태 유지)"""
+        if not self.idf_path or not os.path.exists(self.idf_path):
+            return False
+        try:
+            idf = np.load(self.idf_path)
+        except (OSError, ValueError):
+            return False
+        if idf.shape != (self.n_features,):
+            logger.warning("로컬 임베딩 IDF의 버킷 수가 설정과 달라 무시합니다. (%s)", self.idf_path)
+            return False
+        self.idf = idf.astype(np.float32)
+        self.idf_digest = hashlib.sha256(self.idf.tobytes()).hexdigest()[:12]
+        return True
+
+    def save(self):
+        """학습한 IDF를 원자적으로 저장"""
+        if not self.idf_path or self.idf is None:
+            return
+        if os.path.dirname(self.idf_path):
+            os.makedirs(os.path.dirname(self.idf_path), exist_ok=True)
+        with open(self.idf_path + '.tmp', 'wb') as file:
+            np.save(file, self.idf)
+        os.replace(self.idf_path + '.tmp', self.idf_path)
+
+    def transform(self, texts):
+        """텍스트 목록을 L2 정규화된 벡터 행렬로 변환 (배치 전체를 행렬 곱 한 번으로 계산)"""
+        if self.idf is None:
+            raise RuntimeError("로컬 임베딩의 IDF가 학습되지 않았습니다. 먼저 말뭉치로 fit을 호출하세요.")
+        tf = self.term_frequencies(texts)
+        tf.data *= self.idf[tf.indices]
+        vectors = np.asarray((tf @ self.projection).todense(), dtype=np.float32)
+        norms = np.linalg.norm(vectors, axis=1, keepdims=True)
+        return vectors / np.where(norms > 0, norms, 1.0)
+
+    def embed_documents(self, texts):
+        return self.transform(texts).tolist()
+
+    def embed_query(self, text):
+        return self.transform([text])[0].tolist()
+
+
+class EmbeddingBackend:
+    """설정(EMBEDDING_BACKEND)에 따라 임베딩 모델을 만들고 저장된 인덱스와의 호환성을 확인"""
+
+    @staticmethod
+    def create(backend=EMBEDDING_BACKEND):
+        """google이면 디스크 캐시를 둔 원격 임베딩, local이면 CPU 해시 TF-IDF 임베딩 생성"""
+        if backend == 'local':
+            return HashedTfidfEmbeddings()  # 캐시 조회보다 직접 계산이 빠르므로 캐시를 두지 않음
+        if backend == 'google':
+            from langchain_google_genai import GoogleGenerativeAIEmbeddings
+            from modules.mmu_embedding_cache import CachedEmbeddings
+
+            embeddings = GoogleGenerativeAIEmbeddings(
+                model=EMBEDDING_MODEL,
+                google_api_key=GOOGLE_API_KEY
+            )
+            return CachedEmbeddings(embeddings, EMBEDDING_MODEL)
+        raise ValueError(f"지원하지 않는 임베딩 백엔드입니다: {backend}")
+
+    @staticmethod
+    def model_name(embeddings):
+        """매니페스트에 기록할 모델 식별자 (식별자가 없는 임베딩은 기존처럼 EMBEDDING_MODEL)"""
+        return getattr(embeddings, 'model_name', None) or EMBEDDING_MODEL
+
+    @staticmethod
+    def dimension(embeddings):
+        """모델 호출 없이 알 수 있는 벡터 차원 (캐시 래퍼는 벗겨서 확인, 알 수 없으면 None)"""
+        for model in (embeddings, getattr(embeddings, 'embeddings', None)):
+            if isinstance(getattr(model, 'dimension', None), int):
+                return model.dimension
+        return None
+
+    @staticmethod
+    def prepare(embeddings, texts):
+        """학습이 필요한 로컬 임베딩이면 말뭉치로 IDF를 학습하여 저장 (이미 학습된 IDF는 그대로 사용)"""
+        if isinstance(embeddings, HashedTfidfEmbeddings) and not embeddings.is_fitted:
+            logger.info("로컬 임베딩 IDF를 말뭉치로 학습합니다.")
+            embeddings.fit(texts)
+            embeddings.save()
+
+    @staticmethod
+    def check_compatibility(manifest, embeddings):
+        """저장된 인덱스 매니페스트가 현재 임베딩과 맞지 않는 이유 목록 (맞으면 빈 목록)"""
+        problems = []
+        indexed_model, model = manifest.get('embedding_model'), EmbeddingBackend.model_name(embeddings)
+        if indexed_model != model:
+            problems.append(f"임베딩 모델이 다릅니다 ({indexed_model} -> {model})")
+        indexed_dimension, dimension = manifest.get('embedding_dimension'), EmbeddingBackend.dimension(embeddings)
+        if indexed_dimension is not None and dimension is not None and indexed_dimension != dimension:
+            problems.append(f"벡터 차원이 다릅니다 ({indexed_dimension} -> {dimension})")
+        return problems
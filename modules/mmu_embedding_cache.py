@@ -0,0 +1,182 @@
+# 임베딩 캐시
+# mmu_embedding_cache.py
+
+import os
+import hashlib
+import sqlite3
+import threading
+import time
+from array import array
+from langchain_core.embeddings import Embeddings
+from modules.mmu_config import (
+    EMBEDDING_CACHE_PATH, EMBEDDING_CACHE_MAX_ENTRIES, EMBEDDING_CACHE_EVICT_FRACTION, EMBEDDING_CACHE_ACCESS_FLUSH
+)
+from modules.mmu_metrics import metrics
+
+class EmbeddingCache:
+    """모델명과 텍스트 해시를 키로 하는 디스크 임베딩 캐시 (SQLite, LRU 제거)
+    조회 경로에서 디스크에 쓰지 않도록 접근 시각은 메모리에 모았다가 저장/제거 때 한 번에 기록하고, 항목 수도 메모리에서 셈"""
+    _default = None  # 프로세스 공용 캐시
+    _default_lock = threading.Lock()
+
+    def __init__(self, path=EMBEDDING_CACHE_PATH, max_entries=EMBEDDING_CACHE_MAX_ENTRIES):
+        if os.path.dirname(path):
+            os.makedirs(os.path.dirname(path), exist_ok=True)
+        self.max_entries = max_entries  # 최대 저장 항목 수
+        self.hits = 0  # 캐시 적중 수
+        self.misses = 0  # 캐시 실패 수
+        self._lock = threading.Lock()
+        self._accessed = {}  # 아직 기록하지 않은 키 -> 마지막 접근 시각
+        self._conn = sqlite3.connect(path, check_same_thread=False)
+        self._conn.execute(
+            "CREATE TABLE IF NOT EXISTS embeddings ("
+            "key TEXT PRIMARY KEY, vector BLOB NOT NULL, last_access REAL NOT NULL)"
+        )
+        self._conn.execute("CREATE INDEX IF NOT EXISTS idx_last_access ON embeddings (last_access)")
+        self._conn.commit()
+        self._count = self._count_rows()  # 저장된 항목 수 (다른 프로세스가 추가한 항목은 제거할 때 다시 셈)
+
+    @classmethod
+    def get_default(cls):
+        """설정값으로 생성한 공용 캐시 반환"""
+        with cls._default_lock:
+            if cls._default is None:
+                cls._default = cls()
+            return cls._default
+
+    @staticmethod
+    def make_key(namespace, text):
+        """네임스페이스(모델명 등)와 텍스트 해시로 캐시 키 생성"""
+        return hashlib.sha256(f"{namespace}\x00{text}".encode('utf-8')).hexdigest()
+
+    def get_many(self, namespace, texts):
+        """텍스트 목록의 캐시된 벡터 반환 (없으면 None)"""
+        keys = [EmbeddingCache.make_key(namespace, text) for text in texts]
+        found = {}
+        with self._lock:
+            for start in range(0, len(keys), 500):  # SQLite 변수 개수 제한 대응
+                batch = keys[start:start + 500]
+                placeholders = ','.join('?' * len(batch))
+                rows = self._conn.execute(
+                    f"SELECT key, vector FROM embeddings WHERE key IN ({placeholders})", batch
+                ).fetchall()
+                found.update(rows)
+            if found:
+                now = time.time()
+                self._accessed.update((key, now) for key in found)
+                if len(self._accessed) >= EMBEDDING_CACHE_ACCESS_FLUSH:
+                    self._flush_access()
+                    self._conn.commit()
+            self.hits += sum(1 for key in keys if key in found)
+            self.misses += sum(1 for key in keys if key not in found)
+
+        vectors = []
+        for key in keys:
+            if key in found:
+                vector = array('f')
+                vector.frombytes(found[key])
+                vectors.append(vector.tolist())
+            else:
+                vectors.append(None)
+        return vectors
+
+    def put_many(self, namespace, texts, vectors):
+        """벡터 저장 후 최대 항목 수를 넘으면 오래된 항목부터 제거"""
+        now = time.time()
+        rows = [
+            (EmbeddingCache.make_key(namespace, text), array('f', vector).tobytes(), now)
+            for text, vector in zip(texts, vectors)
+        ]
+        with self._lock:
+            # 이미 있는 키는 그대로 둠 (같은 모델과 텍스트의 벡터는 같음)
+            cursor = self._conn.executemany(
+                "INSERT OR IGNORE INTO embeddings (key, vector, last_access) VALUES (?, ?, ?)", rows
+            )
+            self._count += max(cursor.rowcount, 0)
+            self._flush_access()
+            if self._count > self.max_entries:
+                self._evict()
+            self._conn.commit()
+
+    def _count_rows(self):
+        return self._conn.execute("SELECT COUNT(*) FROM embeddings").fetchone()[0]
+
+    def _flush_access(self):
+        """메모리에 모아 둔 접근 시각을 한 번에 기록 (잠금을 잡고 호출하며, 커밋은 호출자가 함)"""
+        if self._accessed:
+            self._conn.executemany(
+                "UPDATE embeddings SET last_access = ? WHERE key = ?",
+                [(accessed, key) for key, accessed in self._accessed.items()]
+            )
+            self._accessed.clear()
+
+    def _evict(self):
+        """오래된 항목부터 제거하여 최대 항목 수보다 EMBEDDING_CACHE_EVICT_FRACTION만큼 여유를 둠 (저장할 때마다 제거하지 않도록)"""
+        self._count = self._count_rows()  # 같은 파일을 쓰는 다른 프로세스의 추가분 반영
+        target = int(self.max_entries * (1 - EMBEDDING_CACHE_EVICT_FRACTION))
+        if self._count > self.max_entries:
+            cursor = self._conn.execute(
+                "DELETE FROM embeddings WHERE key IN "
+                "(SELECT key FROM embeddings ORDER BY last_access ASC LIMIT ?)",
+                (self._count - target,)
+            )
+            self._count -= cursor.rowcount
+
+    def hit_rate(self):
+        total = self.hits + self.misses
+        return self.hits / total if total else 0.0
+
+    def stats(self):
+        """캐시 적중/실패 통계"""
+        with self._lock:
+            entries = self._count
+        return {
+            'hits': self.hits,
+            'misses': self.misses,
+            'hit_rate': self.hit_rate(),
+            'entries': entries
+        }
+
+    def clear(self):
+        """캐시 전체 삭제"""
+        with self._lock:
+            self._conn.execute("DELETE FROM embeddings")
+            self._conn.commit()
+            self._accessed.clear()
+            self._count = 0
+            self.hits = 0
+            self.misses = 0
+
+
+class CachedEmbeddings(Embeddings):
+    """임의의 LangChain Embeddings 앞에 디스크 캐시를 두는 래퍼"""
+
+    def __init__(self, embeddings, model_name, cache=None):
+        self.embeddings = embeddings  # 실제 임베딩 모델
+        self.model_name = model_name  # 캐시 키에 포함할 모델명
+        self.cache = cache or EmbeddingCache.get_default()
+
+    def embed_documents(self, texts):
+        """문서 임베딩 (캐시에 없는 텍스트만 원격 호출)"""
+        namespace = f"{self.model_name}:document"  # 질문과 문서 임베딩은 서로 다른 벡터
+        vectors = self.cache.get_many(namespace, texts)
+        missing = list(dict.fromkeys(text for text, vector in zip(texts, vectors) if vector is None))
+        if missing:
+            new_vectors = self.embeddings.embed_documents(missing)
+            self.cache.put_many(namespace, missing, new_vectors)
+            computed = dict(zip(missing, new_vectors))
+            vectors = [vector if vector is not None else list(computed[text]) for text, vector in zip(texts, vectors)]
+        return vectors
+
+    def embed_query(self, text):
+        """질문 임베딩 (반복된 질문은 캐시에서 반환)"""
+        namespace = f"{self.model_name}:query"
+        vector = self.cache.get_many(namespace, [text])[0]
+        if vector is None:
+            vector = self.embeddings.embed_query(text)
+            self.cache.put_many(namespace, [text], [vector])
+        return list(vector)
+
+
+# 공용 캐시가 만들어지기 전에는 지표에서 제외됨
+metrics.register_gauge('embedding_cache_hit_rate', lambda: EmbeddingCache._default.hit_rate())
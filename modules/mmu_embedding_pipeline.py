@@ -0,0 +1,155 @@
+# 임베딩 파이프라인
+# mmu_embedding_pipeline.py
+
+import os
+import json
+import time
+import random
+import logging
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from modules.mmu_config import (
+    EMBEDDING_BATCH_SIZE, EMBEDDING_MAX_WORKERS, EMBEDDING_MAX_RETRIES, EMBEDDING_CHECKPOINT_PATH
+)
+
+logger = logging.getLogger(__name__)
+
+def is_rate_limit_error(error):
+    """할당량 초과(429) 오류인지 판별"""
+    message = str(error).lower()
+    return (
+        type(error).__name__ in ('ResourceExhausted', 'RateLimitError', 'TooManyRequests')
+        or '429' in message
+        or 'quota' in message
+        or 'resource has been exhausted' in message
+    )
+
+
+class AdaptiveLimiter:
+    """할당량 오류 시 동시 요청 수를 절반으로 줄이고, 성공이 이어지면 하나씩 늘리는 제한기"""
+
+    def __init__(self, max_limit):
+        self.max_limit = max(1, max_limit)  # 최대 동시 요청 수
+        self.limit = self.max_limit  # 현재 허용 동시 요청 수
+        self._active = 0
+        self._successes = 0
+        self._condition = threading.Condition()
+
+    def acquire(self):
+        with self._condition:
+            while self._active >= self.limit:
+                self._condition.wait()
+            self._active += 1
+
+    def release(self, rate_limited=False):
+        with self._condition:
+            self._active -= 1
+            if rate_limited:
+                self.limit = max(1, self.limit // 2)
+                self._successes = 0
+            else:
+                self._successes += 1
+                if self._successes >= self.limit and self.limit < self.max_limit:
+                    self.limit += 1
+                    self._successes = 0
+            self._condition.notify_all()
+
+
+class EmbeddingPipeline:
+    """청크를 배치 단위로 병렬 임베딩하고 중단 시 이어서 처리하는 파이프라인"""
+
+    def __init__(self, embeddings, namespace, batch_size=EMBEDDING_BATCH_SIZE, max_workers=EMBEDDING_MAX_WORKERS,
+                 max_retries=EMBEDDING_MAX_RETRIES, checkpoint_path=EMBEDDING_CHECKPOINT_PATH,
+                 initial_backoff=1.0, max_backoff=60.0):
+        self.embeddings = embeddings  # LangChain Embeddings 객체
+        self.namespace = namespace  # 체크포인트 구분용 (모델명 등)
+        self.batch_size = batch_size
+        self.max_workers = max_workers
+        self.max_retries = max_retries
+        self.checkpoint_path = checkpoint_path  # None이면 체크포인트 미사용
+        self.initial_backoff = initial_backoff
+        self.max_backoff = max_backoff
+        self.stats = {}
+        self._lock = threading.Lock()
+        self._resumable = None  # 이전 실행의 체크포인트에 있는 청크 ID (첫 embed 호출 시 확인)
+
+    def load_checkpoint(self, wanted=None):
+        """이전 실행에서 완료된 임베딩 불러오기 (wanted를 지정하면 해당 청크만)"""
+        done = {}
+        if not self.checkpoint_path or not os.path.exists(self.checkpoint_path):
+            return done
+        with open(self.checkpoint_path, 'r', encoding='utf-8') as file:
+            for line in file:
+                try:
+                    record = json.loads(line)
+                except ValueError:
+                    continue  # 중단 시점에 잘린 마지막 줄
+                if record.get('namespace') == self.namespace and (wanted is None or record['id'] in wanted):
+                    done[record['id']] = record['vector']
+        return done
+
+    def clear_checkpoint(self):
+        """인덱스 반영이 끝난 뒤 체크포인트 삭제"""
+        if self.checkpoint_path and os.path.exists(self.checkpoint_path):
+            os.remove(self.checkpoint_path)
+
+    def _write_checkpoint(self, vectors_by_id):
+        if not self.checkpoint_path:
+            return
+        with self._lock:
+            if os.path.dirname(self.checkpoint_path):
+                os.makedirs(os.path.dirname(self.checkpoint_path), exist_ok=True)
+            with open(self.checkpoint_path, 'a', encoding='utf-8') as file:
+                for chunk_id, vector in vectors_by_id.items():
+                    file.write(json.dumps({'namespace': self.namespace, 'id': chunk_id, 'vector': list(vector)}) + '\n')
+
+    def _embed_batch(self, batch, limiter):
+        """배치 하나를 임베딩 (할당량 오류 시 지수 백오프 후 재시도)"""
+        ids = [chunk_id for chunk_id, _ in batch]
+        texts = [text for _, text in batch]
+        delay = self.initial_backoff
+        for attempt in range(self.max_retries + 1):
+            limiter.acquire()
+            try:
+                vectors = self.embeddings.embed_documents(texts)
+            except Exception as e:
+                rate_limited = is_rate_limit_error(e)
+                limiter.release(rate_limited=rate_limited)
+                if not rate_limited or attempt == self.max_retries:
+                    raise
+                with self._lock:
+                    self.stats['retries'] += 1
+                time.sleep(delay * (1 + random.random()))  # 지터를 포함한 백오프
+                delay = min(delay * 2, self.max_backoff)
+                continue
+            limiter.release()
+            vectors_by_id = dict(zip(ids, vectors))
+            self._write_checkpoint(vectors_by_id)
+            with self._lock:
+                self.stats['embedded'] += len(vectors_by_id)
+            return vectors_by_id
+
+    def embed(self, texts_by_id):
+        """{청크 ID: 텍스트}를 임베딩하여 {청크 ID: 벡터} 반환"""
+        started = time.perf_counter()
+        if self._resumable is None:
+            self._resumable = set(self.load_checkpoint())  # 배치마다 embed를 호출해도 이전 체크포인트는 한 번만 확인
+        resumable = self._resumable & texts_by_id.keys()
+        results = self.load_checkpoint(resumable) if resumable else {}
+        pending = [(chunk_id, text) for chunk_id, text in texts_by_id.items() if chunk_id not in results]
+        batches = [pending[i:i + self.batch_size] for i in range(0, len(pending), self.batch_size)]
+        self.stats = {'total': len(texts_by_id), 'resumed': len(results), 'embedded': 0, 'batches': len(batches), 'retries': 0}
+
+        limiter = AdaptiveLimiter(self.max_workers)
+        with ThreadPoolExecutor(max_workers=self.max_workers) as executor:
+            for vectors_by_id in executor.map(lambda batch: self._embed_batch(batch, limiter), batches):
+                results.update(vectors_by_id)
+
+        elapsed = time.perf_counter() - started
+        self.stats['seconds'] = elapsed
+        self.stats['chunks_per_sec'] = self.stats['embedded'] / elapsed if elapsed > 0 else 0.0
+        logger.info(
+            "임베딩 완료: %d개 (이어서 처리 %d개), %.1f chunks/sec, 재시도 %d회",
+            self.stats['embedded'], self.stats['resumed'], self.stats['chunks_per_sec'], self.stats['retries']
+        )
+        return results
@@ -0,0 +1,97 @@
+# 로컬 테스트용 가짜 모델
+# mmu_fakes.py
+
+import time
+import random
+import hashlib
+import threading
+import numpy as np
+from langchain_core.embeddings import Embeddings
+from langchain_core.language_models.chat_models import BaseChatModel
+from langchain_core.messages import AIMessage, AIMessageChunk
+from langchain_core.outputs import ChatGeneration, ChatGenerationChunk, ChatResult
+from pydantic import PrivateAttr
+
+class FakeRateLimitError(Exception):
+    """원격 API의 할당량 초과 오류를 흉내 낸 예외"""
+
+
+class FakeEmbeddings(Embeddings):
+    """네트워크 없이 결정적인 벡터를 돌려주고 지연과 429 오류를 흉내 내는 임베딩"""
+
+    def __init__(self, dimension=768, latency=0.0, error_rate=0.0, seed=0):
+        self.dimension = dimension  # 벡터 차원
+        self.latency = latency  # 호출당 지연 시간(초)
+        self.error_rate = error_rate  # 429 오류 발생 확률
+        self.calls = 0  # 호출 횟수
+        self._random = random.Random(seed)
+        self._lock = threading.Lock()
+
+    def _maybe_fail(self):
+        with self._lock:
+            self.calls += 1
+            failed = self._random.random() < self.error_rate
+        if self.latency:
+            time.sleep(self.latency)
+        if failed:
+            raise FakeRateLimitError("429 Resource has been exhausted (e.g. check quota).")
+
+    def _vector(self, text):
+        """텍스트 해시를 시드로 한 단위 벡터"""
+        seed = int.from_bytes(hashlib.sha256(text.encode('utf-8')).digest()[:8], 'big')
+        vector = np.random.default_rng(seed).standard_normal(self.dimension)
+        return (vector / np.linalg.norm(vector)).tolist()
+
+    def embed_documents(self, texts):
+        self._maybe_fail()
+        return [self._vector(text) for text in texts]
+
+    def embed_query(self, text):
+        self._maybe_fail()
+        return self._vector(text)
+
+
+class FakeChatModel(BaseChatModel):
+    """네트워크 없이 답변 형식에 맞는 결정적인 응답을 만들고 지연과 오류를 흉내 내는 채팅 모델"""
+    latency: float = 0.0  # 첫 토큰까지의 지연 시간(초)
+    token_delay: float = 0.0  # 스트리밍 토큰 사이 지연 시간(초)
+    error_rate: float = 0.0  # 호출 실패 확률
+    seed: int = 0
+    _random: random.Random = PrivateAttr()
+    _lock: threading.Lock = PrivateAttr()
+
+    def __init__(self, **kwargs):
+        super().__init__(**kwargs)
+        self._random = random.Random(self.seed)
+        self._lock = threading.Lock()
+
+    @property
+    def _llm_type(self):
+        return "mmu-fake-chat"
+
+    def _answer(self, messages):
+        """프롬프트 길이와 질문에 따라 달라지는 답변 생성"""
+        prompt = messages[-1].content if messages else ''
+        question = prompt.rsplit('질문:', 1)[-1].split('\n', 1)[0].strip() if '질문:' in prompt else prompt[:40]
+        with self._lock:
+            failed = self._random.random() < self.error_rate
+        if self.latency:
+            time.sleep(self.latency)
+        if failed:
+            raise FakeRateLimitError("429 Resource has been exhausted (e.g. check quota).")
+        digest = hashlib.sha256(prompt.encode('utf-8')).hexdigest()[:8]
+        return (
+            f"📌 핵심 요약:\n{question}에 대한 답변입니다. (컨텍스트 {len(prompt)}자, {digest})\n\n"
+            "📋 상세 내용:\n•**중요 내용 1**•**중요 내용 2**\n•상세 내용 3\n\n"
+            "📚 참고:\n- 담당부서: 교무처(☎ 240-7042)"
+        )
+
+    def _generate(self, messages, stop=None, run_manager=None, **kwargs):
+        return ChatResult(generations=[ChatGeneration(message=AIMessage(content=self._answer(messages)))])
+
+    def _stream(self, messages, stop=None, run_manager=None, **kwargs):
+        text = self._answer(messages)
+        for start in range(0, len(text), 4):  # 4글자씩 토큰처럼 전송
+            if self.token_delay:
+                time.sleep(self.token_delay)
+            yield ChatGenerationChunk(message=AIMessageChunk(content=text[start:start + 4]))
@@ -0,0 +1,208 @@
+# FAQ 사전 계산
+# mmu_faq.py
+
+import os
+import json
+import time
+import logging
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from modules.mmu_config import (
+    FAQ_QUESTIONS_PATH, FAQ_TABLE_PATH, FAQ_WORKERS, FAQ_MAX_RETRIES, FAQ_RETRY_BACKOFF
+)
+from modules.mmu_answer_cache import AnswerCache
+from modules.mmu_vector_store import VectorStoreManager
+from modules.mmu_response_formatter import ResponseFormatter
+
+logger = logging.getLogger(__name__)
+
+class FaqTable:
+    """인덱스 버전별로 미리 생성한 답변을 정규화된 질문으로 조회하는 FAQ 테이블
+    (JSON 파일 하나로 저장하며, 다른 프로세스가 파일을 교체하면 다음 조회 때 다시 읽음)"""
+
+    def __init__(self, path=FAQ_TABLE_PATH):
+        self.path = path
+        self.index_version = None  # 테이블 답변이 기반한 인덱스 버전
+        self.failed = []  # 마지막 생성에서 답변하지 못한 질문 (다음 재생성 때 이 질문들만 다시 시도)
+        self.stats = {'hits': 0, 'misses': 0}
+        self._entries = {}  # 정규화된 질문 -> 항목
+        self._mtime = None
+        self._lock = threading.Lock()
+
+    def _reload(self):
+        """파일이 바뀐 경우에만 다시 읽기"""
+        try:
+            mtime = os.stat(self.path).st_mtime_ns
+        except OSError:
+            self.index_version, self.failed, self._entries, self._mtime = None, [], {}, None
+            return
+        if mtime == self._mtime:
+            return
+        try:
+            with open(self.path, 'r', encoding='utf-8') as file:
+                data = json.load(file)
+        except (OSError, ValueError):
+            return  # 쓰는 중이거나 손상된 파일은 이전 내용 유지
+        self.index_version = data.get('index_version')
+        self.failed = data.get('failed', [])
+        self._entries = data.get('entries', {})
+        self._mtime = mtime
+
+    def get(self, question, index_version):
+        """현재 인덱스 버전으로 만든 항목이 있으면 반환"""
+        with self._lock:
+            self._reload()
+            entry = None
+            if index_version is not None and index_version == self.index_version:
+                entry = self._entries.get(AnswerCache.normalize_question(question))
+            self.stats['hits' if entry else 'misses'] += 1
+            return entry
+
+    def is_fresh(self, index_version):
+        """테이블이 현재 인덱스 버전으로 모든 질문에 답변되어 있는지 여부 (실패한 질문이 남아 있으면 False)"""
+        with self._lock:
+            self._reload()
+            return self.index_version is not None and self.index_version == index_version and not self.failed
+
+    def entries(self, index_version):
+        """현재 인덱스 버전으로 만든 항목 사본 (버전이 다르면 빈 사전)"""
+        with self._lock:
+            self._reload()
+            return dict(self._entries) if index_version is not None and index_version == self.index_version else {}
+
+    def save(self, index_version, entries, failed=()):
+        """테이블 전체를 원자적으로 교체 (failed: 답변하지 못한 질문 목록)"""
+        if os.path.dirname(self.path):
+            os.makedirs(os.path.dirname(self.path), exist_ok=True)
+        with open(self.path + '.tmp', 'w', encoding='utf-8') as file:
+            json.dump({
+                'index_version': index_version, 'created': time.time(), 'entries': entries, 'failed': list(failed)
+            }, file, ensure_ascii=False)
+        with self._lock:
+            os.replace(self.path + '.tmp', self.path)
+            # 같은 프로세스는 바로 새 내용 사용 (수정 시각 해상도가 낮아 연속 저장을 구분하지 못할 수 있음)
+            self.index_version, self.failed, self._entries = index_version, list(failed), dict(entries)
+            self._mtime = os.stat(self.path).st_mtime_ns
+
+    def __len__(self):
+        with self._lock:
+            self._reload()
+            return len(self._entries)
+
+    def hit_rate(self):
+        total = self.stats['hits'] + self.stats['misses']
+        return self.stats['hits'] / total if total else 0.0
+
+class FaqRunner:
+    """질문 목록을 작업자 풀에서 병렬로 답변하여 FAQ 테이블을 만드는 배치 실행기"""
+    _refresh_thread = None  # 프로세스당 하나의 백그라운드 재생성
+    _refresh_lock = threading.Lock()
+
+    @staticmethod
+    def load_questions(path=FAQ_QUESTIONS_PATH):
+        """질문 파일(한 줄에 한 질문, #으로 시작하는 줄은 주석) 읽기 (정규화 기준 중복 제거)"""
+        questions, seen = [], set()
+        with open(path, 'r', encoding='utf-8') as file:
+            for line in file:
+                question = line.strip()
+                if not question or question.startswith('#'):
+                    continue
+                key = AnswerCache.normalize_question(question)
+                if key not in seen:
+                    seen.add(key)
+                    questions.append(question)
+        return questions
+
+    @staticmethod
+    def answer(question, vector_store, chain, max_retries=FAQ_MAX_RETRIES, backoff=FAQ_RETRY_BACKOFF):
+        """질문 하나를 검색과 생성으로 답변하여 FAQ 항목 반환 (실패하면 지수 백오프로 재시도)"""
+        from modules.mmu_response_generator import ResponseGenerator
+
+        for attempt in range(max_retries + 1):
+            try:
+                prepared = ResponseGenerator.prepare_question(question, vector_store, {}, use_faq=False)
+                response = prepared['response']
+                if response is None:
+                    response = chain.invoke({"question": question, "context": prepared['context']})
+                return {
+                    'question': question,
+                    'response': response,
+                    'formatted': ResponseFormatter.format_response(response),
+                    'doc_ids': [doc.metadata.get('chunk_id') for doc in prepared['docs']],
+                    'department_info': prepared.get('department_info')
+                }
+            except Exception as e:
+                if attempt == max_retries:
+                    raise
+                delay = backoff * (2 ** attempt)
+                logger.warning(f"FAQ 답변 실패, {delay:.1f}초 후 재시도 ({attempt + 1}/{max_retries}): {question} - {e}")
+                time.sleep(delay)
+
+    @staticmethod
+    def run(vector_store, questions, chat_model=None, table=None, workers=FAQ_WORKERS,
+            max_retries=FAQ_MAX_RETRIES, backoff=FAQ_RETRY_BACKOFF, on_progress=None, reuse=True):
+        """질문들을 병렬로 답변하여 FAQ 테이블을 현재 인덱스 버전으로 교체하고 통계 반환
+        (reuse면 같은 인덱스 버전으로 이미 답변한 질문은 다시 생성하지 않으므로, 실패했던 질문과 새 질문만 생성)"""
+        from modules.mmu_response_generator import ResponseGenerator
+
+        table = table if table is not None else ResponseGenerator.faq_table  # 빈 테이블도 거짓이므로 None과 구분
+        vector_store = ResponseGenerator.pin_version(vector_store)  # 도중에 인덱스가 교체되어도 한 버전으로 답변
+        index_version = getattr(vector_store, 'index_version', None)
+        chain = ResponseGenerator.get_enhanced_rag_chain(chat_model)
+        previous = table.entries(index_version) if reuse else {}
+        entries = {key: previous[key] for key in map(AnswerCache.normalize_question, questions) if key in previous}
+        pending = [question for question in questions if AnswerCache.normalize_question(question) not in entries]
+        reused, failures = len(entries), []
+        started = time.perf_counter()
+
+        def task(question):
+            return question, FaqRunner.answer(question, vector_store, chain, max_retries, backoff)
+
+        with ThreadPoolExecutor(max_workers=max(1, workers)) as executor:
+            futures = [executor.submit(task, question) for question in pending]
+            for done, future in enumerate(futures, start=1):
+                try:
+                    question, entry = future.result()
+                    entries[AnswerCache.normalize_question(question)] = entry
+                except Exception as e:
+                    failures.append({'question': pending[done - 1], 'error': str(e)})
+                if on_progress:
+                    on_progress(done, len(pending))
+
+        if entries:
+            # 실패한 질문을 함께 기록하여 테이블이 최신으로 간주되지 않게 함 (다음 재생성 때 다시 시도)
+            table.save(index_version, entries, [failure['question'] for failure in failures])
+        return {
+            'index_version': index_version,
+            'questions': len(questions),
+            'answered': len(entries),
+            'reused': reused,
+            'failed': failures,
+            'seconds': time.perf_counter() - started
+        }
+
+    @classmethod
+    def refresh_in_background(cls, vector_store, chat_model=None, questions_path=FAQ_QUESTIONS_PATH, table=None):
+        """FAQ 테이블이 현재 인덱스 버전과 다르면 백그라운드 스레드에서 재생성 (질문 파일이 없으면 무시)"""
+        from modules.mmu_response_generator import ResponseGenerator
+
+        table = table if table is not None else ResponseGenerator.faq_table  # 빈 테이블도 거짓이므로 None과 구분
+        if not os.path.exists(questions_path) or table.is_fresh(getattr(vector_store, 'index_version', None)):
+            return None
+        with cls._refresh_lock:
+            if cls._refresh_thread is not None and cls._refresh_thread.is_alive():
+                return cls._refresh_thread
+
+            def refresh():
+                with VectorStoreManager.file_lock(table.path) as locked:
+                    if not locked:
+                        return  # 다른 프로세스가 재생성 중
+                    try:
+                        stats = FaqRunner.run(vector_store, FaqRunner.load_questions(questions_path), chat_model, table)
+                        logger.info(f"FAQ 테이블 재생성 완료: {stats['answered']}/{stats['questions']}개 ({stats['seconds']:.1f}초)")
+                    except Exception as e:
+                        logger.error(f"FAQ 테이블 재생성 실패: {e}")
+
+            cls._refresh_thread = threading.Thread(target=refresh, name="faq-refresh", daemon=True)
+            cls._refresh_thread.start()
+            return cls._refresh_thread
@@ -1,87 +1,221 @@
 # 문서 처리
 # mmu_file_handler.py
 
+import io
 import os
-import streamlit as st
 import re
-from langchain_core.documents.base import Document
-from langchain.text_splitter import RecursiveCharacterTextSplitter
-from modules.mmu_config import DATA_DIR, CHUNK_SIZE, CHUNK_OVERLAP
+import hashlib
+import json
+import logging
+import zipfile
+import functools
+import multiprocessing
+from collections import deque
+from contextlib import contextmanager
+from concurrent.futures import ProcessPoolExecutor
+from modules.mmu_config import DATA_DIR, INGEST_READ_SIZE, INGEST_WORKERS
+from modules.mmu_metadata_index import MetadataIndex
+from modules.mmu_chunker import SectionChunker
+
+logger = logging.getLogger(__name__)
+
+ZIP_UNICODE_ESCAPE = re.compile(r'#U([0-9A-Fa-f]{4})')  # 일부 압축 프로그램이 쓰는 "#Uacc4" 형식 파일명
+ZIP_UTF8_FLAG = 0x800  # 파일명이 UTF-8로 기록되었음을 나타내는 플래그
 
 class DocumentProcessor:
     @staticmethod
-    def get_text_files():
-        text_files = {}
+    def decode_zip_name(info):
+        """압축 파일 멤버 이름 복원 (UTF-8 플래그가 없으면 cp437로 읽힌 이름을 UTF-8/CP949로 다시 해석)"""
+        name = info.filename
+        if not info.flag_bits & ZIP_UTF8_FLAG:
+            raw = name.encode('cp437')
+            for encoding in ('utf-8', 'cp949'):
+                try:
+                    name = raw.decode(encoding)
+                    break
+                except UnicodeDecodeError:
+                    continue
+        return ZIP_UNICODE_ESCAPE.sub(lambda match: chr(int(match.group(1), 16)), name)
+
+    @staticmethod
+    @contextmanager
+    def open_zip_member(archive_path, member_name):
+        """압축 파일 멤버를 풀지 않고 텍스트 스트림으로 열기"""
+        with zipfile.ZipFile(archive_path) as archive, archive.open(member_name) as member:
+            yield io.TextIOWrapper(member, encoding='utf-8')
+
+    @staticmethod
+    def iter_text_sources(data_dir=DATA_DIR):
+        """(카테고리, 출처 경로, 텍스트 스트림 열기 함수)를 차례로 반환 (일반 파일 우선, 같은 카테고리의 압축 파일 멤버는 건너뜀)"""
+        names = sorted(os.listdir(data_dir))
+        seen = set()
+        for name in names:
+            if name.endswith('.txt'):
+                category = os.path.splitext(name)[0]
+                seen.add(category)
+                path = os.path.join(data_dir, name)
+                yield category, path, functools.partial(open, path, 'r', encoding='utf-8')
+
+        for name in names:
+            if not name.endswith('.zip'):
+                continue
+            archive_path = os.path.join(data_dir, name)
+            with zipfile.ZipFile(archive_path) as archive:
+                members = [(DocumentProcessor.decode_zip_name(info), info) for info in archive.infolist() if not info.is_dir()]
+            for member_name, info in sorted(members, key=lambda item: item[0]):
+                if not member_name.endswith('.txt'):
+                    continue
+                category = os.path.splitext(os.path.basename(member_name))[0]
+                if category in seen:
+                    continue  # 압축을 푼 파일이 함께 있으면 그 파일을 사용
+                seen.add(category)
+                # 열기 함수는 작업 프로세스로 전달할 수 있도록 pickle 가능한 partial로 구성
+                open_member = functools.partial(DocumentProcessor.open_zip_member, archive_path, info.filename)
+                yield category, os.path.join(archive_path, member_name), open_member
+
+    @staticmethod
+    def source_signature(open_text):
+        """변경 감지용 출처 서명 (크기, 수정 시각) - 압축 파일 멤버는 압축 파일 기준"""
+        stat = os.stat(open_text.args[0])  # 열기 함수의 첫 인자: 파일 또는 압축 파일 경로
+        return stat.st_size, stat.st_mtime_ns
+
+    @staticmethod
+    def get_text_files(data_dir=DATA_DIR, on_error=logger.error):
+        """{카테고리: data_dir 기준 상대 경로} 반환 (압축 파일 멤버 포함)"""
         try:
-            for file in os.listdir(DATA_DIR):
-                if file.endswith('.txt'):
-                    category = os.path.splitext(file)[0]
-                    text_files[category] = file
-            return text_files
+            return {
+                category: os.path.relpath(source, data_dir)
+                for category, source, _ in DocumentProcessor.iter_text_sources(data_dir)
+            }
         except Exception as e:
-            st.error(f"파일 목록 불러오기 실패: {e}")
+            on_error(f"파일 목록 불러오기 실패: {e}")
             return {}
 
     @staticmethod
-    def process_multiple_text_files():
-        """텍스트 파일들을 처리하여 Document 객체 리스트 생성"""
-        all_documents = []
-        text_files = DocumentProcessor.get_text_files()
-        
+    def iter_sections(stream, read_size=INGEST_READ_SIZE):
+        """텍스트 스트림을 블록 단위로 읽으며 빈 줄로 구분된 섹션을 (원문 기준 시작 위치, 섹션)으로 차례로 반환
+        (파일 전체를 읽지 않으며, 위치는 디코딩된 원문의 글자 단위)"""
+        buffer, offset = '', 0  # offset: buffer 첫 글자의 원문 위치
+        while True:
+            block = stream.read(read_size)
+            if not block:
+                break
+            parts = (buffer + block).split('\n\n')
+            buffer = parts.pop()  # 마지막 조각은 다음 블록과 이어질 수 있음
+            for part in parts:
+                section = part.strip()
+                if section:
+                    yield offset + len(part) - len(part.lstrip()), section
+                offset += len(part) + 2
+        if buffer.strip():
+            yield offset + len(buffer) - len(buffer.lstrip()), buffer.strip()
+
+    @staticmethod
+    def compute_chunk_id(doc):
+        """청크 내용과 메타데이터로부터 콘텐츠 해시 ID 생성"""
+        # 원문 위치는 제외하여 앞부분이 바뀌어도 내용이 같은 청크는 같은 ID 유지
+        metadata = {k: v for k, v in doc.metadata.items() if k not in ('chunk_id', 'start', 'end')}
+        payload = doc.page_content + '\x00' + json.dumps(metadata, ensure_ascii=False, sort_keys=True)
+        return hashlib.sha256(payload.encode('utf-8')).hexdigest()
+
+    @staticmethod
+    def iter_source_chunks(category, source, open_text, urls=None):
+        """파일 하나를 섹션 단위로 분할하여 (청크, 담당부서 문자열)을 차례로 반환 (urls를 넘기면 파일의 URL을 모음)
+        청크는 섹션 본문(첫 줄 제목 제외)을 조항 경계 우선으로 나눈 구간이며, 원문 위치를 start/end 메타데이터로 기록"""
+        from langchain_core.documents.base import Document
+
+        with open_text() as stream:
+            for i, (offset, section) in enumerate(DocumentProcessor.iter_sections(stream)):
+                newline = section.find('\n')
+                title = section[:newline] if newline >= 0 else section
+                content_start = newline + 1 if newline >= 0 else 0
+
+                # 담당부서 정보는 섹션 단위로 한 번만 추출
+                department = None
+                if urls is not None:
+                    urls.extend(MetadataIndex.find_urls(section))
+                    department = MetadataIndex.find_department(section[content_start:])
+
+                for start, end in SectionChunker.split(section, content_start):
+                    chunk = Document(
+                        page_content=section[start:end],  # 구간이 정해진 뒤 청크마다 한 번만 잘라 씀
+                        metadata={
+                            'source': source,
+                            'category': category,
+                            'section': i + 1,
+                            'title': title,
+                            'start': offset + start,
+                            'end': offset + end
+                        }
+                    )
+                    chunk.metadata['chunk_id'] = DocumentProcessor.compute_chunk_id(chunk)  # 증분 재구성을 위한 청크 ID
+                    yield chunk, department
+
+    @staticmethod
+    def chunk_source(category, source, open_text, collect_metadata):
+        """작업 프로세스에서 파일 하나를 청크로 분할하여 ([(청크, 담당부서)], URL 목록) 반환"""
+        urls = [] if collect_metadata else None
+        chunks = list(DocumentProcessor.iter_source_chunks(category, source, open_text, urls))
+        return chunks, urls or []
+
+    @staticmethod
+    def iter_parallel_source_chunks(sources, collect_metadata, workers):
+        """파일을 프로세스 풀에 나눠 분할하고 제출 순서대로 ([(청크, 담당부서)], URL 목록) 반환"""
+        # Streamlit 같은 다중 스레드 프로세스에서 fork하지 않도록 spawn 사용
+        with ProcessPoolExecutor(max_workers=workers, mp_context=multiprocessing.get_context('spawn')) as executor:
+            pending = deque()
+            for category, source, open_text in sources:
+                pending.append(executor.submit(DocumentProcessor.chunk_source, category, source, open_text, collect_metadata))
+                if len(pending) >= workers * 2:  # 결과가 쌓이지 않도록 진행 중인 파일 수 제한
+                    yield pending.popleft().result()
+            while pending:
+                yield pending.popleft().result()
+
+    @staticmethod
+    def iter_chunks(metadata_index=None, data_dir=DATA_DIR, workers=INGEST_WORKERS):
+        """파일과 압축 파일 멤버를 하나씩 읽어 섹션 단위로 분할한 청크를 생성되는 대로 반환하는 제너레이터
+        (workers가 2 이상이면 파일을 프로세스 풀에서 분할하며, 청크 순서와 ID는 단일 프로세스 실행과 같음)"""
+        workers = workers or os.cpu_count() or 1
+        sources = DocumentProcessor.iter_text_sources(data_dir)
+        collect_metadata = metadata_index is not None
+        if workers > 1:
+            results = DocumentProcessor.iter_parallel_source_chunks(sources, collect_metadata, workers)
+        else:
+            def serial_results():
+                for category, source, open_text in sources:
+                    urls = [] if collect_metadata else None
+                    yield DocumentProcessor.iter_source_chunks(category, source, open_text, urls), urls
+            results = serial_results()
+
+        for file_chunks, urls in results:
+            chunk_refs = []  # (청크 ID, 담당부서)
+            for chunk, department in file_chunks:
+                if collect_metadata:
+                    chunk_refs.append((chunk.metadata['chunk_id'], department))
+                yield chunk
+            if collect_metadata:
+                DocumentProcessor.record_file_metadata(metadata_index, chunk_refs, urls)
+
+    @staticmethod
+    def record_file_metadata(metadata_index, chunk_refs, urls):
+        """파일 하나의 (청크 ID, 담당부서) 목록과 URL을 metadata_index에 기록
+        (URL은 파일 끝 섹션에 모여 있으므로 파일을 다 읽은 뒤 청크에 연결)"""
+        url_ids = metadata_index.intern_urls(urls)
+        for chunk_id, department in chunk_refs:
+            metadata_index.add_chunk(chunk_id, metadata_index.intern_department(department), url_ids)
+
+    @staticmethod
+    def process_multiple_text_files(metadata_index=None, data_dir=DATA_DIR, on_error=logger.error):
+        """텍스트 파일들을 처리하여 Document 객체 리스트 생성 (담당부서/URL은 metadata_index에 기록)"""
         try:
-            if not text_files:
+            if not DocumentProcessor.get_text_files(data_dir, on_error):
                 raise Exception("텍스트 파일을 찾을 수 없습니다.")
-                
-            for category, filename in text_files.items():
-                file_path = os.path.join(DATA_DIR, filename)
-                if os.path.exists(file_path):
-                    with open(file_path, 'r', encoding='utf-8') as file:
-                        text = file.read()
-                    
-                    # URL 추출 (텍스트에서 URL 패턴 찾기)
-                    url_pattern = r'https?://[^\s]+'
-                    urls = re.findall(url_pattern, text)
-
-                    sections = [section.strip() for section in text.split('\n\n') if section.strip()]
-                    
-                    for i, section in enumerate(sections):
-                        lines = section.split('\n')
-                        title = lines[0] if lines else ""
-                        content = '\n'.join(lines[1:]) if len(lines) > 1 else section
-                        
-                        doc = Document(
-                            page_content=content,
-                            metadata={
-                                'source': file_path,
-                                'category': category,
-                                'section': i + 1,
-                                'title': title,
-                                'urls': urls  # URL 정보 추가
-                            }
-                        )
-                        all_documents.append(doc)
-            
-            if not all_documents:
+
+            chunks = list(DocumentProcessor.iter_chunks(metadata_index, data_dir))
+            if not chunks:
                 raise Exception("처리할 문서가 없습니다.")
-                
-            text_splitter = RecursiveCharacterTextSplitter(
-                chunk_size=CHUNK_SIZE,
-                chunk_overlap=CHUNK_OVERLAP,
-                separators=[
-                    "\n\n",  # 큰 단락 구분
-                    "\n1. ", "\n2. ", "\n3. ",  # 주요 항목 구분
-                    "\n가. ", "\n나. ", "\n다. ", "\n라. ",  # 세부 항목 구분
-                    "\n", # 일반 줄바꿈
-                    ". ",  # 문장 구분
-                    ", ", # 구문 구분
-                    " "  # 단어 구분
-                ],
-                length_function=len,
-                is_separator_regex=False
-            )
-            
-            return text_splitter.split_documents(all_documents)
-            
+            return chunks
+
         except Exception as e:
-            st.error(f"텍스트 파일 처리 중 오류 발생: {e}")
-            return None
\ No newline at end of file
+            on_error(f"텍스트 파일 처리 중 오류 발생: {e}")
+            return None
@@ -0,0 +1,116 @@
+# 어휘 검색 인덱스
+# mmu_lexical_index.py
+
+import os
+import re
+import json
+from collections import Counter
+import numpy as np
+from modules.mmu_config import LEXICAL_NGRAM_RANGE, BM25_K1, BM25_B
+
+TOKEN_PATTERN = re.compile(r'[^\w\s]')
+
+class LexicalIndex:
+    """청크의 문자 n-gram에 대한 BM25 역색인 (문서 x 용어 희소 가중치 행렬)"""
+
+    def __init__(self, chunk_ids, vocabulary, weights):
+        self.chunk_ids = list(chunk_ids)  # 행 번호 -> 청크 ID
+        self.vocabulary = vocabulary  # n-gram -> 열 번호
+        self.weights = weights.tocsr()  # BM25 가중치 (청크 수 x 용어 수)
+
+    @staticmethod
+    def tokenize(text, ngram_range=LEXICAL_NGRAM_RANGE):
+        """공백으로 나눈 단어별 문자 n-gram 추출 (정확한 용어 일치를 위해 단어 자체도 포함)"""
+        min_n, max_n = ngram_range
+        grams = []
+        for word in TOKEN_PATTERN.sub(' ', text.lower()).split():
+            if len(word) < min_n or len(word) > max_n:
+                grams.append(word)
+            for n in range(min_n, max_n + 1):
+                grams.extend(word[i:i + n] for i in range(len(word) - n + 1))
+        return grams
+
+    @classmethod
+    def build(cls, documents_by_id):
+        """{청크 ID: Document}로부터 BM25 가중치 행렬 생성"""
+        from scipy import sparse
+
+        chunk_ids = list(documents_by_id)
+        vocabulary = {}
+        rows, cols, counts, lengths = [], [], [], []
+        for row, chunk_id in enumerate(chunk_ids):
+            term_counts = Counter(cls.tokenize(documents_by_id[chunk_id].page_content))
+            lengths.append(sum(term_counts.values()))
+            for term, count in term_counts.items():
+                rows.append(row)
+                cols.append(vocabulary.setdefault(term, len(vocabulary)))
+                counts.append(count)
+
+        shape = (len(chunk_ids), len(vocabulary))
+        tf = sparse.csr_matrix((np.asarray(counts, dtype=np.float32), (rows, cols)), shape=shape)
+        lengths = np.asarray(lengths, dtype=np.float32)
+        avg_length = lengths.mean() if len(lengths) else 0.0
+
+        # IDF와 문서 길이 정규화를 미리 반영하여 질의 시에는 행렬-벡터 곱만 수행
+        document_frequency = np.bincount(tf.indices, minlength=shape[1]).astype(np.float32)
+        idf = np.log(1.0 + (shape[0] - document_frequency + 0.5) / (document_frequency + 0.5))
+        norm = BM25_K1 * (1 - BM25_B + BM25_B * lengths / (avg_length or 1.0))
+        tf_rows = np.repeat(np.arange(shape[0]), np.diff(tf.indptr))
+        data = tf.data * (BM25_K1 + 1) / (tf.data + norm[tf_rows]) * idf[tf.indices]
+        weights = sparse.csr_matrix((data.astype(np.float32), tf.indices, tf.indptr), shape=shape)
+        return cls(chunk_ids, vocabulary, weights)
+
+    def _query_vector(self, query):
+        """(어휘에 있는 n-gram 열 번호, 출현 횟수, 어휘에 없는 것을 포함한 질의 n-gram 종류 수)"""
+        all_counts = Counter(LexicalIndex.tokenize(query))
+        term_counts = {term: count for term, count in all_counts.items() if term in self.vocabulary}
+        columns = [self.vocabulary[term] for term in term_counts]
+        values = np.asarray(list(term_counts.values()), dtype=np.float32)
+        return columns, values, len(all_counts)
+
+    def search(self, query, k):
+        """BM25 점수 상위 k개의 (청크 ID, 점수, 질의 n-gram 포함 비율) 반환
+        (포함 비율의 분모는 말뭉치에 없는 n-gram까지 센 전체 질의 n-gram 수)"""
+        columns, values, total_terms = self._query_vector(query)
+        if not columns or not self.chunk_ids:
+            return []
+        matched = self.weights[:, columns]
+        scores = matched @ values
+        k = min(k, len(scores))
+        top = np.argpartition(-scores, k - 1)[:k]
+        top = top[np.argsort(-scores[top])]
+        coverage = np.asarray((matched[top] > 0).sum(axis=1)).ravel() / total_terms
+        return [
+            (self.chunk_ids[row], float(scores[row]), float(cov))
+            for row, cov in zip(top, coverage) if scores[row] > 0
+        ]
+
+    def save(self, directory):
+        """인덱스를 디렉토리에 저장"""
+        from scipy import sparse
+
+        sparse.save_npz(os.path.join(directory, 'lexical.npz'), self.weights)
+        with open(os.path.join(directory, 'lexical.json'), 'w', encoding='utf-8') as file:
+            json.dump({'chunk_ids': self.chunk_ids, 'vocabulary': self.vocabulary}, file, ensure_ascii=False)
+
+    @classmethod
+    def load(cls, directory):
+        """저장된 인덱스 불러오기 (없으면 None)"""
+        from scipy import sparse
+
+        matrix_path = os.path.join(directory, 'lexical.npz')
+        meta_path = os.path.join(directory, 'lexical.json')
+        if not os.path.exists(matrix_path) or not os.path.exists(meta_path):
+            return None
+        with open(meta_path, 'r', encoding='utf-8') as file:
+            meta = json.load(file)
+        return cls(meta['chunk_ids'], meta['vocabulary'], sparse.load_npz(matrix_path))
+
+
+def reciprocal_rank_fusion(rankings, k):
+    """여러 순위 목록을 RRF 점수로 합친 ID 목록 반환"""
+    scores = {}
+    for ranking in rankings:
+        for rank, item in enumerate(ranking):
+            scores[item] = scores.get(item, 0.0) + 1.0 / (k + rank + 1)
+    return sorted(scores, key=scores.get, reverse=True)
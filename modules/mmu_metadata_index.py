@@ -0,0 +1,73 @@
+# 담당부서/URL 메타데이터 색인
+# mmu_metadata_index.py
+
+import os
+import re
+import json
+
+DEPARTMENT_PATTERN = re.compile(r'담당부서[^\n]*?([^()]+\(☎\s*\d{3}-\d{4}\))', re.DOTALL)  # 담당부서 (☎ xxx-xxxx)
+URL_PATTERN = re.compile(r'https?://[^\s]+')
+METADATA_FILE = 'metadata.json'
+
+class MetadataIndex:
+    """수집 시 한 번 추출한 담당부서/URL 문자열을 중복 없이 보관하고 청크 ID로 조회하는 색인"""
+
+    def __init__(self, departments=None, urls=None, chunks=None):
+        self.departments = departments or []  # 담당부서 문자열 (ID = 목록 위치)
+        self.urls = urls or []  # URL 문자열 (ID = 목록 위치)
+        self.chunks = chunks or {}  # 청크 ID -> [담당부서 ID 또는 None, URL ID 목록]
+        self._department_ids = {value: i for i, value in enumerate(self.departments)}
+        self._url_ids = {value: i for i, value in enumerate(self.urls)}
+
+    @staticmethod
+    def find_department(text):
+        """텍스트에서 첫 번째 담당부서 정보 추출"""
+        match = DEPARTMENT_PATTERN.search(text)
+        return match.group(1).strip() if match else None
+
+    @staticmethod
+    def find_urls(text):
+        """텍스트에서 URL 추출"""
+        return URL_PATTERN.findall(text)
+
+    def intern_department(self, department):
+        """담당부서 문자열을 ID로 변환 (없으면 None)"""
+        if not department:
+            return None
+        if department not in self._department_ids:
+            self._department_ids[department] = len(self.departments)
+            self.departments.append(department)
+        return self._department_ids[department]
+
+    def intern_urls(self, urls):
+        """URL 목록을 ID 목록으로 변환"""
+        ids = []
+        for url in urls:
+            if url not in self._url_ids:
+                self._url_ids[url] = len(self.urls)
+                self.urls.append(url)
+            ids.append(self._url_ids[url])
+        return ids
+
+    def add_chunk(self, chunk_id, department_id, url_ids):
+        self.chunks[chunk_id] = [department_id, list(url_ids)]
+
+    def lookup(self, chunk_id):
+        """청크 ID의 (담당부서, URL 목록) 반환"""
+        department_id, url_ids = self.chunks.get(chunk_id, (None, []))
+        department = self.departments[department_id] if department_id is not None else None
+        return department, [self.urls[url_id] for url_id in url_ids]
+
+    def save(self, directory):
+        with open(os.path.join(directory, METADATA_FILE), 'w', encoding='utf-8') as file:
+            json.dump({'departments': self.departments, 'urls': self.urls, 'chunks': self.chunks}, file, ensure_ascii=False)
+
+    @classmethod
+    def load(cls, directory):
+        """저장된 색인 불러오기 (없으면 None)"""
+        path = os.path.join(directory, METADATA_FILE)
+        if not os.path.exists(path):
+            return None
+        with open(path, 'r', encoding='utf-8') as file:
+            data = json.load(file)
+        return cls(data['departments'], data['urls'], data['chunks'])
@@ -0,0 +1,184 @@
+# 성능 지표 수집
+# mmu_metrics.py
+
+import time
+import json
+import threading
+from collections import defaultdict, deque
+from contextlib import contextmanager
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+import numpy as np
+from modules.mmu_config import METRICS_WINDOW, METRICS_HOST
+
+QUANTILES = (0.5, 0.95, 0.99)
+
+class Metrics:
+    """질문 처리 단계별 지연 시간, 문자 수, 카운터를 최근 구간 기준으로 모으는 경량 계측기"""
+
+    def __init__(self, window=METRICS_WINDOW):
+        self.window = window  # 백분위수 계산에 사용할 최근 관측 수
+        self._lock = threading.Lock()
+        self._durations = defaultdict(lambda: deque(maxlen=self.window))  # 단계 -> 최근 지연 시간(초)
+        self._duration_totals = defaultdict(lambda: [0, 0.0])  # 단계 -> [누적 횟수, 누적 시간]
+        self._values = defaultdict(lambda: deque(maxlen=self.window))  # 이름 -> 최근 관측값 (문자 수 등)
+        self._counters = defaultdict(float)  # 이름 -> 누적 값
+        self._gauges = {}  # 이름 -> 현재 값을 돌려주는 함수
+        self._server = None
+
+    @contextmanager
+    def span(self, stage):
+        """with 블록의 실행 시간을 단계 지연 시간으로 기록"""
+        started = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.record_duration(stage, time.perf_counter() - started)
+
+    def record_duration(self, stage, seconds):
+        with self._lock:
+            self._durations[stage].append(seconds)
+            totals = self._duration_totals[stage]
+            totals[0] += 1
+            totals[1] += seconds
+
+    def observe(self, name, value):
+        """문자 수 같은 관측값 기록"""
+        with self._lock:
+            self._values[name].append(value)
+
+    def increment(self, name, value=1):
+        with self._lock:
+            self._counters[name] += value
+
+    def register_gauge(self, name, function):
+        """조회 시점에 계산되는 값 등록 (예: 캐시 적중률)"""
+        self._gauges[name] = function
+
+    @staticmethod
+    def _quantiles(values):
+        return {q: float(np.quantile(values, q)) for q in QUANTILES} if values else {}
+
+    def snapshot(self):
+        """현재 지표를 사전으로 반환"""
+        with self._lock:
+            durations = {stage: list(values) for stage, values in self._durations.items()}
+            totals = {stage: list(values) for stage, values in self._duration_totals.items()}
+            values = {name: list(items) for name, items in self._values.items()}
+            counters = dict(self._counters)
+        gauges = {}
+        for name, function in list(self._gauges.items()):
+            try:
+                gauges[name] = float(function())
+            except Exception:
+                continue  # 아직 초기화되지 않은 대상은 건너뜀
+        return {
+            'stages': {
+                stage: {'count': totals[stage][0], 'sum': totals[stage][1], 'quantiles': Metrics._quantiles(samples)}
+                for stage, samples in durations.items()
+            },
+            'values': {
+                name: {'count': len(samples), 'sum': float(sum(samples)), 'quantiles': Metrics._quantiles(samples)}
+                for name, samples in values.items()
+            },
+            'counters': counters,
+            'gauges': gauges
+        }
+
+    def to_prometheus(self):
+        """Prometheus 텍스트 형식으로 변환"""
+        snapshot = self.snapshot()
+        lines = [
+            "# HELP mmu_stage_duration_seconds Question pipeline stage latency.",
+            "# TYPE mmu_stage_duration_seconds summary"
+        ]
+        for stage, data in sorted(snapshot['stages'].items()):
+            for q, value in data['quantiles'].items():
+                lines.append(f'mmu_stage_duration_seconds{{stage="{stage}",quantile="{q}"}} {value:.6f}')
+            lines.append(f'mmu_stage_duration_seconds_sum{{stage="{stage}"}} {data["sum"]:.6f}')
+            lines.append(f'mmu_stage_duration_seconds_count{{stage="{stage}"}} {data["count"]}')
+        lines += ["# HELP mmu_observed_value Observed sizes such as prompt characters.", "# TYPE mmu_observed_value summary"]
+        for name, data in sorted(snapshot['values'].items()):
+            for q, value in data['quantiles'].items():
+                lines.append(f'mmu_observed_value{{name="{name}",quantile="{q}"}} {value:.3f}')
+            lines.append(f'mmu_observed_value_sum{{name="{name}"}} {data["sum"]:.3f}')
+            lines.append(f'mmu_observed_value_count{{name="{name}"}} {data["count"]}')
+        lines += ["# HELP mmu_events_total Pipeline event counters.", "# TYPE mmu_events_total counter"]
+        for name, value in sorted(snapshot['counters'].items()):
+            lines.append(f'mmu_events_total{{name="{name}"}} {value:g}')
+        lines += ["# HELP mmu_gauge Point-in-time values such as cache hit rates.", "# TYPE mmu_gauge gauge"]
+        for name, value in sorted(snapshot['gauges'].items()):
+            lines.append(f'mmu_gauge{{name="{name}"}} {value:g}')
+        return '\n'.join(lines) + '\n'
+
+    def to_otel_json(self, service_name="mmu_talk"):
+        """OpenTelemetry OTLP/JSON 지표 형식으로 변환"""
+        snapshot = self.snapshot()
+        now = str(time.time_ns())
+
+        def summary_points(items, key):
+            return [{
+                'attributes': [{'key': key, 'value': {'stringValue': name}}],
+                'timeUnixNano': now,
+                'count': str(data['count']),
+                'sum': data['sum'],
+                'quantileValues': [{'quantile': q, 'value': value} for q, value in data['quantiles'].items()]
+            } for name, data in sorted(items.items())]
+
+        def number_points(items):
+            return [{
+                'attributes': [{'key': 'name', 'value': {'stringValue': name}}],
+                'timeUnixNano': now,
+                'asDouble': value
+            } for name, value in sorted(items.items())]
+
+        return {'resourceMetrics': [{
+            'resource': {'attributes': [{'key': 'service.name', 'value': {'stringValue': service_name}}]},
+            'scopeMetrics': [{
+                'scope': {'name': 'mmu_talk.metrics'},
+                'metrics': [
+                    {'name': 'mmu.stage.duration', 'unit': 's', 'summary': {'dataPoints': summary_points(snapshot['stages'], 'stage')}},
+                    {'name': 'mmu.observed.value', 'unit': '1', 'summary': {'dataPoints': summary_points(snapshot['values'], 'name')}},
+                    {'name': 'mmu.events', 'unit': '1', 'sum': {
+                        'dataPoints': number_points(snapshot['counters']),
+                        'aggregationTemporality': 2,  # CUMULATIVE
+                        'isMonotonic': True
+                    }},
+                    {'name': 'mmu.gauge', 'unit': '1', 'gauge': {'dataPoints': number_points(snapshot['gauges'])}}
+                ]
+            }]
+        }]}
+
+    def start_http_server(self, port, host=METRICS_HOST):
+        """/metrics (Prometheus)와 /metrics.json (OTLP/JSON)을 제공하는 HTTP 서버 시작 (프로세스당 한 번)"""
+        with self._lock:
+            if self._server is not None:
+                return self._server
+            self._server = ThreadingHTTPServer((host, port), self._handler())
+        threading.Thread(target=self._server.serve_forever, daemon=True).start()
+        return self._server
+
+    def _handler(self):
+        metrics = self
+
+        class Handler(BaseHTTPRequestHandler):
+            def do_GET(self):
+                if self.path == '/metrics':
+                    body, content_type = metrics.to_prometheus().encode('utf-8'), 'text/plain; version=0.0.4'
+                elif self.path == '/metrics.json':
+                    body, content_type = json.dumps(metrics.to_otel_json()).encode('utf-8'), 'application/json'
+                else:
+                    self.send_error(404)
+                    return
+                self.send_response(200)
+                self.send_header('Content-Type', content_type)
+                self.send_header('Content-Length', str(len(body)))
+                self.end_headers()
+                self.wfile.write(body)
+
+            def log_message(self, format, *args):
+                pass  # 스크레이프 요청은 로그에 남기지 않음
+
+        return Handler
+
+
+metrics = Metrics()  # 프로세스 공용 계측기
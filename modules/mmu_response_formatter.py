@@ -4,58 +4,78 @@
 class ResponseFormatter:
     @staticmethod
     def format_response(response: str) -> str:
-        """응답 텍스트를 보기 좋게 포매팅"""
-        formatted_sections = []  # 포매팅된 섹션을 저장할 리스트
-        
-        # 응답을 주요 섹션으로 분리
-        sections = response.split('\n')
-        current_section = []  # 현재 섹션을 저장할 리스트
-        
-        for line in sections:
-            line = line.strip()  # 줄 앞뒤 공백 제거
-            if not line:
-               continue  # 빈 줄은 건너뛰기
-            
-           # 새로운 섹션 시작
-            if any(line.startswith(marker) for marker in ['📌', '📋', '📚', '💡']):
-                if current_section:
-                    formatted_sections.append('\n'.join(current_section))   # 현재 섹션을 포맷된 섹션에 추가
-                    current_section = [] # 현재 섹션 초기화
-                current_section.append(line) 
-                if not line.endswith(':'):  # 섹션 제목이 아닌 경우에만 빈 줄 추가
-                    current_section.append('')  # 섹션 내용과 제목 사이 빈 줄 추가
-                continue
-        
-            # 불릿 포인트 처리
-            if line.startswith('•'):
-                # 여러 불릿 포인트가 한 줄에 있는 경우 분리
-                bullet_points = line.split('•')[1:]  # 첫 번째 빈 문자열 제거
-                for point in bullet_points:
-                    if point.strip():  # 불릿 포인트가 비어있지 않은 경우
-                        current_section.append(f"  • {point.strip()}")  # 불릿 포인트 포맷팅
-                        current_section.append('')  # 각 불릿 포인트 뒤에 빈 줄 추가
-                continue
-            
-            current_section.append(line)  # 일반적인 줄 추가
-    
-        # 마지막 섹션 추가
-        if current_section:
-            formatted_sections.append('\n'.join(current_section))  # 마지막 섹션을 포맷된 섹션에 추가
-    
-        # 최종 텍스트 조합
-        formatted_text = '\n\n'.join(formatted_sections)  # 모든 섹션을 줄바꿈으로 조합
-    
-        # 중복되는 빈 줄 제거 및 정리
-        lines = formatted_text.split('\n')
-        cleaned_lines = []  # 정리된 줄을 저장할 리스트
-        prev_empty = False  # 이전 줄이 빈 줄인지 여부
-    
+        """응답 텍스트를 보기 좋게 포매팅 (줄 단위 한 번의 순회로 섹션 구분, 불릿 분리, 빈 줄 정리)"""
+        formatter = StreamingResponseFormatter()
+        formatter.feed(response)  # 전체 응답을 조각 하나로 처리
+        return formatter.finish()
+
+class StreamingResponseFormatter:
+    """스트리밍 응답 조각을 받아 확정된 줄부터 점진적으로 포매팅 (결과는 format_response와 동일)"""
+    SECTION_MARKERS = ('📌', '📋', '📚', '💡')
+
+    def __init__(self):
+        self.raw_text = ''  # 지금까지 받은 원본 응답
+        self._pending = ''  # 아직 줄바꿈이 오지 않은 마지막 줄
+        self._lines = []  # 확정된 포맷 줄
+        self._has_content = False  # 섹션 구분용 빈 줄이 필요한지 여부
+        self._prev_empty = False  # 마지막 확정 줄이 빈 줄인지 여부
+
+    def _emit(self, line):
+        """중복 빈 줄을 합치면서 확정 줄 추가"""
+        if line:
+            self._lines.append(line)
+            self._prev_empty = False
+        elif not self._prev_empty:
+            self._lines.append(line)
+            self._prev_empty = True
+
+    def _process_line(self, line):
+        line = line.strip()  # 줄 앞뒤 공백 제거
+        if not line:
+            return  # 빈 줄은 건너뛰기
+
+        # 새로운 섹션 시작
+        if line.startswith(self.SECTION_MARKERS):
+            if self._has_content:
+                self._emit('')  # 섹션 사이 빈 줄
+            self._emit(line)
+            self._has_content = True
+            if not line.endswith(':'):
+                self._emit('')
+            return
+
+        # 불릿 포인트 처리 (한 줄에 여러 개가 있으면 분리)
+        if line.startswith('•'):
+            for point in line.split('•')[1:]:
+                if point.strip():
+                    self._emit(f"  • {point.strip()}")
+                    self._emit('')
+                    self._has_content = True
+            return
+
+        self._emit(line)
+        self._has_content = True
+
+    @property
+    def formatted(self):
+        """완성된 줄까지의 확정 포맷 결과 (이후 조각이 와도 바뀌지 않는 접두부)"""
+        return '\n'.join(self._lines)
+
+    def feed(self, chunk):
+        """응답 조각을 추가하고 화면 표시용 텍스트(확정 접두부 + 작성 중인 줄) 반환"""
+        self.raw_text += chunk
+        lines = (self._pending + chunk).split('\n')
+        self._pending = lines.pop()  # 마지막 줄은 조각 경계에서 잘렸을 수 있음
         for line in lines:
-            if line.strip():  # 줄이 비어있지 않은 경우
-                cleaned_lines.append(line)  # 정리된 줄에 추가
-                prev_empty = False  # 이전 줄은 비어있지 않음
-            elif not prev_empty:  # 이전 줄이 비어있지 않았을 경우
-                cleaned_lines.append(line)  # 빈 줄 추가
-                prev_empty = True  # 이전 줄은 비어있음
-    
-        return '\n'.join(cleaned_lines)  # 정리된 줄을 문자열로 반환
\ No newline at end of file
+            self._process_line(line)
+
+        partial = self._pending.strip()
+        if not partial:
+            return self.formatted
+        return f"{self.formatted}\n{partial}" if self._lines else partial
+
+    def finish(self):
+        """남은 줄을 처리하고 최종 포맷 결과 반환"""
+        self._process_line(self._pending)
+        self._pending = ''
+        return self.formatted
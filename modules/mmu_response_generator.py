@@ -1,21 +1,43 @@
 # 응답 생성
 # mmu_respones_generator.py
-import streamlit as st
-import google.generativeai as genai
-import re
-from langchain_google_genai import ChatGoogleGenerativeAI
-from langchain.prompts import PromptTemplate
-from langchain_core.runnables import Runnable
-from langchain.schema.output_parser import StrOutputParser
-from modules.mmu_config import GOOGLE_API_KEY, CHAT_MODEL, TOP_K
+import time
+import logging
+import functools
+import threading
+from contextlib import contextmanager
+from concurrent.futures import ThreadPoolExecutor
+from modules.mmu_config import (
+    GOOGLE_API_KEY, CHAT_MODEL, TOP_K, HYBRID_CANDIDATES, RRF_K,
+    LEXICAL_FAST_PATH_COVERAGE, LEXICAL_FAST_PATH_MARGIN, SINGLE_FLIGHT_ENABLED,
+    CHAT_BACKEND, FAKE_CHAT_LATENCY, FAKE_CHAT_TOKEN_DELAY, FAKE_CHAT_ERROR_RATE
+)
+from modules.mmu_answer_cache import AnswerCache
+from modules.mmu_faq import FaqTable
+from modules.mmu_single_flight import SingleFlight
+from modules.mmu_context_compactor import ContextCompactor
+from modules.mmu_lexical_index import reciprocal_rank_fusion
+from modules.mmu_metadata_index import MetadataIndex
+from modules.mmu_metrics import metrics
+
+logger = logging.getLogger(__name__)
+
+
+class GenerationBacklogFull(Exception):
+    """대기 중인 답변 생성이 max_pending개에 도달하여 새 질문을 받을 수 없음 (API는 503으로 응답)"""
 
 
 class ResponseGenerator:
-    @staticmethod
-    # === RAG 체인 개선 ===
-    def get_enhanced_rag_chain():
-        """개선된 RAG 프롬프트 체인 생성"""
-        template = """
+    answer_cache = AnswerCache()  # 프로세스 전체에서 공유하는 답변 캐시
+    in_flight = SingleFlight(SINGLE_FLIGHT_ENABLED)  # 생성 중인 동일 질문 병합
+    faq_table = FaqTable()  # 배치로 미리 생성한 자주 묻는 질문 답변
+    llm_slots = None  # 동시 LLM 호출 수 제한 (None이면 제한 없음, limit_llm_concurrency로 설정)
+    llm_active = 0  # 진행 중인 LLM 호출 수
+    generation_pool = None  # 답변 생성 작업자 풀 (None이면 질문마다 스레드 생성, limit_llm_concurrency로 설정)
+    generation_pending = 0  # 작업자 풀에서 대기 중이거나 진행 중인 생성 수
+    max_pending = None  # generation_pending 상한 (None이면 제한 없음)
+    _llm_lock = threading.Lock()
+    # 답변 생성 프롬프트 (프롬프트 크기 측정에도 사용)
+    RAG_TEMPLATE = """
         다음의 컨텍스트를 기반으로 질문에 답변해주세요:
 
         컨텍스트: {context}
@@ -46,8 +68,19 @@ class ResponseGenerator:
         (URL 정보가 있는 경우 표시)
         """
 
-        prompt = PromptTemplate.from_template(template)  # 프롬프트 템플릿 생성
-        model = ChatGoogleGenerativeAI(
+    @staticmethod
+    # === RAG 체인 개선 ===
+    def get_enhanced_rag_chain(chat_model=None):
+        """개선된 RAG 프롬프트 체인 생성 (chat_model을 지정하면 해당 모델 사용)"""
+        from langchain.prompts import PromptTemplate
+        from langchain.schema.output_parser import StrOutputParser
+
+        prompt = PromptTemplate.from_template(ResponseGenerator.RAG_TEMPLATE)  # 프롬프트 템플릿 생성
+        if chat_model is None and CHAT_BACKEND == 'fake':
+            chat_model = ResponseGenerator.get_fake_chat_model()
+        if chat_model is None:
+            from langchain_google_genai import ChatGoogleGenerativeAI
+        model = chat_model or ChatGoogleGenerativeAI(
             model=CHAT_MODEL,
             temperature=0.3,
             google_api_key=GOOGLE_API_KEY
@@ -55,60 +88,360 @@ class ResponseGenerator:
         return prompt | model | StrOutputParser()  # 프롬프트, 모델, 출력 파서를 연결하여 반환
     
     @staticmethod
-    def process_question(question: str, vector_store):
-        """사용자 질문 처리 및 응답 생성"""
+    @functools.lru_cache(maxsize=1)
+    def get_fake_chat_model():
+        """CHAT_BACKEND=fake일 때 쓰는 가짜 채팅 모델 (프로세스당 하나를 공유하여 실패 확률이 호출마다 적용됨)"""
+        from modules.mmu_fakes import FakeChatModel
+
+        return FakeChatModel(latency=FAKE_CHAT_LATENCY, token_delay=FAKE_CHAT_TOKEN_DELAY, error_rate=FAKE_CHAT_ERROR_RATE)
+
+    @staticmethod
+    def limit_llm_concurrency(limit, max_pending=None):
+        """프로세스 전체에서 동시에 진행할 LLM 호출 수 제한 (None이면 제한 해제)
+        제한하면 답변 생성도 limit개 작업자 풀에서 실행하여 스레드가 질문 수만큼 늘지 않게 하고,
+        대기 중인 생성이 max_pending개에 도달하면 새 질문을 GenerationBacklogFull로 거절"""
+        ResponseGenerator.llm_slots = threading.BoundedSemaphore(limit) if limit else None
+        previous = ResponseGenerator.generation_pool
+        ResponseGenerator.generation_pool = (
+            ThreadPoolExecutor(max_workers=limit, thread_name_prefix="answer-generation") if limit else None
+        )
+        ResponseGenerator.max_pending = max_pending
+        if previous is not None:
+            previous.shutdown(wait=False)  # 이미 받은 생성은 이전 풀에서 끝까지 진행
+
+    @staticmethod
+    @contextmanager
+    def llm_slot():
+        """LLM 호출 자리가 날 때까지 대기한 뒤 호출 수를 세는 구간"""
+        slots = ResponseGenerator.llm_slots
+        if slots is not None:
+            slots.acquire()
+        with ResponseGenerator._llm_lock:
+            ResponseGenerator.llm_active += 1
         try:
-            # 이전 컨텍스트 저장을 위한 세션 상태 초기화
-            if 'last_department_info' not in st.session_state:
-               st.session_state.last_department_info = None
+            yield
+        finally:
+            with ResponseGenerator._llm_lock:
+                ResponseGenerator.llm_active -= 1
+            if slots is not None:
+                slots.release()
+
+    @staticmethod
+    def get_documents(vector_store, chunk_ids):
+        """청크 ID로 문서 조회 (삭제된 문서 제외)"""
+        docs = [vector_store.docstore.search(chunk_id) for chunk_id in chunk_ids]
+        return [doc for doc in docs if not isinstance(doc, str)]
+
+    @staticmethod
+    def search_lexical(question: str, vector_store):
+        """어휘 검색 결과와 어휘 단독 검색으로 충분한지 여부 반환"""
+        lexical_index = getattr(vector_store, 'lexical_index', None)
+        if lexical_index is None:
+            return [], False
+        with metrics.span('lexical_search'):
+            hits = lexical_index.search(question, HYBRID_CANDIDATES)
+        # 질의 n-gram을 거의 모두 포함하고 2위와 점수 차가 충분하면 임베딩 호출 생략
+        confident = bool(hits) and hits[0][2] >= LEXICAL_FAST_PATH_COVERAGE and (
+            len(hits) == 1 or hits[0][1] >= LEXICAL_FAST_PATH_MARGIN * hits[1][1]
+        )
+        return [chunk_id for chunk_id, _, _ in hits], confident
+
+    @staticmethod
+    def retrieve_documents(question: str, vector_store, embedding, lexical_ids):
+        """벡터 검색 결과와 어휘 검색 결과를 RRF로 합쳐 상위 문서 반환"""
+        if embedding is None:
+            return ResponseGenerator.get_documents(vector_store, lexical_ids[:TOP_K])  # 어휘 단독 검색
+
+        # 카테고리 샤드 저장소는 질문과 관련 있는 샤드만 검색
+        route = getattr(vector_store, 'route', None)
+        categories = route(question, embedding) if route else None
+        k = HYBRID_CANDIDATES if lexical_ids else TOP_K
+        with metrics.span('vector_search'):
+            if categories is None:
+                dense_docs = vector_store.similarity_search_by_vector(embedding, k=k)
+            else:
+                metrics.observe('shards_searched', len(categories))
+                dense_docs = vector_store.similarity_search_by_vector(embedding, k=k, categories=categories)
+        if not lexical_ids:
+            return dense_docs[:TOP_K]
+
+        docs_by_id = {doc.metadata.get('chunk_id'): doc for doc in dense_docs}
+        dense_ids = [doc.metadata.get('chunk_id') for doc in dense_docs]
+        fused_ids = reciprocal_rank_fusion([dense_ids, lexical_ids], RRF_K)[:TOP_K]
+        missing_ids = [chunk_id for chunk_id in fused_ids if chunk_id not in docs_by_id]
+        for doc in ResponseGenerator.get_documents(vector_store, missing_ids):
+            docs_by_id[doc.metadata.get('chunk_id')] = doc
+        return [docs_by_id[chunk_id] for chunk_id in fused_ids if chunk_id in docs_by_id]
+
+    @staticmethod
+    def pin_version(vector_store):
+        """질문 하나를 처리하는 동안 같은 인덱스 버전을 쓰도록 고정 (공유 핸들이 아니면 그대로 반환)"""
+        pin = getattr(vector_store, 'pin', None)
+        return pin() if pin else vector_store
+
+    @staticmethod
+    def prepare_question(question: str, vector_store, session=None, use_faq=True):
+        """FAQ 테이블과 답변 캐시 조회, 관련 문서 검색 및 컨텍스트 구성 (session: 이전 담당부서 정보를 담는 사전형 대화 상태)"""
+        # 이전 컨텍스트 저장을 위한 세션 상태 초기화
+        session = {} if session is None else session
+        if 'last_department_info' not in session:
+            session['last_department_info'] = None
+        vector_store = ResponseGenerator.pin_version(vector_store)  # 검색 도중 새 버전으로 교체되어도 같은 버전 사용
+        index_version = getattr(vector_store, 'index_version', None)
+
+        # 미리 생성한 FAQ 답변이 있으면 검색 없이 반환 (현재 인덱스 버전으로 만든 항목만 사용)
+        if use_faq:
+            with metrics.span('faq_lookup'):
+                faq = ResponseGenerator.faq_table.get(question, index_version)
+            if faq:
+                metrics.increment('faq_hits')
+                if faq['department_info']:
+                    session['last_department_info'] = faq['department_info']
+                return {
+                    'embedding': None,
+                    'index_version': index_version,
+                    'response': faq['response'],
+                    'formatted': faq['formatted'],
+                    'docs': ResponseGenerator.get_documents(vector_store, faq['doc_ids']),
+                    'department_info': faq['department_info']
+                }
+
+        # 정규화된 질문이 정확히 일치하는 캐시 답변은 임베딩 호출 없이 반환
+        prepared = {'embedding': None, 'index_version': index_version, 'response': None}
+        with metrics.span('answer_cache'):
+            cached = ResponseGenerator.answer_cache.get_exact(question, index_version)
+
+        if not cached:
+            # 어휘 검색이 확실하면 질문 임베딩 호출 생략
+            lexical_ids, confident = ResponseGenerator.search_lexical(question, vector_store)
+            if confident:
+                metrics.increment('lexical_fast_path')
+            else:
+                with metrics.span('query_embedding'):
+                    prepared['embedding'] = vector_store.embedding_function.embed_query(question)
 
-            # 관련 문서 검색
-            retriever = vector_store.as_retriever(search_kwargs={"k": TOP_K})  # 벡터 저장소에서 검색기 생성
-            docs = retriever.invoke(question)  # 질문에 대해 관련 문서 검색
+            # 유사 질문 캐시 확인 (질문 임베딩은 검색과 캐시 조회에 함께 사용)
+            with metrics.span('answer_cache'):
+                cached = ResponseGenerator.answer_cache.get_similar(index_version, prepared['embedding'])
+        metrics.increment('answer_cache_hits' if cached else 'answer_cache_misses')
+        if cached:
+            if cached['department_info']:
+                session['last_department_info'] = cached['department_info']
+            prepared['response'] = cached['response']
+            prepared['docs'] = ResponseGenerator.get_documents(vector_store, cached['doc_ids'])
+            prepared['department_info'] = cached['department_info']
+            return prepared
 
-            # URL 정보 수집
-            urls = []
-            department_info = None
+        # 관련 문서 검색 (벡터 + 어휘 하이브리드)
+        docs = ResponseGenerator.retrieve_documents(question, vector_store, prepared['embedding'], lexical_ids)
+        with metrics.span('context_build'):
+            context, found_department_info, context_stats = ResponseGenerator.build_context(docs, vector_store, session)
+        metrics.observe('context_chars', len(context))
+        metrics.observe('context_chars_saved', context_stats['chars_saved'])
+        logger.debug(f"컨텍스트 압축: {context_stats}")
+        metrics.observe('prompt_chars', len(ResponseGenerator.RAG_TEMPLATE.format(question=question, context=context)))
 
-            # 현재 문서에서 담당부서 정보 찾기
+        prepared.update({
+            'docs': docs, 'context': context, 'department_info': found_department_info, 'context_stats': context_stats
+        })
+        return prepared
+
+    @staticmethod
+    def build_context(docs, vector_store, session=None):
+        """검색된 문서와 담당부서/URL 정보로 컨텍스트 구성 (컨텍스트, 새로 찾은 담당부서, 압축 통계) 반환
+        문서 본문은 같은 섹션의 겹치는 청크 병합, 중복 제거, 토큰 예산 적용 후 사용"""
+        session = {} if session is None else session
+        # URL 정보 수집
+        urls = []
+        department_info = None
+        found_department_info = None  # 이번 검색 결과에서 찾은 담당부서 정보
+
+        # 현재 문서에서 담당부서 정보 찾기 (수집 시 만든 색인을 조회)
+        metadata_index = getattr(vector_store, 'metadata_index', None)
+        with metrics.span('department_lookup'):
             for doc in docs:
-                if 'urls' in doc.metadata and doc.metadata['urls']:
-                    urls.extend(doc.metadata['urls'])
-            
-                # 담당부서 정보 찾기
-                content = doc.page_content
-                dept_pattern = r'담당부서[^\n]*?([^()]+\(☎\s*\d{3}-\d{4}\))'
-                dept_matches = re.findall(dept_pattern, content, re.DOTALL)
-            
-                if dept_matches:
-                    department_info = dept_matches[0].strip()
-                    st.session_state.last_department_info = department_info  # 찾은 정보 저장
+                if metadata_index:
+                    doc_department, doc_urls = metadata_index.lookup(doc.metadata.get('chunk_id'))
+                else:
+                    doc_department, doc_urls = MetadataIndex.find_department(doc.page_content), []  # 색인이 없는 저장소
+                urls.extend(doc_urls)
+
+                if doc_department:
+                    department_info = found_department_info = doc_department
+                    session['last_department_info'] = department_info  # 찾은 정보 저장
                     break
 
-            # 현재 문서에서 찾지 못했다면 이전 정보 사용
-            if not department_info and st.session_state.last_department_info:
-                department_info = st.session_state.last_department_info
-            
-            urls = list(set(urls))  # 중복 제거
-
-                # 컨텍스트 구성
-            context = "\n\n".join(doc.page_content for doc in docs)
-            if department_info:
-                context += f"\n\nDEPARTMENT_INFO: {department_info}"
-            if urls:
-                context += "\n\nURL_LIST: " + "\n".join(urls)
-
-            # RAG 체인으로 응답 생성
-            chain = ResponseGenerator.get_enhanced_rag_chain()  # 개선된 RAG 체인 가져오기
-            response = chain.invoke({
-                "question": question,
-                "context": context
-            })
+        # 현재 문서에서 찾지 못했다면 이전 정보 사용
+        if not department_info and session.get('last_department_info'):
+            department_info = session['last_department_info']
         
-            return response, docs  # 응답과 문서 반환
+        urls = list(set(urls))  # 중복 제거
+
+        # 컨텍스트 구성
+        context, context_stats = ContextCompactor.compact(docs)
+        if department_info:
+            context += f"\n\nDEPARTMENT_INFO: {department_info}"
+        if urls:
+            context += "\n\nURL_LIST: " + "\n".join(urls)
+        return context, found_department_info, context_stats
+
+    @staticmethod
+    def store_answer(question: str, prepared, response, vector_store=None):
+        """생성된 답변을 답변 캐시에 저장
+        (어휘 검색만으로 답한 질문은 vector_store가 주어지면 이때 질문을 임베딩하여 유사 질문 조회에도 쓰이게 함)"""
+        embedding = prepared['embedding']
+        if embedding is None and vector_store is not None:
+            try:
+                with metrics.span('query_embedding'):
+                    embedding = vector_store.embedding_function.embed_query(question)
+            except Exception as e:
+                logger.warning(f"답변 캐시용 질문 임베딩 실패 (정확 일치로만 재사용): {e}")
+        ResponseGenerator.answer_cache.put(
+            question, prepared['index_version'], response,
+            [doc.metadata.get('chunk_id') for doc in prepared['docs']],
+            embedding, prepared['department_info']
+        )
+
+    @staticmethod
+    def flight_key(question: str, vector_store, session):
+        """병합 기준 키 (정규화된 질문, 인덱스 버전, 컨텍스트에 들어가는 이전 담당부서 정보)"""
+        return (
+            AnswerCache.normalize_question(question),
+            getattr(vector_store, 'index_version', None),
+            session.get('last_department_info')
+        )
+
+    @staticmethod
+    def generate_answer(question: str, vector_store, chat_model, session, flight):
+        """검색부터 답변 생성까지 수행하며 응답 조각을 flight에 발행 (같은 질문의 모든 요청이 구독)"""
+        generated = False
+        try:
+            prepared = ResponseGenerator.prepare_question(question, vector_store, session)
+            if prepared['response'] is not None:
+                flight.publish(prepared['response'])  # 캐시된 답변은 한 번에 발행
+            else:
+                chain = ResponseGenerator.get_enhanced_rag_chain(chat_model)
+                parts = []
+                with ResponseGenerator.llm_slot():
+                    llm_started = time.perf_counter()
+                    for chunk in chain.stream({
+                        "question": question,
+                        "context": prepared['context']
+                    }):
+                        if not parts:
+                            metrics.record_duration('llm_first_token', time.perf_counter() - llm_started)
+                        parts.append(chunk)
+                        flight.publish(chunk)
+                    metrics.record_duration('llm', time.perf_counter() - llm_started)
+                prepared['response'] = ''.join(parts)
+                metrics.observe('response_chars', len(prepared['response']))
+                generated = True
+            flight.finish({
+                'response': prepared['response'],
+                'formatted': prepared.get('formatted'),
+                'docs': prepared['docs'],
+                'department_info': prepared.get('department_info')
+            })
+        except Exception as e:
+            flight.fail(e)
+            generated = False
+        try:
+            # 구독자에게 답변을 넘긴 뒤 저장 (지연 임베딩이 응답 완료를 늦추지 않도록 하며, 그동안 온 같은 질문은 이 Flight를 공유)
+            if generated:
+                ResponseGenerator.store_answer(question, prepared, prepared['response'], vector_store)
+        finally:
+            ResponseGenerator.in_flight.forget(flight)  # 답변 캐시에 저장된 뒤 해제
+
+    @staticmethod
+    def submit_generation(*args):
+        """generate_answer를 작업자 풀에 넣기 (풀이 없으면 새 스레드에서 실행, 대기열이 가득 차면 GenerationBacklogFull)"""
+        pool = ResponseGenerator.generation_pool
+        if pool is None:
+            threading.Thread(target=ResponseGenerator.generate_answer, args=args, name="answer-generation", daemon=True).start()
+            return
+        with ResponseGenerator._llm_lock:
+            max_pending = ResponseGenerator.max_pending
+            if max_pending is not None and ResponseGenerator.generation_pending >= max_pending:
+                raise GenerationBacklogFull(f"대기 중인 답변 생성이 {max_pending}개입니다.")
+            ResponseGenerator.generation_pending += 1
+        try:
+            pool.submit(ResponseGenerator._run_generation, *args)
+        except Exception:
+            ResponseGenerator._finish_generation()
+            raise
+
+    @staticmethod
+    def _run_generation(*args):
+        try:
+            ResponseGenerator.generate_answer(*args)
+        finally:
+            ResponseGenerator._finish_generation()
+
+    @staticmethod
+    def _finish_generation():
+        with ResponseGenerator._llm_lock:
+            ResponseGenerator.generation_pending -= 1
+
+    @staticmethod
+    def start_question(question: str, vector_store, chat_model=None, session=None):
+        """같은 질문이 생성 중이면 그 Flight를, 아니면 생성을 새로 시작한 Flight 반환
+        생성은 요청과 분리된 작업자에서 진행되므로 먼저 온 요청이 중간에 끊겨도 나머지 요청은 계속 답변을 받음
+        (생성 대기열이 가득 차면 GenerationBacklogFull, 그동안 같은 질문으로 합류한 요청도 같은 예외를 받음)"""
+        session = {} if session is None else session
+        session.setdefault('last_department_info', None)
+        vector_store = ResponseGenerator.pin_version(vector_store)  # 병합 키와 생성 작업이 같은 인덱스 버전 사용
+        flight, leader = ResponseGenerator.in_flight.join(ResponseGenerator.flight_key(question, vector_store, session))
+        if leader:
+            try:
+                ResponseGenerator.submit_generation(
+                    question, vector_store, chat_model, {'last_department_info': session.get('last_department_info')}, flight
+                )
+            except GenerationBacklogFull as e:
+                metrics.increment('rejected_questions')
+                flight.fail(e)
+                ResponseGenerator.in_flight.forget(flight)
+                raise
+        else:
+            metrics.increment('coalesced_questions')
+        return flight
+
+    @staticmethod
+    def apply_result(result, session):
+        """생성 결과에서 찾은 담당부서 정보를 요청의 대화 상태에 반영"""
+        if session is not None and result and result['department_info']:
+            session['last_department_info'] = result['department_info']
+
+    @staticmethod
+    def process_question(question: str, vector_store, chat_model=None, session=None, on_error=logger.error):
+        """사용자 질문 처리 및 응답 생성 (오류 메시지는 on_error로 전달)"""
+        try:
+            with metrics.span('question_total'):
+                result = ResponseGenerator.start_question(question, vector_store, chat_model, session).wait()
+            ResponseGenerator.apply_result(result, session)
+            return result['response'], result['docs']  # 응답과 문서 반환
         except Exception as e:
-            st.error(f"질문 처리 중 오류 발생: {e}")  # 오류 발생 시 에러 메시지 출력
+            metrics.increment('question_errors')
+            on_error(f"질문 처리 중 오류 발생: {e}")  # 오류 발생 시 에러 메시지 전달
             return "죄송합니다. 응답을 생성하는 중 문제가 발생했습니다.", None
-        
+
+    @staticmethod
+    def stream_question(question: str, vector_store, chat_model=None, session=None, on_error=logger.error):
+        """사용자 질문 처리 후 응답을 생성되는 대로 조각 단위로 반환하는 제너레이터"""
+        started = time.perf_counter()
+        try:
+            flight = ResponseGenerator.start_question(question, vector_store, chat_model, session)
+            yield from flight.subscribe()
+            # 구독자가 조각 사이에 화면을 갱신한 시간이 섞이지 않도록 생성이 끝난 시점까지 기록
+            metrics.record_duration('question_total', max(flight.finished_at - started, 0.0))
+            ResponseGenerator.apply_result(flight.result, session)
+        except Exception as e:
+            metrics.increment('question_errors')
+            on_error(f"질문 처리 중 오류 발생: {e}")  # 오류 발생 시 에러 메시지 전달
+            yield "죄송합니다. 응답을 생성하는 중 문제가 발생했습니다."
 
 
+metrics.register_gauge('answer_cache_hit_rate', ResponseGenerator.answer_cache.hit_rate)
+metrics.register_gauge('answer_cache_entries', lambda: len(ResponseGenerator.answer_cache))
+metrics.register_gauge('faq_hit_rate', ResponseGenerator.faq_table.hit_rate)
+metrics.register_gauge('llm_in_flight', lambda: ResponseGenerator.llm_active)
+metrics.register_gauge('generation_pending', lambda: ResponseGenerator.generation_pending)
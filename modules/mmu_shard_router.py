@@ -0,0 +1,63 @@
+# 카테고리 샤드 라우터
+# mmu_shard_router.py
+
+import numpy as np
+from modules.mmu_config import SHARD_KEYWORDS, SHARD_ROUTE_MAX, SHARD_ROUTE_MARGIN, SHARD_KEYWORD_MIN_HITS
+
+class ShardRouter:
+    """질문마다 검색할 카테고리 샤드를 1~2개 고르는 라우터 (키워드 규칙 우선, 없으면 임베딩 중심점 유사도)
+    근거가 약하면 (키워드 일치가 적거나 동률, 중심점 유사도가 비슷한 샤드가 max_shards개보다 많음) 전체 샤드를 검색"""
+
+    def __init__(self, categories, centroids=None, keywords=SHARD_KEYWORDS, max_shards=SHARD_ROUTE_MAX,
+                 margin=SHARD_ROUTE_MARGIN, min_hits=SHARD_KEYWORD_MIN_HITS):
+        self.categories = list(categories)
+        self.keywords = {category: (category,) + tuple(keywords.get(category, ())) for category in self.categories}
+        self.max_shards = max_shards
+        self.margin = margin
+        self.min_hits = min_hits
+        centroids = centroids or {}
+        self._centroid_categories = [category for category in self.categories if centroids.get(category) is not None]
+        self._centroids = (
+            np.asarray([centroids[category] for category in self._centroid_categories], dtype=np.float32)
+            if self._centroid_categories else None
+        )
+
+    @staticmethod
+    def compute_centroid(vectors):
+        """정규화한 벡터들의 평균 방향 (샤드 대표 벡터)"""
+        vectors = np.asarray(vectors, dtype=np.float32)
+        vectors = vectors / np.maximum(np.linalg.norm(vectors, axis=1, keepdims=True), 1e-12)
+        centroid = vectors.mean(axis=0)
+        return centroid / max(float(np.linalg.norm(centroid)), 1e-12)
+
+    def similarities(self, embedding):
+        """카테고리별 질문 임베딩과 중심점의 코사인 유사도"""
+        if embedding is None or self._centroids is None:
+            return {}
+        query = np.asarray(embedding, dtype=np.float32)
+        query = query / max(float(np.linalg.norm(query)), 1e-12)
+        return dict(zip(self._centroid_categories, (self._centroids @ query).tolist()))
+
+    def route(self, question, embedding=None):
+        """검색할 카테고리 목록 반환 (판단할 근거가 없으면 None = 전체 샤드 검색)"""
+        similarities = self.similarities(embedding)
+        hits = {
+            category: sum(1 for keyword in keywords if keyword in question)
+            for category, keywords in self.keywords.items()
+        }
+        matched = [category for category in self.categories if hits[category]]
+        if matched:
+            # 키워드가 많이 맞은 순, 같으면 중심점 유사도 순
+            matched.sort(key=lambda category: (-hits[category], -similarities.get(category, 0.0)))
+            top = hits[matched[0]]
+            if top < self.min_hits or (len(matched) > self.max_shards and hits[matched[self.max_shards]] == top):
+                return None  # 키워드 하나만 맞았거나 고를 수 있는 수보다 많은 카테고리가 동률이면 놓치지 않도록 전체 검색
+            return matched[:self.max_shards]
+
+        if not similarities:
+            return None
+        ranked = sorted(similarities, key=similarities.get, reverse=True)
+        best = similarities[ranked[0]]
+        # 1위와 차이가 작은 샤드만 함께 검색 (그런 샤드가 max_shards개보다 많으면 전체 검색)
+        close = [category for category in ranked if best - similarities[category] <= self.margin]
+        return close if len(close) <= self.max_shards else None
@@ -0,0 +1,130 @@
+# 동일 질문 요청 병합
+# mmu_single_flight.py
+
+import time
+import asyncio
+import threading
+
+class Flight:
+    """답변 하나의 생성 과정을 여러 요청이 함께 구독하는 토큰 스트림
+    생성자는 publish/finish/fail을 호출하고, 구독자는 subscribe(스레드) 또는 asubscribe(asyncio)로
+    지금까지 나온 조각부터 순서대로 받음"""
+
+    def __init__(self, key=None):
+        self.key = key
+        self.chunks = []  # 지금까지 생성된 응답 조각
+        self.done = False
+        self.result = None  # 생성 완료 시 결과 (응답, 문서 등)
+        self.error = None  # 생성 실패 시 예외
+        self.finished_at = None  # 생성이 끝난 시각 (time.perf_counter 기준)
+        self._condition = threading.Condition()
+        self._waiters = []  # 새 조각을 기다리는 asyncio 구독자 (이벤트 루프, future)
+
+    def _notify(self):
+        self._condition.notify_all()
+        for loop, future in self._waiters:
+            loop.call_soon_threadsafe(Flight._wake, future)
+        self._waiters = []
+
+    @staticmethod
+    def _wake(future):
+        if not future.done():
+            future.set_result(None)
+
+    def publish(self, chunk):
+        """응답 조각 추가"""
+        with self._condition:
+            self.chunks.append(chunk)
+            self._notify()
+
+    def finish(self, result=None):
+        """생성 완료"""
+        with self._condition:
+            self.result = result
+            self.done = True
+            self.finished_at = time.perf_counter()
+            self._notify()
+
+    def fail(self, error):
+        """생성 실패 (구독자에게 같은 예외 전달)"""
+        with self._condition:
+            self.error = error
+            self.done = True
+            self.finished_at = time.perf_counter()
+            self._notify()
+
+    def subscribe(self):
+        """조각을 생성되는 대로 반환하는 제너레이터 (실패 시 생성 중 발생한 예외를 다시 발생)"""
+        position = 0
+        while True:
+            with self._condition:
+                while position >= len(self.chunks) and not self.done:
+                    self._condition.wait()
+                chunks, done = self.chunks[position:], self.done
+            position += len(chunks)
+            yield from chunks
+            if done:
+                break
+        if self.error is not None:
+            raise self.error
+
+    async def asubscribe(self):
+        """subscribe의 asyncio 버전 (이벤트 루프를 막지 않고 대기)"""
+        loop = asyncio.get_running_loop()
+        position = 0
+        while True:
+            future = None
+            with self._condition:
+                chunks, done = self.chunks[position:], self.done
+                if not chunks and not done:
+                    future = loop.create_future()
+                    self._waiters.append((loop, future))
+            if future is not None:
+                await future
+                continue
+            position += len(chunks)
+            for chunk in chunks:
+                yield chunk
+            if done:
+                break
+        if self.error is not None:
+            raise self.error
+
+    def wait(self, timeout=None):
+        """생성이 끝날 때까지 대기하고 결과 반환"""
+        with self._condition:
+            self._condition.wait_for(lambda: self.done, timeout)
+        if self.error is not None:
+            raise self.error
+        return self.result
+
+class SingleFlight:
+    """같은 키의 요청이 처리 중이면 새로 생성하지 않고 진행 중인 Flight를 공유하는 등록부"""
+
+    def __init__(self, enabled=True):
+        self.enabled = enabled
+        self.stats = {'leaders': 0, 'followers': 0}
+        self._flights = {}  # 키 -> 진행 중인 Flight
+        self._lock = threading.Lock()
+
+    def join(self, key):
+        """(Flight, 생성 담당 여부) 반환 (담당이면 생성을 시작하고 끝나면 forget 호출)"""
+        with self._lock:
+            flight = self._flights.get(key) if self.enabled else None
+            if flight is not None:
+                self.stats['followers'] += 1
+                return flight, False
+            flight = Flight(key)
+            if self.enabled:
+                self._flights[key] = flight
+            self.stats['leaders'] += 1
+            return flight, True
+
+    def forget(self, flight):
+        """완료된 Flight 등록 해제 (이후 같은 질문은 답변 캐시에서 처리)"""
+        with self._lock:
+            if self._flights.get(flight.key) is flight:
+                del self._flights[flight.key]
+
+    def __len__(self):
+        return len(self._flights)
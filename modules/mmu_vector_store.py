@@ -1,22 +1,712 @@
 # 벡터 저장소 관리
 # mmu_vector_store.py
 
-import streamlit as st
-from langchain_google_genai import GoogleGenerativeAIEmbeddings
-from langchain_community.vectorstores import FAISS
-from modules.mmu_config import GOOGLE_API_KEY, EMBEDDING_MODEL, TOP_K
+import os
+import json
+import shutil
+import hashlib
+import threading
+import weakref
+import logging
+from collections import deque
+from contextlib import contextmanager
+import numpy as np
+from modules.mmu_embedding_pipeline import EmbeddingPipeline
+from modules.mmu_lexical_index import LexicalIndex
+from modules.mmu_metadata_index import MetadataIndex
+from modules.mmu_chunk_store import ChunkStore, ChunkIdMapping
+from modules.mmu_shard_router import ShardRouter
+from modules.mmu_config import (
+    TOP_K, CHUNK_SIZE, CHUNK_OVERLAP,
+    INDEX_DIR, INDEX_MANIFEST, INDEX_TYPE, IVF_NLIST, IVF_NPROBE, PQ_M, PQ_NBITS, PQ_MIN_NBITS,
+    HNSW_M, HNSW_EF_CONSTRUCTION, HNSW_EF_SEARCH, INDEX_TRAIN_SAMPLE, INDEX_RETRAIN_GROWTH, INGEST_BATCH_SIZE,
+    SHARDED_INDEX, SHARD_DIR, SHARD_MANIFEST
+)
+
+logger = logging.getLogger(__name__)
 
 class VectorStoreManager:
     @staticmethod
-    def create_vector_store(documents):
+    def get_embeddings():
+        """설정된 백엔드의 임베딩 모델 생성 (원격 모델에는 디스크 캐시 적용)"""
+        from modules.mmu_embedding_backend import EmbeddingBackend
+
+        return EmbeddingBackend.create()
+
+    @staticmethod
+    def get_index_params(embeddings=None):
+        """인덱스 재사용 가능 여부를 판단하는 파라미터"""
+        from modules.mmu_embedding_backend import EmbeddingBackend
+
+        return {
+            'embedding_model': EmbeddingBackend.model_name(embeddings),
+            'chunk_size': CHUNK_SIZE,
+            'chunk_overlap': CHUNK_OVERLAP,
+            'index_type': INDEX_TYPE,
+            'index_build': [IVF_NLIST, PQ_M, PQ_NBITS, HNSW_M, HNSW_EF_CONSTRUCTION]  # 구성 파라미터가 바뀌면 재구성
+        }
+
+    @staticmethod
+    def build_faiss_index(vectors, index_type=INDEX_TYPE):
+        """설정된 종류의 FAISS 인덱스를 만들고 표본 벡터로 학습 (벡터는 추가하지 않음)"""
+        import faiss
+
+        vectors = np.ascontiguousarray(vectors, dtype=np.float32)
+        count, dimension = vectors.shape
+        if index_type in ('ivf_flat', 'ivf_pq'):
+            train_count = min(count, INDEX_TRAIN_SAMPLE)
+            nlist = max(1, min(IVF_NLIST, train_count // 39))  # 클러스터당 최소 39개 학습 벡터
+            # 코드북도 중심점당 39개 이상으로 학습되도록 비트 수를 줄임 (작은 말뭉치에서 학습이 길어지고 경고가 나는 것 방지)
+            nbits = min(PQ_NBITS, int(np.log2(max(train_count // 39, 1))))
+            if index_type == 'ivf_pq' and nbits >= PQ_MIN_NBITS and dimension % PQ_M == 0:
+                description = f"IVF{nlist},PQ{PQ_M}x{nbits}"
+            elif index_type == 'ivf_pq':
+                logger.warning("PQ 학습 조건을 만족하지 않아 IVF-Flat 인덱스를 사용합니다. (벡터 %d개, 차원 %d)", count, dimension)
+                description = f"IVF{nlist},Flat"
+            else:
+                description = f"IVF{nlist},Flat"
+        elif index_type == 'hnsw':
+            description = f"HNSW{HNSW_M}"
+        elif index_type == 'flat':
+            description = "Flat"
+        else:
+            raise ValueError(f"지원하지 않는 인덱스 종류: {index_type}")
+
+        index = faiss.index_factory(dimension, description, faiss.METRIC_L2)
+        if index_type == 'hnsw':
+            index.hnsw.efConstruction = HNSW_EF_CONSTRUCTION
+        if hasattr(index, 'do_polysemous_training'):
+            index.do_polysemous_training = False  # 해밍 거리 필터링은 쓰지 않으므로 학습 시간 대부분을 차지하는 코드 재배치 생략
+        if not index.is_trained:
+            sample = vectors
+            if count > INDEX_TRAIN_SAMPLE:
+                sample = vectors[np.random.default_rng(0).choice(count, INDEX_TRAIN_SAMPLE, replace=False)]
+            index.train(sample)
+        return VectorStoreManager.configure_index(index)
+
+    @staticmethod
+    def needs_retraining(manifest, count, index_type=INDEX_TYPE):
+        """IVF/PQ 인덱스가 지금 말뭉치로 학습할 표본의 INDEX_RETRAIN_GROWTH배보다 적은 벡터로 학습되었는지 여부
+        (증분 추가만 하면 작은 말뭉치에 맞춘 nlist와 코드북을 계속 쓰게 되므로 다시 학습)"""
+        if index_type not in ('ivf_flat', 'ivf_pq'):
+            return False
+        trained_vectors = manifest.get('trained_vectors')
+        if not trained_vectors:
+            return True  # 학습 크기를 기록하지 않은 이전 매니페스트
+        return min(count, INDEX_TRAIN_SAMPLE) > INDEX_RETRAIN_GROWTH * trained_vectors
+
+    @staticmethod
+    @contextmanager
+    def file_lock(path, blocking=False):
+        """여러 프로세스가 같은 파일을 동시에 재생성하지 않도록 path + '.lock'에 배타적 잠금을 시도하고 획득 여부 반환
+        blocking이면 다른 프로세스가 잠금을 놓을 때까지 기다림 (항상 True)
+        잠금은 열린 파일에 걸려 있으므로 작업이 오래 걸려도 만료되지 않고, 프로세스가 비정상 종료하면 운영체제가 해제함"""
+        lock_path = path + '.lock'
+        if os.path.dirname(lock_path):
+            os.makedirs(os.path.dirname(lock_path), exist_ok=True)
+        with open(lock_path, 'a') as lock_file:
+            try:
+                import fcntl
+
+                fcntl.flock(lock_file, fcntl.LOCK_EX if blocking else fcntl.LOCK_EX | fcntl.LOCK_NB)
+            except ImportError:
+                import msvcrt  # Windows
+
+                while True:  # LK_LOCK은 10초 동안만 재시도하므로 blocking이면 잠금을 얻을 때까지 반복
+                    try:
+                        msvcrt.locking(lock_file.fileno(), msvcrt.LK_LOCK if blocking else msvcrt.LK_NBLCK, 1)
+                        break
+                    except OSError:
+                        if not blocking:
+                            yield False
+                            return
+            except OSError:
+                yield False  # 다른 프로세스가 잠금을 잡고 있음
+                return
+            yield True  # 잠금 파일은 지우지 않음 (지우면 다른 프로세스가 새 파일에 따로 잠글 수 있음)
+
+    @staticmethod
+    def configure_index(index):
+        """검색 파라미터(nprobe, efSearch) 적용"""
+        import faiss
+
+        ivf = faiss.try_extract_index_ivf(index)
+        if ivf is not None:
+            ivf.nprobe = min(IVF_NPROBE, ivf.nlist)
+        if hasattr(index, 'hnsw'):
+            index.hnsw.efSearch = HNSW_EF_SEARCH
+        return index
+
+    @staticmethod
+    def load_manifest(index_dir=INDEX_DIR):
+        """저장된 매니페스트 불러오기 (없거나 손상된 경우 None)"""
+        manifest_path = os.path.join(index_dir, INDEX_MANIFEST)
+        index_exists = os.path.exists(os.path.join(index_dir, 'index.faiss')) and ChunkStore.exists(index_dir)
+        if not os.path.exists(manifest_path) or not index_exists:
+            return None
         try:
-            embeddings = GoogleGenerativeAIEmbeddings(
-                model=EMBEDDING_MODEL,
-                google_api_key=GOOGLE_API_KEY
-            )
-            vector_store = FAISS.from_documents(documents, embedding=embeddings)
-            vector_store.save_local("faiss_index")
+            with open(manifest_path, 'r', encoding='utf-8') as file:
+                return json.load(file)
+        except (OSError, ValueError):
+            return None
+
+    @staticmethod
+    def compute_index_version(chunk_ids, embeddings=None):
+        """파라미터와 청크 해시 목록으로 인덱스 버전 계산"""
+        payload = json.dumps([VectorStoreManager.get_index_params(embeddings), sorted(chunk_ids)], sort_keys=True)
+        return hashlib.sha256(payload.encode('utf-8')).hexdigest()[:16]
+
+    @staticmethod
+    def save_manifest(chunk_ids, index_dir=INDEX_DIR, embeddings=None, dimension=None, trained_vectors=None):
+        """현재 인덱스에 포함된 청크 해시와 파라미터 저장"""
+        manifest = dict(VectorStoreManager.get_index_params(embeddings))
+        manifest['embedding_dimension'] = dimension  # 다른 차원의 임베딩으로 바꾸면 재사용하지 않음
+        manifest['trained_vectors'] = trained_vectors  # IVF/PQ 학습에 사용한 벡터 수 (학습하지 않는 인덱스는 None)
+        manifest['version'] = VectorStoreManager.compute_index_version(chunk_ids, embeddings)
+        manifest['chunks'] = sorted(chunk_ids)
+        with open(os.path.join(index_dir, INDEX_MANIFEST), 'w', encoding='utf-8') as file:
+            json.dump(manifest, file, ensure_ascii=False, indent=2)
+
+    @staticmethod
+    def load_vector_store(embeddings, writable=False, index_dir=INDEX_DIR):
+        """저장된 인덱스 불러오기 (읽기 전용이면 인덱스와 청크 저장소를 메모리 매핑)"""
+        import faiss
+        from langchain_community.vectorstores import FAISS
+        from langchain_community.docstore.in_memory import InMemoryDocstore
+
+        index_path = os.path.join(index_dir, 'index.faiss')
+        chunk_store = ChunkStore(index_dir)
+        if writable:
+            # 증분 재구성용: 수정 가능한 인덱스와 메모리 내 문서 저장소
+            index = VectorStoreManager.configure_index(faiss.read_index(index_path))
+            documents = chunk_store.documents()
+            docstore = InMemoryDocstore({doc.metadata['chunk_id']: doc for doc in documents})
+            index_to_docstore_id = {row: doc.metadata['chunk_id'] for row, doc in enumerate(documents)}
+            return FAISS(embeddings, index, docstore, index_to_docstore_id)
+
+        try:
+            # 메모리 매핑으로 여러 워커 프로세스가 같은 페이지를 공유
+            index = faiss.read_index(index_path, faiss.IO_FLAG_MMAP | faiss.IO_FLAG_READ_ONLY)
+        except Exception:
+            index = faiss.read_index(index_path)  # 매핑을 지원하지 않는 인덱스 형식
+        VectorStoreManager.configure_index(index)
+        # 검색된 상위 청크만 Document로 변환
+        return FAISS(embeddings, index, chunk_store, ChunkIdMapping(chunk_store))
+
+    @staticmethod
+    def save_vector_store(vector_store, index_dir=INDEX_DIR):
+        """인덱스와 청크 저장소를 FAISS 행 순서대로 저장"""
+        import faiss
+
+        os.makedirs(index_dir, exist_ok=True)
+        index_path = os.path.join(index_dir, 'index.faiss')
+        faiss.write_index(vector_store.index, index_path + '.tmp')
+        os.replace(index_path + '.tmp', index_path)  # 매핑 중인 기존 파일은 그대로 유지
+        rows = sorted(vector_store.index_to_docstore_id.items())
+        ChunkStore.write(index_dir, [vector_store.docstore.search(chunk_id) for _, chunk_id in rows])
+
+    @staticmethod
+    def embed_documents(pipeline, documents_by_id, chunk_ids):
+        """임베딩 파이프라인으로 청크를 배치 임베딩하여 (텍스트, 벡터) 목록과 메타데이터 반환"""
+        vectors = pipeline.embed({chunk_id: documents_by_id[chunk_id].page_content for chunk_id in chunk_ids})
+        text_embeddings = [(documents_by_id[chunk_id].page_content, vectors[chunk_id]) for chunk_id in chunk_ids]
+        metadatas = [documents_by_id[chunk_id].metadata for chunk_id in chunk_ids]
+        return text_embeddings, metadatas
+
+    @staticmethod
+    def iter_embedding_batches(pipeline, documents_by_id, chunk_ids, first_batch_size=INGEST_BATCH_SIZE):
+        """청크를 INGEST_BATCH_SIZE개씩 임베딩하여 (청크 ID, (텍스트, 벡터), 메타데이터) 목록을 차례로 반환 (벡터는 배치 단위로만 유지)"""
+        start, size = 0, first_batch_size
+        while start < len(chunk_ids):
+            batch_ids = chunk_ids[start:start + size]
+            text_embeddings, metadatas = VectorStoreManager.embed_documents(pipeline, documents_by_id, batch_ids)
+            yield batch_ids, text_embeddings, metadatas
+            start, size = start + size, INGEST_BATCH_SIZE
+
+    @staticmethod
+    def attach_metadata_index(vector_store, metadata_index, index_dir=INDEX_DIR):
+        """수집 시 만든 담당부서/URL 색인을 저장하고 벡터 저장소에 연결 (없으면 저장된 색인 사용)"""
+        if metadata_index is not None:
+            metadata_index.save(index_dir)
+        vector_store.metadata_index = metadata_index or MetadataIndex.load(index_dir)
+
+    @staticmethod
+    def create_vector_store(documents, metadata_index=None, embeddings=None, on_error=logger.error,
+                            index_dir=INDEX_DIR, sharded=SHARDED_INDEX, lexical=True):
+        """벡터 저장소 생성 (변경된 청크만 임베딩하는 증분 재구성, sharded면 카테고리별 샤드로 구성)
+        lexical이 False면 어휘 색인을 만들지 않음 (샤드는 전체 샤드를 대상으로 한 어휘 색인 하나를 공유)"""
+        from langchain_community.vectorstores import FAISS
+        from langchain_community.docstore.in_memory import InMemoryDocstore
+        from modules.mmu_embedding_backend import EmbeddingBackend
+
+        if sharded:
+            return VectorStoreManager.create_sharded_vector_store(documents, metadata_index, embeddings, on_error, index_dir)
+        try:
+            embeddings = embeddings or VectorStoreManager.get_embeddings()
+
+            # 청크 ID 기준 중복 제거 (동일한 내용과 메타데이터는 한 번만 임베딩)
+            documents_by_id = {}
+            for doc in documents:
+                documents_by_id.setdefault(doc.metadata['chunk_id'], doc)
+            EmbeddingBackend.prepare(embeddings, [doc.page_content for doc in documents_by_id.values()])
+
+            manifest = VectorStoreManager.load_manifest(index_dir)
+            vector_store, trained_vectors = None, None
+            if manifest:
+                # 임베딩 모델이나 차원이 바뀌었으면 기존 벡터를 버리고 모든 청크를 다시 임베딩
+                problems = EmbeddingBackend.check_compatibility(manifest, embeddings)
+                if problems:
+                    logger.info("저장된 인덱스를 전체 재임베딩합니다: %s", '; '.join(problems))
+                    manifest = None
+            if manifest and all(manifest.get(key) == value for key, value in VectorStoreManager.get_index_params(embeddings).items()):
+                if set(manifest.get('chunks', [])) == set(documents_by_id):
+                    try:
+                        vector_store = VectorStoreManager.load_vector_store(embeddings, index_dir=index_dir)  # 변경 사항이 없으면 임베딩 생략
+                        vector_store.index_version = VectorStoreManager.compute_index_version(documents_by_id, embeddings)
+                        if lexical:
+                            vector_store.lexical_index = LexicalIndex.load(index_dir) or LexicalIndex.build(documents_by_id)
+                        VectorStoreManager.attach_metadata_index(vector_store, metadata_index, index_dir)
+                        return vector_store
+                    except Exception:
+                        pass  # 읽기 실패 시 아래에서 재구성
+                if VectorStoreManager.needs_retraining(manifest, len(documents_by_id)):
+                    logger.info("말뭉치가 학습 당시보다 커져 인덱스를 다시 학습합니다. (학습 벡터 %s개, 청크 %d개)",
+                                manifest.get('trained_vectors'), len(documents_by_id))
+                else:
+                    try:
+                        vector_store = VectorStoreManager.load_vector_store(embeddings, writable=True, index_dir=index_dir)
+                        trained_vectors = manifest.get('trained_vectors')
+                    except Exception:
+                        vector_store = None  # 인덱스 손상 시 전체 재구성
+
+            if not documents_by_id:
+                raise ValueError("처리할 문서가 없습니다.")
+            pipeline = EmbeddingPipeline(embeddings, namespace=EmbeddingBackend.model_name(embeddings))
+            if vector_store is not None:
+                indexed_ids = set(manifest.get('chunks', []))
+                stale_ids = [chunk_id for chunk_id in indexed_ids if chunk_id not in documents_by_id]
+                new_ids = [chunk_id for chunk_id in documents_by_id if chunk_id not in indexed_ids]
+
+                try:
+                    if stale_ids:
+                        vector_store.delete(stale_ids)  # 더 이상 존재하지 않는 청크 삭제
+                except RuntimeError:
+                    vector_store = None  # 삭제를 지원하지 않는 인덱스(HNSW)는 전체 재구성
+                else:
+                    for batch_ids, text_embeddings, metadatas in VectorStoreManager.iter_embedding_batches(pipeline, documents_by_id, new_ids):
+                        vector_store.add_embeddings(text_embeddings, metadatas=metadatas, ids=batch_ids)  # 배치 단위 삽입
+
+            if vector_store is None:
+                # 기존 인덱스를 사용할 수 없는 경우 첫 배치로 설정된 종류의 인덱스를 구성한 뒤 배치 단위로 임베딩하여 추가
+                # (IVF/PQ는 학습 표본 수만큼을 첫 배치로 사용)
+                first_batch_size = max(INGEST_BATCH_SIZE, INDEX_TRAIN_SAMPLE) if INDEX_TYPE in ('ivf_flat', 'ivf_pq') else INGEST_BATCH_SIZE
+                batches = VectorStoreManager.iter_embedding_batches(pipeline, documents_by_id, list(documents_by_id), first_batch_size)
+                for batch_ids, text_embeddings, metadatas in batches:
+                    if vector_store is None:
+                        index = VectorStoreManager.build_faiss_index([vector for _, vector in text_embeddings])
+                        vector_store = FAISS(embeddings, index, InMemoryDocstore(), {})
+                        if INDEX_TYPE in ('ivf_flat', 'ivf_pq'):
+                            trained_vectors = min(len(text_embeddings), INDEX_TRAIN_SAMPLE)
+                    vector_store.add_embeddings(text_embeddings, metadatas=metadatas, ids=batch_ids)  # 배치 단위 삽입
+
+            VectorStoreManager.save_vector_store(vector_store, index_dir)
+            if lexical:
+                vector_store.lexical_index = LexicalIndex.build(documents_by_id)  # FAISS와 함께 어휘 색인 구성
+                vector_store.lexical_index.save(index_dir)
+            VectorStoreManager.attach_metadata_index(vector_store, metadata_index, index_dir)
+            VectorStoreManager.save_manifest(documents_by_id.keys(), index_dir, embeddings, vector_store.index.d, trained_vectors)
+            pipeline.clear_checkpoint()  # 인덱스에 반영되었으므로 체크포인트 정리
+            vector_store.index_version = VectorStoreManager.compute_index_version(documents_by_id, embeddings)  # 답변 캐시 무효화 기준
             return vector_store
         except Exception as e:
-            st.error(f"벡터 저장소 생성 중 오류 발생: {e}")
-            return None
\ No newline at end of file
+            on_error(f"벡터 저장소 생성 중 오류 발생: {e}")
+            return None
+
+    @staticmethod
+    def reconstruct_vectors(index):
+        """인덱스에 저장된 벡터 복원 (PQ는 근사값, 복원할 수 없으면 None)"""
+        import faiss
+
+        ivf = faiss.try_extract_index_ivf(index)
+        try:
+            if ivf is not None:
+                ivf.make_direct_map()
+            return index.reconstruct_n(0, index.ntotal)
+        except RuntimeError:
+            return None
+        finally:
+            if ivf is not None:
+                ivf.set_direct_map_type(faiss.DirectMap.NoMap)  # 직접 매핑이 남아 있으면 증분 삭제가 실패함
+
+    @staticmethod
+    def get_shard_dir(category, index_dir=INDEX_DIR):
+        """카테고리별 샤드 디렉토리 (경로에 한글이 들어가지 않도록 카테고리 해시 사용)"""
+        return os.path.join(index_dir, SHARD_DIR, 'shard_' + hashlib.sha1(category.encode('utf-8')).hexdigest()[:12])
+
+    @staticmethod
+    def load_shard_manifest(index_dir=INDEX_DIR):
+        """샤드 목록 매니페스트 불러오기 (없거나 손상된 경우 빈 사전)"""
+        try:
+            with open(os.path.join(index_dir, SHARD_DIR, SHARD_MANIFEST), 'r', encoding='utf-8') as file:
+                return json.load(file)
+        except (OSError, ValueError):
+            return {}
+
+    @staticmethod
+    def save_shard_manifest(manifest, index_dir=INDEX_DIR):
+        path = os.path.join(index_dir, SHARD_DIR, SHARD_MANIFEST)
+        with open(path + '.tmp', 'w', encoding='utf-8') as file:
+            json.dump(manifest, file, ensure_ascii=False, indent=2)
+        os.replace(path + '.tmp', path)
+
+    @staticmethod
+    def create_sharded_vector_store(documents, metadata_index=None, embeddings=None, on_error=logger.error,
+                                    index_dir=INDEX_DIR):
+        """카테고리별 샤드로 벡터 저장소 생성 (샤드마다 매니페스트를 따로 두어 바뀐 카테고리만 재구성)"""
+        from modules.mmu_embedding_backend import EmbeddingBackend
+
+        try:
+            embeddings = embeddings or VectorStoreManager.get_embeddings()
+            documents_by_id = {}
+            for doc in documents:
+                documents_by_id.setdefault(doc.metadata['chunk_id'], doc)
+            if not documents_by_id:
+                raise ValueError("처리할 문서가 없습니다.")
+            EmbeddingBackend.prepare(embeddings, [doc.page_content for doc in documents_by_id.values()])  # 모든 샤드가 같은 IDF 사용
+
+            documents_by_category = {}
+            for doc in documents_by_id.values():
+                documents_by_category.setdefault(doc.metadata.get('category', ''), []).append(doc)
+
+            root = os.path.join(index_dir, SHARD_DIR)
+            manifest = VectorStoreManager.load_shard_manifest(index_dir)
+            previous = manifest.get('shards', {})
+            shards, entries = {}, {}
+            pipeline = None
+            for category, docs in sorted(documents_by_category.items()):
+                errors = []
+                shard_dir = VectorStoreManager.get_shard_dir(category, index_dir)
+                shard = VectorStoreManager.create_vector_store(
+                    docs, None, embeddings, errors.append, shard_dir, sharded=False, lexical=False
+                )
+                if shard is None:
+                    raise RuntimeError(f"'{category}' 샤드 구성 실패: {'; '.join(errors)}")
+
+                # 라우팅용 중심점은 샤드 버전이 바뀐 경우에만 다시 계산 (인덱스에서 벡터를 복원하고, 안 되면 다시 임베딩)
+                entry = previous.get(category, {})
+                centroid = entry.get('centroid') if entry.get('version') == shard.index_version else None
+                if centroid is None:
+                    vectors = VectorStoreManager.reconstruct_vectors(shard.index)
+                    if vectors is None:
+                        pipeline = pipeline or EmbeddingPipeline(embeddings, namespace=EmbeddingBackend.model_name(embeddings))
+                        vectors = list(pipeline.embed({doc.metadata['chunk_id']: doc.page_content for doc in docs}).values())
+                    centroid = ShardRouter.compute_centroid(vectors).tolist()
+                shards[category] = shard
+                entries[category] = {'dir': os.path.basename(shard_dir), 'version': shard.index_version, 'centroid': centroid}
+            if pipeline is not None:
+                pipeline.clear_checkpoint()
+
+            # 더 이상 없는 카테고리의 샤드 삭제
+            for category, entry in previous.items():
+                if category not in entries and entry.get('dir'):
+                    shutil.rmtree(os.path.join(root, entry['dir']), ignore_errors=True)
+
+            # 어휘 색인과 담당부서/URL 색인은 샤드 전체를 대상으로 하나만 유지
+            version = hashlib.sha256(
+                json.dumps(sorted((category, entry['version']) for category, entry in entries.items())).encode('utf-8')
+            ).hexdigest()[:16]
+            lexical_index = LexicalIndex.load(root) if manifest.get('version') == version else None
+            if lexical_index is None:
+                lexical_index = LexicalIndex.build(documents_by_id)
+                lexical_index.save(root)
+            VectorStoreManager.save_shard_manifest({'version': version, 'shards': entries}, index_dir)
+
+            router = ShardRouter(entries, {category: entry['centroid'] for category, entry in entries.items()})
+            chunk_shards = {chunk_id: doc.metadata.get('category', '') for chunk_id, doc in documents_by_id.items()}
+            vector_store = ShardedVectorStore(shards, router, embeddings, chunk_shards, version)
+            vector_store.lexical_index = lexical_index
+            VectorStoreManager.attach_metadata_index(vector_store, metadata_index, root)
+            return vector_store
+        except Exception as e:
+            on_error(f"벡터 저장소 생성 중 오류 발생: {e}")
+            return None
+
+    @staticmethod
+    def check_index(embeddings, index_dir=INDEX_DIR, sharded=SHARDED_INDEX):
+        """저장된 인덱스(샤드면 모든 샤드)가 현재 임베딩과 맞지 않는 이유 목록 (맞으면 빈 목록)"""
+        from modules.mmu_embedding_backend import EmbeddingBackend
+
+        if sharded:
+            entries = VectorStoreManager.load_shard_manifest(index_dir).get('shards', {})
+            manifests = {category: VectorStoreManager.load_manifest(os.path.join(index_dir, SHARD_DIR, entry['dir']))
+                         for category, entry in entries.items()}
+        else:
+            manifests = {'': VectorStoreManager.load_manifest(index_dir)}
+        if not manifests:
+            return ["저장된 인덱스가 없습니다"]
+        problems = []
+        for category, manifest in sorted(manifests.items()):
+            prefix = f"[{category}] " if category else ""
+            if manifest is None:
+                problems.append(f"{prefix}저장된 인덱스가 없습니다")
+                continue
+            problems.extend(prefix + problem for problem in EmbeddingBackend.check_compatibility(manifest, embeddings))
+        return problems
+
+    @staticmethod
+    def migrate_index(documents, metadata_index=None, embeddings=None, on_error=logger.error,
+                      index_dir=INDEX_DIR, sharded=SHARDED_INDEX):
+        """모든 청크를 새 임베딩으로 다시 임베딩한 인덱스를 별도 디렉토리에 만든 뒤 기존 인덱스와 교체하고 새 인덱스 버전 반환
+        (구성하는 동안 기존 인덱스는 그대로 남아 있어 실패해도 이전 상태 유지)"""
+        staging, previous = index_dir + '.migrating', index_dir + '.previous'
+        shutil.rmtree(staging, ignore_errors=True)
+        vector_store = VectorStoreManager.create_vector_store(documents, metadata_index, embeddings, on_error, staging, sharded)
+        if vector_store is None:
+            shutil.rmtree(staging, ignore_errors=True)
+            return None
+        shutil.rmtree(previous, ignore_errors=True)
+        if os.path.exists(index_dir):
+            os.rename(index_dir, previous)
+        os.rename(staging, index_dir)
+        shutil.rmtree(previous, ignore_errors=True)  # 다른 프로세스가 매핑 중인 파일은 닫힐 때까지 유지됨
+        return vector_store.index_version
+
+class ShardedDocstore:
+    """샤드별 문서 저장소를 청크 ID 하나로 조회"""
+
+    def __init__(self, shards, chunk_shards):
+        self._shards = shards
+        self._chunk_shards = chunk_shards  # 청크 ID -> 카테고리
+
+    def search(self, chunk_id):
+        """LangChain Docstore와 같은 방식의 조회 (없으면 메시지 문자열 반환)"""
+        category = self._chunk_shards.get(chunk_id)
+        if category is None:
+            return f"ID {chunk_id} not found."
+        return self._shards[category].docstore.search(chunk_id)
+
+class ShardedVectorStore:
+    """카테고리별 샤드를 하나의 벡터 저장소처럼 쓰는 래퍼 (라우터가 고른 샤드만 검색하고 거리순으로 병합)"""
+
+    def __init__(self, shards, router, embeddings, chunk_shards, index_version):
+        self.shards = shards  # 카테고리 -> FAISS 벡터 저장소
+        self.router = router
+        self.embedding_function = embeddings
+        self.docstore = ShardedDocstore(shards, chunk_shards)
+        self.index_version = index_version
+        self.lexical_index = None
+        self.metadata_index = None
+
+    def route(self, question, embedding=None):
+        """검색할 카테고리 목록 (None이면 전체 샤드)"""
+        return self.router.route(question, embedding)
+
+    def similarity_search_by_vector(self, embedding, k=TOP_K, categories=None):
+        """선택한 샤드(없으면 전체)에서 각각 k개를 찾아 L2 거리순으로 상위 k개 반환"""
+        results = []
+        for category in categories or self.shards:
+            if category in self.shards:
+                results.extend(self.shards[category].similarity_search_with_score_by_vector(embedding, k=k))
+        results.sort(key=lambda item: item[1])
+        return [doc for doc, _ in results[:k]]
+
+    def similarity_search(self, query, k=TOP_K, categories=None):
+        return self.similarity_search_by_vector(self.embedding_function.embed_query(query), k, categories)
+
+
+class VectorStoreView:
+    """벡터 저장소 한 버전에 대한 읽기 전용 보기 (질문 하나를 처리하는 동안 같은 버전을 쓰도록 고정)"""
+
+    def __init__(self, vector_store):
+        self._pinned_store = vector_store
+
+    @property
+    def _vector_store(self):
+        return self._pinned_store
+
+    def pin(self):
+        """이미 한 버전에 고정된 보기"""
+        return self
+
+    @property
+    def embedding_function(self):
+        return self._vector_store.embedding_function
+
+    @property
+    def docstore(self):
+        return self._vector_store.docstore
+
+    @property
+    def index_version(self):
+        return getattr(self._vector_store, 'index_version', None)
+
+    @property
+    def lexical_index(self):
+        return getattr(self._vector_store, 'lexical_index', None)
+
+    @property
+    def metadata_index(self):
+        return getattr(self._vector_store, 'metadata_index', None)
+
+    def route(self, question, embedding=None):
+        """검색할 카테고리 샤드 선택 (샤드 저장소가 아니면 None)"""
+        route = getattr(self._vector_store, 'route', None)
+        return route(question, embedding) if route else None
+
+    def similarity_search(self, query, k=TOP_K, categories=None):
+        """질문과 유사한 문서 검색"""
+        embedding = self._vector_store.embedding_function.embed_query(query)
+        return self.similarity_search_by_vector(embedding, k=k, categories=categories)
+
+    def similarity_search_by_vector(self, embedding, k=TOP_K, categories=None):
+        """임베딩 벡터와 유사한 문서 검색 (categories를 주면 해당 샤드만 검색)
+        검색 파라미터는 로딩 때 한 번만 정하고 청크는 mmap에서 읽기만 하므로, 여러 스레드가 잠금 없이 동시에 검색함"""
+        vector_store = self._vector_store
+        if categories is None:
+            return vector_store.similarity_search_by_vector(embedding, k=k)
+        return vector_store.similarity_search_by_vector(embedding, k=k, categories=categories)
+
+
+class SharedVectorStore(VectorStoreView):
+    """프로세스 전체에서 공유하는 읽기 전용 벡터 저장소 핸들 (항상 최신 버전을 가리키며 swap으로 무중단 교체)"""
+    _lock = threading.Lock()  # 로딩, 교체 및 참조 카운트 보호 (직접 잡지 말고 _locked 사용)
+    _pending_releases = deque()  # 잠금을 얻지 못해 미뤄 둔 핸들 해제 (GC가 잠금을 가진 스레드에서 핸들을 정리한 경우 등)
+    _shared_store = None  # 공유 벡터 저장소 (현재 버전)
+    _ref_count = 0  # 현재 핸들 수
+    _retired = []  # 교체된 이전 버전의 약한 참조 (고정한 질문이 끝나면 해제됨)
+    _warm_up_lock = threading.Lock()  # 예열 상태 보호 (로딩 중에도 대기 없이 조회)
+    _warm_up_thread = None  # 백그라운드 로딩 스레드
+    _warm_up_handle = None  # 첫 세션이 핸들을 얻을 때까지 저장소를 붙잡아 두는 핸들
+    _warm_up_errors = []  # 마지막 예열 중 발생한 오류 메시지
+
+    def __init__(self):
+        # 핸들은 특정 버전을 붙잡지 않으며, 세션 상태가 정리되어 핸들이 사라지면 참조 해제
+        self._finalizer = weakref.finalize(self, SharedVectorStore._release)
+
+    @property
+    def _vector_store(self):
+        return SharedVectorStore._shared_store  # 잠금 없이 현재 버전을 읽음 (교체 중에도 대기하지 않음)
+
+    def pin(self):
+        """현재 버전에 고정된 보기 (질문 처리 도중 교체되어도 끝까지 같은 버전 사용)"""
+        return VectorStoreView(SharedVectorStore._shared_store)
+
+    @classmethod
+    @contextmanager
+    def _locked(cls):
+        """_lock을 잡고, 나올 때 그동안 미뤄 둔 핸들 해제를 반영"""
+        try:
+            with cls._lock:
+                yield
+        finally:
+            cls._apply_releases()
+
+    @classmethod
+    def _apply_releases(cls):
+        # 잠금을 바로 얻지 못하면 지금 잠금을 가진 쪽이 _locked를 나오면서 반영
+        while cls._pending_releases and cls._lock.acquire(blocking=False):
+            try:
+                while cls._pending_releases:
+                    cls._pending_releases.popleft()
+                    cls._ref_count = max(cls._ref_count - 1, 0)
+                    if cls._ref_count == 0:
+                        cls._shared_store = None  # 마지막 핸들이 해제되면 인덱스 메모리 반환
+            finally:
+                cls._lock.release()
+
+    @classmethod
+    def acquire(cls, loader):
+        """공유 벡터 저장소 핸들 획득 (최초 호출 시에만 loader 실행, 예열 중이면 완료될 때까지 대기)"""
+        with cls._locked():
+            if cls._shared_store is None:
+                vector_store = loader()
+                if vector_store is None:
+                    return None
+                cls._shared_store = vector_store
+            cls._ref_count += 1
+            handle = cls()
+        with cls._warm_up_lock:
+            warm_up_handle, cls._warm_up_handle = cls._warm_up_handle, None
+        if warm_up_handle is not None:
+            warm_up_handle.release()  # 세션 핸들이 생겼으므로 예열용 핸들은 해제
+        return handle
+
+    @classmethod
+    def swap(cls, vector_store):
+        """공유 저장소를 새 버전으로 교체 (사용 중인 핸들이 없으면 교체하지 않고 False)
+        진행 중인 질문은 고정한 이전 버전으로 끝까지 처리되고, 이전 버전은 마지막 고정이 사라지면 해제됨"""
+        with cls._locked():
+            if cls._shared_store is None:
+                return False
+            previous, cls._shared_store = cls._shared_store, vector_store
+            cls._retired = [ref for ref in cls._retired if ref() is not None] + [weakref.ref(previous)]
+        return True
+
+    @classmethod
+    def current_version(cls):
+        """현재 공유 저장소의 인덱스 버전 (로딩 전이면 None)"""
+        return getattr(cls._shared_store, 'index_version', None)
+
+    @classmethod
+    def live_versions(cls):
+        """메모리에 남아 있는 인덱스 버전 수 (현재 버전 + 아직 질문이 고정하고 있는 이전 버전)"""
+        return (cls._shared_store is not None) + sum(ref() is not None for ref in cls._retired)
+
+    @classmethod
+    def start_warm_up(cls, loader):
+        """백그라운드 스레드에서 공유 저장소 로딩 시작 (이미 로딩되었거나 진행 중이면 무시)
+        loader는 on_error 키워드 인자로 오류 메시지 수집 함수를 받음"""
+        with cls._warm_up_lock:
+            if cls._shared_store is not None or cls._warm_up_thread is not None:
+                return
+            cls._warm_up_errors = []
+            cls._warm_up_thread = threading.Thread(
+                target=cls._warm_up, args=(loader,), name="vector-store-warm-up", daemon=True
+            )
+            cls._warm_up_thread.start()
+
+    @classmethod
+    def _warm_up(cls, loader):
+        errors = cls._warm_up_errors
+        try:
+            handle = cls.acquire(lambda: loader(on_error=errors.append))
+        except Exception as e:
+            handle = None
+            errors.append(str(e))
+        with cls._warm_up_lock:
+            cls._warm_up_handle = handle
+            cls._warm_up_thread = None
+
+    @classmethod
+    def is_ready(cls):
+        """공유 저장소가 로딩되어 바로 핸들을 얻을 수 있는지 여부"""
+        return cls._shared_store is not None
+
+    @classmethod
+    def is_warming_up(cls):
+        """백그라운드 로딩이 진행 중인지 여부"""
+        return cls._warm_up_thread is not None
+
+    @classmethod
+    def wait_warm_up(cls, timeout=None):
+        """진행 중인 예열이 끝날 때까지 대기하고 (준비 여부, 오류 메시지 목록) 반환"""
+        thread = cls._warm_up_thread
+        if thread is not None:
+            thread.join(timeout)
+        return cls.is_ready(), list(cls._warm_up_errors)
+
+    @classmethod
+    def _release(cls):
+        # weakref.finalize 콜백은 GC가 _lock을 가진 스레드에서 실행할 수도 있으므로 잠금을 기다리지 않고 해제를 미룸
+        cls._pending_releases.append(None)
+        cls._apply_releases()
+
+    @classmethod
+    def ref_count(cls):
+        """현재 공유 저장소를 참조하는 핸들 수"""
+        cls._apply_releases()
+        return cls._ref_count
+
+    def release(self):
+        """핸들 해제 (여러 번 호출해도 한 번만 반영)"""
+        self._finalizer()
@@ -0,0 +1,22 @@
+# 테스트 공통 설정
+# conftest.py
+
+import os
+import sys
+import shutil
+import pytest
+
+ROOT_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT_DIR)  # 저장소 루트의 modules 패키지를 가져오기 위함
+
+DATA_DIR = os.path.join(ROOT_DIR, 'data')
+
+@pytest.fixture
+def corpus(tmp_path):
+    """data/*.txt를 복사한 말뭉치 디렉터리 (테스트에서 파일을 고쳐도 원본은 그대로)"""
+    corpus_dir = tmp_path / 'data'
+    corpus_dir.mkdir()
+    for name in sorted(os.listdir(DATA_DIR)):
+        if name.endswith('.txt'):
+            shutil.copy(os.path.join(DATA_DIR, name), corpus_dir / name)
+    return corpus_dir
@@ -0,0 +1,90 @@
+# 답변 캐시 테스트
+# test_answer_cache.py
+
+import pytest
+from modules import mmu_answer_cache
+from modules.mmu_answer_cache import AnswerCache
+
+class Clock:
+    """time.time 대신 쓰는 수동 시계"""
+
+    def __init__(self):
+        self.now = 1000.0
+
+    def time(self):
+        return self.now
+
+
+@pytest.fixture
+def clock(monkeypatch):
+    clock = Clock()
+    monkeypatch.setattr(mmu_answer_cache, 'time', clock)
+    return clock
+
+
+def test_exact_tier_matches_normalized_question():
+    cache = AnswerCache()
+    cache.put("수강신청 기간은 언제인가요?", 'v1', "2월입니다.", ['c1'])
+
+    entry = cache.get_exact("수강신청 기간  언제인가요", 'v1')
+    assert entry['response'] == "2월입니다." and entry['doc_ids'] == ['c1']
+    assert cache.get_exact("재수강 기준", 'v1') is None
+    assert cache.stats == {'exact_hits': 1, 'semantic_hits': 0, 'misses': 0}  # 정확 일치 실패는 세지 않음
+
+
+def test_similar_tier_uses_cosine_threshold():
+    cache = AnswerCache(threshold=0.95)
+    cache.put("성적 평가 기준", 'v1', "상대평가", [], embedding=[1.0, 0.0, 0.0])
+    cache.put("lexical 경로로 저장한 답변", 'v1', "임베딩 없음", [])  # 임베딩 없이 저장된 항목은 유사도 비교에서 제외
+
+    assert cache.get_similar('v1', [0.99, 0.1, 0.0])['response'] == "상대평가"
+    assert cache.get_similar('v1', [0.5, 0.5, 0.0]) is None
+    assert cache.get_similar('v1', None) is None
+    assert cache.stats == {'exact_hits': 0, 'semantic_hits': 1, 'misses': 2}
+
+    assert cache.get("성적 평가 기준", 'v1', [0.0, 1.0, 0.0])['response'] == "상대평가"  # 정확 일치 우선
+    assert cache.stats['exact_hits'] == 1
+
+
+def test_entries_expire_after_ttl(clock):
+    cache = AnswerCache(ttl=60)
+    cache.put("a", 'v1', "A", [], embedding=[1.0, 0.0])
+    clock.now += 30
+    cache.put("b", 'v1', "B", [], embedding=[0.0, 1.0])
+
+    clock.now += 31  # a는 61초, b는 31초 경과
+    assert cache.get_exact("a", 'v1') is None
+    assert cache.get_similar('v1', [1.0, 0.0]) is None  # 만료된 항목은 유사도 조회에서도 제외
+    assert cache.get_exact("b", 'v1')['response'] == "B"
+    assert len(cache) == 1
+
+    cache.put("b", 'v1', "B2", [])  # 다시 저장하면 만료 시각도 갱신
+    clock.now += 59
+    assert cache.get_exact("b", 'v1')['response'] == "B2"
+    clock.now += 2
+    assert cache.get_exact("b", 'v1') is None and len(cache) == 0
+
+
+def test_lru_eviction_keeps_recently_used(clock):
+    cache = AnswerCache(max_entries=2, ttl=60)
+    cache.put("a", 'v1', "A", [])
+    cache.put("b", 'v1', "B", [])
+    cache.get_exact("a", 'v1')  # a를 최근 사용으로
+    cache.put("c", 'v1', "C", [])
+
+    assert cache.get_exact("b", 'v1') is None
+    assert [cache.get_exact(q, 'v1')['response'] for q in ("a", "c")] == ["A", "C"]
+
+    clock.now += 61  # 제거된 항목이 만료 목록에 남아 있지 않음
+    assert cache.get_exact("a", 'v1') is None and len(cache) == 0
+
+
+def test_index_version_change_invalidates_everything():
+    cache = AnswerCache()
+    cache.put("a", 'v1', "A", [], embedding=[1.0, 0.0])
+
+    assert cache.get_exact("a", 'v2') is None
+    assert cache.get_similar('v2', [1.0, 0.0]) is None
+    assert len(cache) == 0 and cache.index_version == 'v2'
+    cache.put("a", 'v2', "A2", [])
+    assert cache.get_exact("a", 'v2')['response'] == "A2"
@@ -0,0 +1,162 @@
+# HTTP API 테스트
+# test_api.py
+
+import json
+import asyncio
+import argparse
+import threading
+import pytest
+from aiohttp.test_utils import TestClient, TestServer
+from langchain_core.documents.base import Document
+from mmu_api import create_app, STORE_KEY, CHAT_MODEL_KEY
+from modules.mmu_response_generator import ResponseGenerator, GenerationBacklogFull
+from modules.mmu_single_flight import SingleFlight
+from modules.mmu_fakes import FakeChatModel
+
+DEPARTMENT = {'name': "교무처", 'phone': "240-7042"}
+
+class StubVectorStore:
+    index_version = 'v1'
+
+    def release(self):
+        pass
+
+
+class Gate:
+    """'느린'으로 시작하는 질문의 검색을 열릴 때까지 붙잡아 두는 문 (생성 작업자를 점유한 상태를 흉내 냄)"""
+
+    def __init__(self):
+        self.opened = threading.Event()
+        self.entered = threading.Semaphore(0)
+        self.running = 0
+        self.peak = 0
+        self._lock = threading.Lock()
+
+    def prepare_question(self, question, vector_store, session=None, use_faq=True):
+        with self._lock:
+            self.running += 1
+            self.peak = max(self.peak, self.running)
+        self.entered.release()
+        try:
+            if question.startswith("느린"):
+                self.opened.wait(10)
+        finally:
+            with self._lock:
+                self.running -= 1
+        doc = Document(page_content="수강신청은 2월에 한다.", metadata={'source': '수업.txt', 'chunk_id': 'c1', 'section': 1})
+        return {'response': None, 'context': doc.page_content, 'docs': [doc], 'department_info': DEPARTMENT,
+                'embedding': None, 'index_version': 'v1'}
+
+
+@pytest.fixture
+def gate(monkeypatch):
+    gate = Gate()
+    monkeypatch.setattr(ResponseGenerator, 'prepare_question', staticmethod(gate.prepare_question))
+    monkeypatch.setattr(ResponseGenerator, 'store_answer', staticmethod(lambda *args, **kwargs: None))
+    monkeypatch.setattr(ResponseGenerator, 'in_flight', SingleFlight())
+    yield gate
+    gate.opened.set()
+    if ResponseGenerator.generation_pool is not None:
+        ResponseGenerator.generation_pool.shutdown(wait=True)  # 다음 테스트가 남은 생성 수를 보지 않도록
+    ResponseGenerator.limit_llm_concurrency(None)
+
+
+def make_app(max_concurrent_llm=2, max_pending=8):
+    app = create_app(argparse.Namespace(max_concurrent_llm=max_concurrent_llm, max_pending=max_pending))
+    app.on_startup.clear()  # 인덱스를 불러오지 않고 가짜 저장소와 모델 사용
+    app[STORE_KEY] = StubVectorStore()
+    app[CHAT_MODEL_KEY] = FakeChatModel()
+    ResponseGenerator.limit_llm_concurrency(max_concurrent_llm, max_pending)
+    return app
+
+
+def run(app, scenario):
+    async def main():
+        async with TestClient(TestServer(app)) as client:
+            return await scenario(client)
+    return asyncio.run(main())
+
+
+def parse_events(text):
+    events = []
+    for block in text.strip().split('\n\n'):
+        event, data = block.split('\n')
+        events.append((event.removeprefix('event: '), json.loads(data.removeprefix('data: '))))
+    return events
+
+
+def test_ask_returns_answer_sources_and_session(gate):
+    async def scenario(client):
+        response = await client.post('/ask', json={'question': " 수강신청 언제 해요? ", 'session': {'last_department_info': None}})
+        return response.status, await response.json()
+
+    status, body = run(make_app(), scenario)
+    assert status == 200
+    assert body['answer'].startswith("📌 핵심 요약:\n수강신청 언제 해요?에 대한 답변입니다.")
+    assert body['formatted'].startswith("📌 핵심 요약:")
+    assert body['sources'] == [{'source': '수업.txt', 'category': None, 'section': 1, 'title': None, 'chunk_id': 'c1'}]
+    assert body['session'] == {'last_department_info': DEPARTMENT}
+
+
+@pytest.mark.parametrize('body', [None, [], {'question': "  "}, {'question': 3}])
+def test_ask_rejects_invalid_bodies(gate, body):
+    async def scenario(client):
+        response = await client.post('/ask', data=json.dumps(body) if body is not None else b'not json')
+        return response.status, await response.json()
+
+    status, body = run(make_app(), scenario)
+    assert status == 400 and 'error' in body
+
+
+def test_stream_sends_tokens_then_done(gate):
+    async def scenario(client):
+        response = await client.post('/ask/stream', json={'question': "수강신청 언제 해요?"})
+        return response.status, response.headers['Content-Type'], await response.text()
+
+    status, content_type, text = run(make_app(), scenario)
+    events = parse_events(text)
+    assert status == 200 and content_type == 'text/event-stream'
+    assert [event for event, _ in events[:-1]] == ['token'] * (len(events) - 1) and len(events) > 2
+    event, done = events[-1]
+    assert event == 'done' and done['session'] == {'last_department_info': DEPARTMENT}
+    assert done['formatted'].startswith("📌 핵심 요약:\n수강신청 언제 해요?에 대한 답변입니다.")
+
+
+def test_full_backlog_returns_503(gate):
+    async def scenario(client):
+        slow = asyncio.ensure_future(client.post('/ask', json={'question': "느린 질문"}))
+        await asyncio.get_running_loop().run_in_executor(None, gate.entered.acquire)  # 생성 작업자가 질문을 잡을 때까지
+        busy = await client.post('/ask', json={'question': "다른 질문"})
+        busy_stream = await client.post('/ask/stream', json={'question': "또 다른 질문"})
+        health = await (await client.get('/healthz')).json()
+        gate.opened.set()
+        slow = await slow
+        return busy.status, busy.headers['Retry-After'], busy_stream.status, health, slow.status
+
+    busy, retry_after, busy_stream, health, slow = run(make_app(max_concurrent_llm=1, max_pending=1), scenario)
+    assert busy == busy_stream == 503 and retry_after == '1'
+    assert health['pending_generations'] == 1 and health['in_flight_requests'] == 1
+    assert slow == 200  # 먼저 받은 질문은 그대로 답변
+
+
+def test_generation_runs_on_a_bounded_pool(gate):
+    ResponseGenerator.limit_llm_concurrency(2)
+    flights = [ResponseGenerator.start_question(f"느린 질문 {i}", StubVectorStore(), FakeChatModel()) for i in range(6)]
+    for _ in range(2):
+        assert gate.entered.acquire(timeout=5)
+    assert not gate.entered.acquire(timeout=0.2)  # 나머지 질문은 작업자를 기다림
+    assert ResponseGenerator.generation_pending == 6
+    gate.opened.set()
+
+    assert all(flight.wait(10)['response'] for flight in flights)
+    assert gate.peak == 2
+
+
+def test_rejected_question_fails_its_flight(gate):
+    ResponseGenerator.limit_llm_concurrency(1, max_pending=1)
+    first = ResponseGenerator.start_question("느린 질문", StubVectorStore(), FakeChatModel())
+    with pytest.raises(GenerationBacklogFull):
+        ResponseGenerator.start_question("다른 질문", StubVectorStore(), FakeChatModel())
+    assert len(ResponseGenerator.in_flight) == 1  # 거절된 질문은 병합 대상으로 남지 않음
+    gate.opened.set()
+    assert first.wait(10)['response']
@@ -0,0 +1,37 @@
+# 청크 저장소 테스트
+# test_chunk_store.py
+
+import os
+from langchain_core.documents.base import Document
+from modules.mmu_chunk_store import ChunkStore, ChunkIdMapping
+
+def make_documents():
+    return [
+        Document(page_content="재수강 성적은 A0까지", metadata={'chunk_id': 'a' * 64, 'source': '성적.txt', 'section': 3, 'title': None}),
+        Document(page_content="", metadata={'chunk_id': 'b' * 64, 'source': '수업.txt', 'section': 1, 'title': "수업"}),
+        Document(page_content="계절학기 6학점", metadata={'chunk_id': 'c' * 64, 'source': '성적.txt', 'section': 7, 'title': "계절"})
+    ]
+
+
+def test_round_trip(tmp_path):
+    documents = make_documents()
+    ChunkStore.write(str(tmp_path), documents)
+    store = ChunkStore(str(tmp_path))
+
+    assert len(store) == 3
+    assert [(doc.page_content, doc.metadata) for doc in store.documents()] == [
+        (doc.page_content, doc.metadata) for doc in documents
+    ]
+    assert store.search('c' * 64).metadata['section'] == 7
+    assert store.search('missing').startswith("ID missing")
+    assert list(ChunkIdMapping(store).values()) == [doc.metadata['chunk_id'] for doc in documents]
+
+
+def test_rewrite_replaces_files_atomically(tmp_path):
+    ChunkStore.write(str(tmp_path), make_documents())
+    reader = ChunkStore(str(tmp_path))  # 교체 전 파일을 매핑한 읽기 프로세스
+    ChunkStore.write(str(tmp_path), make_documents()[:1])
+
+    assert not [name for name in os.listdir(tmp_path) if name.endswith('.tmp')]
+    assert len(ChunkStore(str(tmp_path))) == 1
+    assert reader.document(2).page_content == "계절학기 6학점"  # 기존 매핑은 그대로 읽힘
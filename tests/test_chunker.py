@@ -0,0 +1,88 @@
+# 청크 분할 테스트
+# test_chunker.py
+
+import os
+import random
+import pytest
+from modules.mmu_chunker import SectionChunker
+from modules.mmu_file_handler import DocumentProcessor
+from conftest import DATA_DIR
+
+def data_sections():
+    """data/*.txt의 (파일 이름, 섹션 본문) 목록"""
+    sections = []
+    for name in sorted(os.listdir(DATA_DIR)):
+        if name.endswith('.txt'):
+            with open(os.path.join(DATA_DIR, name), 'r', encoding='utf-8') as file:
+                sections.extend((name, section) for _, section in DocumentProcessor.iter_sections(file))
+    return sections
+
+LONG_TEXTS = [
+    "제목\n" + "\n".join(f"{i}. 조항 {i}의 내용은 다음과 같다. " + "세부 설명 " * 20 for i in range(1, 30)),
+    "제목\n" + "쉼표가 있는 긴 문단, " * 200,  # 줄바꿈 없이 문장/구문 경계만 있는 구간
+    "제목\n" + "띄어쓰기만 있는 단어 " * 300,
+    "제목\n" + "가" * 3000  # 구분 위치가 전혀 없는 구간
+]
+
+def assert_span_invariants(text, start, spans, chunk_size):
+    previous_start, previous_end = -1, -1
+    covered = set()
+    for span_start, span_end in spans:
+        assert start <= span_start < span_end <= len(text)
+        assert span_end - span_start <= chunk_size
+        assert not text[span_start].isspace() and not text[span_end - 1].isspace()  # 앞뒤 공백 없음
+        assert span_start > previous_start and span_end > previous_end  # 순서대로 진행 (앞 청크에 포함되는 청크 없음)
+        previous_start, previous_end = span_start, span_end
+        covered.update(range(span_start, span_end))
+    # 공백이 아닌 모든 글자가 어느 청크에든 포함됨
+    assert all(i in covered for i in range(start, len(text)) if not text[i].isspace())
+
+
+@pytest.mark.parametrize('chunk_size, chunk_overlap', [(800, 300), (200, 80), (60, 20)])
+def test_span_invariants(chunk_size, chunk_overlap):
+    texts = [section for _, section in data_sections()] + LONG_TEXTS
+    for text in texts:
+        content_start = text.find('\n') + 1
+        spans = SectionChunker.split(text, content_start, chunk_size=chunk_size, chunk_overlap=chunk_overlap)
+        assert_span_invariants(text, content_start, spans, chunk_size)
+
+
+def test_numbered_clauses_stay_whole():
+    text = LONG_TEXTS[0]
+    spans = SectionChunker.split(text, text.find('\n') + 1, chunk_size=800, chunk_overlap=300)
+    for span_start, span_end in spans:
+        chunk = text[span_start:span_end]
+        assert chunk[0].isdigit() and chunk.endswith("세부 설명")  # 조항 경계에서만 자름
+
+
+def test_chunk_metadata_points_into_source():
+    for name in sorted(os.listdir(DATA_DIR)):
+        if not name.endswith('.txt'):
+            continue
+        path = os.path.join(DATA_DIR, name)
+        with open(path, 'r', encoding='utf-8') as file:
+            source_text = file.read()
+        open_text = lambda: open(path, 'r', encoding='utf-8')
+        for chunk, _ in DocumentProcessor.iter_source_chunks(os.path.splitext(name)[0], path, open_text):
+            assert source_text[chunk.metadata['start']:chunk.metadata['end']] == chunk.page_content
+            assert chunk.metadata['chunk_id'] == DocumentProcessor.compute_chunk_id(chunk)
+
+
+
+def random_section(rng):
+    """번호 조항, 세부 항목, 빈 줄, 문장 부호, 공백이 섞인 임의의 섹션"""
+    pieces = ['\n1. ', '\n가. ', '\n1) ', '\n(2) ', '\n① ', '\n 3. ', '\n', '\n\n', '. ', ', ', '? ', ' ', '  ']
+    parts = []
+    for _ in range(rng.randint(1, 60)):
+        parts.append(rng.choice(pieces) if rng.random() < 0.5 else '가나다라xyz'[:rng.randint(1, 7)] * rng.randint(1, 3))
+    return "제목\n" + ''.join(parts)
+
+
+@pytest.mark.parametrize('chunk_size, chunk_overlap', [(20, 8), (60, 30), (100, 10)])
+def test_random_sections_keep_span_invariants(chunk_size, chunk_overlap):
+    rng = random.Random(chunk_size)
+    for _ in range(2000):
+        text = random_section(rng)
+        content_start = text.find('\n') + 1
+        spans = SectionChunker.split(text, content_start, chunk_size=chunk_size, chunk_overlap=chunk_overlap)
+        assert_span_invariants(text, content_start, spans, chunk_size)
@@ -0,0 +1,78 @@
+# 컨텍스트 압축 테스트
+# test_context_compactor.py
+
+from langchain_core.documents.base import Document
+from modules.mmu_context_compactor import ContextCompactor
+from modules.mmu_config import CONTEXT_CHARS_PER_TOKEN
+
+SECTION = ("재수강한 교과목의 성적은 A0를 초과할 수 없다. 재수강은 성적이 C+ 이하인 교과목만 가능하며, "
+           "재학 중 재수강할 수 있는 학점은 24학점 이내로 한다. 폐지된 교과목은 대체 교과목으로 재수강한다. "
+           "재수강 신청은 수강신청 기간에 하며, 재수강한 교과목의 이전 성적은 성적증명서에 표기하지 않는다.")
+
+def span_doc(start, end, source='성적.txt', section=3):
+    return Document(page_content=SECTION[start:end], metadata={'source': source, 'section': section, 'start': start, 'end': end})
+
+
+def test_overlapping_and_adjacent_spans_merge_in_source_order():
+    docs = [span_doc(40, 70), span_doc(0, 50), span_doc(70, 90), span_doc(100, 120)]
+    passages = ContextCompactor.merge_adjacent(docs)
+
+    # 0~50과 40~70은 겹치고 70~90은 맞닿아 하나로, 100~120은 떨어져 있어 따로
+    assert passages == [(0, SECTION[0:90]), (3, SECTION[100:120])]
+
+
+def test_contained_span_is_absorbed():
+    assert ContextCompactor.merge_adjacent([span_doc(10, 30), span_doc(0, 60)]) == [(0, SECTION[0:60])]
+
+
+def test_spans_from_other_sections_are_not_merged():
+    docs = [span_doc(0, 50), span_doc(40, 70, section=4), span_doc(40, 70, source='수업.txt')]
+    assert len(ContextCompactor.merge_adjacent(docs)) == 3
+
+
+def test_text_overlap_is_used_only_without_spans():
+    first = Document(page_content=SECTION[0:60], metadata={'source': '성적.txt', 'section': 3})
+    second = Document(page_content=SECTION[35:100], metadata={'source': '성적.txt', 'section': 3})
+    short = Document(page_content=SECTION[91:130], metadata={'source': '성적.txt', 'section': 3})
+    # 첫 두 청크는 25자가 겹쳐 병합, 세 번째는 겹침이 CONTEXT_MIN_OVERLAP보다 짧아 따로
+    assert ContextCompactor.merge_adjacent([first, second, short]) == [(0, SECTION[0:100]), (2, SECTION[91:130])]
+
+
+def test_near_duplicates_from_other_sources_keep_the_higher_rank():
+    copy = SECTION.replace("24학점", "24 학점")  # 다른 파일에 실린 같은 규정 (공백만 다름)
+    edited = SECTION.replace("A0", "B+")  # 한 곳만 다른 문장
+    unrelated = "수강신청은 매 학기 2월과 8월에 학사정보시스템에서 한다."
+
+    shingles = ContextCompactor.shingles
+    assert len(shingles(SECTION) & shingles(edited)) / len(shingles(SECTION) | shingles(edited)) >= 0.9
+    kept = ContextCompactor.drop_duplicates([(2, copy), (0, SECTION), (3, edited), (1, unrelated)])
+
+    assert kept == [(0, SECTION), (1, unrelated)]
+
+
+def test_substring_of_a_kept_passage_is_dropped():
+    assert ContextCompactor.drop_duplicates([(0, SECTION), (1, SECTION[:30])]) == [(0, SECTION)]
+
+
+def test_budget_keeps_passages_in_rank_order_until_full():
+    passages = [(1, '가' * 40), (0, '나' * 38), (2, '다' * 10)]  # 추정 토큰 21, 20, 6
+    assert ContextCompactor.apply_budget(passages, token_budget=30) == ['나' * 38, '다' * 10]
+    assert ContextCompactor.apply_budget(passages, token_budget=41) == ['나' * 38, '가' * 40]
+
+
+def test_first_passage_over_budget_is_truncated():
+    selected = ContextCompactor.apply_budget([(0, '가' * 100), (1, '나' * 4)], token_budget=10)
+    assert selected == ['가' * int(10 * CONTEXT_CHARS_PER_TOKEN)]
+
+
+def test_compact_reports_what_was_removed():
+    docs = [span_doc(0, 50), span_doc(40, 90), span_doc(0, 90, source='성적(사본).txt'), span_doc(100, 160)]
+    text, stats = ContextCompactor.compact(docs, token_budget=ContextCompactor.estimate_tokens(SECTION[0:90]))
+
+    assert text == SECTION[0:90]
+    assert stats == {
+        'original_chars': sum(len(doc.page_content) for doc in docs) + 3 * 2,
+        'compacted_chars': 90,
+        'chars_saved': stats['original_chars'] - 90,
+        'merged': 1, 'duplicates': 1, 'over_budget': 1
+    }
@@ -0,0 +1,128 @@
+# 인덱스 무중단 교체 테스트
+# test_data_watcher.py
+
+import gc
+import os
+import time
+import threading
+import pytest
+from modules.mmu_data_watcher import DataWatcher
+from modules.mmu_vector_store import VectorStoreManager, SharedVectorStore, VectorStoreView
+from modules.mmu_fakes import FakeEmbeddings
+
+class StubStore:
+    """검색 결과 대신 자신의 버전을 돌려주고, gate가 열릴 때까지 검색을 붙잡아 둘 수 있는 벡터 저장소"""
+
+    def __init__(self, index_version, gate=None):
+        self.index_version = index_version
+        self.gate = gate
+        self.searching = threading.Event()
+
+    def similarity_search_by_vector(self, embedding, k=4):
+        self.searching.set()
+        if self.gate is not None:
+            self.gate.wait(5)
+        return [self.index_version] * k
+
+
+@pytest.fixture(autouse=True)
+def reset_shared_store():
+    """테스트마다 프로세스 전역 상태를 비움"""
+    yield
+    gc.collect()
+    SharedVectorStore._pending_releases.clear()
+    SharedVectorStore._shared_store = None
+    SharedVectorStore._ref_count = 0
+    SharedVectorStore._retired = []
+
+
+@pytest.fixture
+def make_watcher(corpus, tmp_path, monkeypatch):
+    """corpus를 감시하는 DataWatcher 생성 함수 (워커 프로세스마다 하나씩 만드는 감시자를 흉내 냄)"""
+    monkeypatch.chdir(tmp_path)  # 임베딩 캐시(.cache)를 임시 디렉터리에 둠
+
+    def make_watcher(**kwargs):
+        return DataWatcher(data_dir=str(corpus), embeddings=FakeEmbeddings(dimension=16),
+                           index_dir=str(tmp_path / 'index'), **kwargs)
+
+    return make_watcher
+
+
+def test_pinned_view_keeps_its_version_after_swap():
+    handle = SharedVectorStore.acquire(lambda: StubStore('v1'))
+    view = handle.pin()
+    assert isinstance(view, VectorStoreView) and view.pin() is view
+
+    assert SharedVectorStore.swap(StubStore('v2'))
+    assert view.index_version == 'v1' and view.similarity_search_by_vector(None, k=1) == ['v1']
+    assert handle.index_version == 'v2' and handle.pin().index_version == 'v2'
+    assert SharedVectorStore.live_versions() == 2
+
+    del view
+    gc.collect()
+    assert SharedVectorStore.live_versions() == 1  # 고정이 사라지면 이전 버전 해제
+    handle.release()
+
+
+def test_swap_during_search_finishes_on_the_pinned_version():
+    gate = threading.Event()
+    old = StubStore('v1', gate)
+    handle = SharedVectorStore.acquire(lambda: old)
+    results = []
+    thread = threading.Thread(target=lambda: results.append(handle.pin().similarity_search_by_vector(None, k=2)))
+    thread.start()
+    assert old.searching.wait(5)
+
+    assert SharedVectorStore.swap(StubStore('v2'))  # 검색이 끝나기를 기다리지 않고 교체
+    assert handle.similarity_search_by_vector(None, k=2) == ['v2', 'v2']
+    gate.set()
+    thread.join(5)
+
+    assert results == [['v1', 'v1']]
+    handle.release()
+
+
+def test_swap_without_handles_is_skipped():
+    assert not SharedVectorStore.swap(StubStore('v2'))
+    assert SharedVectorStore.current_version() is None
+
+
+def test_concurrent_load_waits_and_reuses_the_built_index(make_watcher, tmp_path):
+    winner, loser = make_watcher(), make_watcher()
+    index_path = tmp_path / 'index' / 'index.faiss'
+    results = []
+    with VectorStoreManager.file_lock(str(tmp_path / 'index')):
+        winner.build(winner.scan(), pytest.fail)  # 먼저 잠금을 잡은 워커가 인덱스 생성
+        thread = threading.Thread(target=lambda: results.append(loser.load(pytest.fail)))
+        thread.start()
+        thread.join(0.5)
+        assert thread.is_alive()  # 잠금이 풀릴 때까지 대기
+        built = os.stat(index_path).st_ino
+    thread.join(30)
+
+    assert results[0].index_version == VectorStoreManager.load_manifest(str(tmp_path / 'index'))['version']
+    assert loser.embeddings.calls == 0  # 디스크의 인덱스를 임베딩 없이 불러옴
+    assert os.stat(index_path).st_ino == built  # 다시 쓰지 않음
+
+
+def test_poll_waits_until_changed_files_settle(make_watcher, corpus):
+    watcher = make_watcher(settle=60.0)
+    handle = SharedVectorStore.acquire(lambda: watcher.load(pytest.fail))
+    first_version = handle.index_version
+    assert watcher.poll(pytest.fail) is None  # 바뀐 파일 없음
+
+    path = corpus / '수업.txt'
+    with open(path, 'a', encoding='utf-8') as file:
+        file.write("\n\n휴강 안내\n휴강한 수업은 학기 중에 보강한다.")
+    assert watcher.poll(pytest.fail) is None  # 방금 수정한 파일은 반영하지 않음
+    assert watcher.stats['rebuilds'] == 1
+
+    settled = time.time_ns() - 61 * 10 ** 9
+    os.utime(path, ns=(settled, settled))  # 마지막 수정 후 settle 시간이 지난 것으로
+    new_version = watcher.poll(pytest.fail)
+
+    assert new_version is not None and new_version != first_version
+    assert handle.index_version == new_version
+    assert watcher.stats['rebuilds'] == 2 and watcher.stats['swaps'] == 1
+    assert watcher.stats['rechunked_files'] == len(os.listdir(corpus)) + 1  # 두 번째 재구성은 바뀐 파일만 다시 분할
+    handle.release()
@@ -0,0 +1,94 @@
+# 로컬 임베딩 백엔드 테스트
+# test_embedding_backend.py
+
+import os
+import sys
+import hashlib
+import subprocess
+import numpy as np
+import pytest
+from conftest import ROOT_DIR
+from modules.mmu_embedding_backend import HashedTfidfEmbeddings, EmbeddingBackend
+from modules.mmu_file_handler import DocumentProcessor
+from modules.mmu_vector_store import VectorStoreManager
+
+TEXTS = [
+    "재수강한 교과목의 성적은 A0를 초과할 수 없다.",
+    "수강신청은 매 학기 2월과 8월에 한다.",
+    "계절학기는 6학점까지 수강할 수 있다.",
+    "학기말시험은 수업일수의 3/4 이상 출석해야 응시할 수 있다."
+]
+
+def small_embeddings(**kwargs):
+    return HashedTfidfEmbeddings(**{'dimension': 64, 'n_features': 2 ** 12, 'idf_path': None, **kwargs})
+
+
+def snapshot(root):
+    """root 아래 파일별 (크기, 수정 시각, 내용 해시) (data 디렉터리 제외)"""
+    files = {}
+    for directory, subdirectories, names in os.walk(root):
+        subdirectories[:] = [name for name in subdirectories if name != 'data']
+        for name in names:
+            path = os.path.join(directory, name)
+            with open(path, 'rb') as file:
+                digest = hashlib.sha256(file.read()).hexdigest()
+            files[os.path.relpath(path, root)] = (os.path.getsize(path), os.stat(path).st_mtime_ns, digest)
+    return files
+
+
+def run_check(cwd):
+    env = {**os.environ, 'EMBEDDING_BACKEND': 'local'}
+    return subprocess.run([sys.executable, os.path.join(ROOT_DIR, 'mmu_embedding_migrate.py'), '--check'],
+                          cwd=cwd, env=env, capture_output=True, text=True, timeout=300)
+
+
+def test_vectors_are_deterministic_and_normalized():
+    first, second = small_embeddings().fit(TEXTS), small_embeddings().fit(TEXTS)
+    vectors = np.asarray(first.embed_documents(TEXTS))
+
+    assert first.model_name == second.model_name
+    assert np.array_equal(vectors, np.asarray(second.embed_documents(TEXTS)))
+    assert np.allclose(np.linalg.norm(vectors, axis=1), 1.0)
+    assert np.array_equal(np.asarray(first.embed_query(TEXTS[2])), vectors[2])  # 배치 구성과 무관
+    assert not np.array_equal(np.asarray(small_embeddings(seed=1).fit(TEXTS).embed_documents(TEXTS)), vectors)
+
+
+def test_transform_requires_a_fitted_idf():
+    with pytest.raises(RuntimeError):
+        small_embeddings().embed_query(TEXTS[0])
+
+
+def test_idf_is_saved_and_reloaded(tmp_path):
+    idf_path = str(tmp_path / 'cache' / 'idf.npy')
+    fitted = small_embeddings(idf_path=idf_path)
+    EmbeddingBackend.prepare(fitted, TEXTS)  # 학습 전이면 학습하여 저장
+    assert os.listdir(tmp_path / 'cache') == ['idf.npy']
+
+    loaded = small_embeddings(idf_path=idf_path)
+    assert loaded.is_fitted and loaded.model_name == fitted.model_name
+    assert np.array_equal(loaded.idf, fitted.idf)
+    assert loaded.embed_documents(TEXTS) == fitted.embed_documents(TEXTS)
+
+    EmbeddingBackend.prepare(loaded, TEXTS[:1])  # 이미 학습된 IDF는 다시 학습하지 않음
+    assert loaded.model_name == fitted.model_name
+    assert not small_embeddings(idf_path=idf_path, n_features=2 ** 10).is_fitted  # 버킷 수가 다른 IDF는 무시
+
+
+def test_check_leaves_index_and_cache_untouched(corpus, tmp_path, monkeypatch):
+    empty = tmp_path / 'empty'
+    empty.mkdir()
+    result = run_check(empty)
+    assert result.returncode == 1 and "저장된 인덱스가 없습니다" in result.stdout
+    assert os.listdir(empty) == []  # IDF를 학습하거나 캐시를 만들지 않음
+
+    monkeypatch.chdir(tmp_path)  # 기본 상대 경로(faiss_index, .cache)를 임시 디렉터리 기준으로
+    embeddings = HashedTfidfEmbeddings()
+    documents = DocumentProcessor.iter_chunks(data_dir=str(corpus), workers=1)
+    assert VectorStoreManager.create_vector_store(documents, embeddings=embeddings, on_error=pytest.fail, sharded=False)
+    before = snapshot(tmp_path)
+    assert any(path.startswith('faiss_index') for path in before) and any(path.startswith('.cache') for path in before)
+
+    result = run_check(tmp_path)
+    assert result.returncode == 0, result.stdout + result.stderr
+    assert "호환됩니다." in result.stdout and embeddings.model_name in result.stdout
+    assert snapshot(tmp_path) == before
@@ -0,0 +1,79 @@
+# 임베딩 캐시 테스트
+# test_embedding_cache.py
+
+import sqlite3
+import pytest
+from modules.mmu_embedding_cache import EmbeddingCache, CachedEmbeddings
+from modules.mmu_fakes import FakeEmbeddings
+
+def stored_access(path, cache, namespace, text):
+    """디스크에 기록된 마지막 접근 시각"""
+    with sqlite3.connect(path) as conn:
+        row = conn.execute("SELECT last_access FROM embeddings WHERE key = ?",
+                           (EmbeddingCache.make_key(namespace, text),)).fetchone()
+    return row[0] if row else None
+
+
+def test_hits_do_not_write_to_disk(tmp_path):
+    cache = EmbeddingCache(str(tmp_path / 'cache.sqlite3'))
+    cache.put_many('m', ['a', 'b'], [[1.0, 2.0], [3.0, 4.0]])
+    changes = cache._conn.total_changes
+
+    assert cache.get_many('m', ['a', 'c', 'b']) == [[1.0, 2.0], None, [3.0, 4.0]]
+    assert cache._conn.total_changes == changes
+    assert (cache.hits, cache.misses) == (2, 1)
+
+
+def test_access_times_are_flushed_with_the_next_put(tmp_path):
+    path = str(tmp_path / 'cache.sqlite3')
+    cache = EmbeddingCache(path)
+    cache.put_many('m', ['a'], [[1.0]])
+    written = stored_access(path, cache, 'm', 'a')
+
+    cache.get_many('m', ['a'])
+    assert stored_access(path, cache, 'm', 'a') == written  # 조회만으로는 기록하지 않음
+    cache.put_many('m', ['b'], [[2.0]])
+    assert stored_access(path, cache, 'm', 'a') > written
+
+
+def test_eviction_keeps_recently_read_entries(tmp_path):
+    cache = EmbeddingCache(str(tmp_path / 'cache.sqlite3'), max_entries=10)
+    texts = [f"t{i}" for i in range(10)]
+    for text in texts:
+        cache.put_many('m', [text], [[0.0]])
+    cache.get_many('m', ['t0', 't1'])  # 가장 먼저 넣었지만 최근에 읽은 항목
+
+    cache.put_many('m', ['new'], [[1.0]])
+
+    # 최대 10개를 넘으면 9개(10%의 여유)까지 한 번에 줄임
+    assert cache.stats()['entries'] == 9 == cache._count_rows()
+    remaining = [text for text, vector in zip(texts, cache.get_many('m', texts)) if vector is not None]
+    assert remaining[:2] == ['t0', 't1']
+    assert cache.get_many('m', ['t2', 't3'])[0] is None
+
+
+def test_row_count_tracks_duplicates_and_other_writers(tmp_path):
+    path = str(tmp_path / 'cache.sqlite3')
+    cache = EmbeddingCache(path, max_entries=5)
+    cache.put_many('m', ['a', 'b'], [[1.0], [2.0]])
+    cache.put_many('m', ['a'], [[1.0]])  # 이미 있는 키
+    assert cache.stats()['entries'] == 2
+
+    other = EmbeddingCache(path, max_entries=5)  # 같은 파일을 쓰는 다른 워커
+    other.put_many('m', ['c', 'd', 'e'], [[3.0], [4.0], [5.0]])
+    cache.put_many('m', ['f'], [[6.0]])  # 이 프로세스의 셈으로는 3개지만 실제로는 6개
+    cache.put_many('m', ['g', 'h', 'i'], [[7.0], [8.0], [9.0]])
+    assert cache._count_rows() <= 5
+
+
+def test_cached_embeddings_call_the_model_once(tmp_path):
+    model = FakeEmbeddings(dimension=4)
+    embeddings = CachedEmbeddings(model, 'fake', EmbeddingCache(str(tmp_path / 'cache.sqlite3')))
+
+    first = embeddings.embed_documents(['x', 'y', 'x'])
+    second = embeddings.embed_documents(['y', 'x'])
+    assert model.calls == 1
+    assert second[0] == pytest.approx(first[1], abs=1e-6) and second[1] == pytest.approx(first[0], abs=1e-6)  # float32로 저장
+    query = embeddings.embed_query('x')
+    assert embeddings.embed_query('x') == pytest.approx(query, abs=1e-6)
+    assert model.calls == 2  # 질문 임베딩은 문서 임베딩과 따로 캐시
@@ -0,0 +1,112 @@
+# 임베딩 파이프라인 테스트
+# test_embedding_pipeline.py
+
+import threading
+import pytest
+from modules.mmu_embedding_pipeline import AdaptiveLimiter, EmbeddingPipeline
+from modules.mmu_fakes import FakeEmbeddings
+
+class FailingEmbeddings(FakeEmbeddings):
+    """지정한 텍스트가 들어 있는 배치에서 할당량 오류가 아닌 오류를 내는 임베딩 (중단 흉내)"""
+
+    def __init__(self, fail_text, **kwargs):
+        super().__init__(**kwargs)
+        self.fail_text = fail_text
+
+    def embed_documents(self, texts):
+        if self.fail_text in texts:
+            raise RuntimeError("connection reset")
+        return super().embed_documents(texts)
+
+
+def test_limiter_halves_on_rate_limit_and_recovers():
+    limiter = AdaptiveLimiter(4)
+    for expected in (2, 1, 1):
+        limiter.acquire()
+        limiter.release(rate_limited=True)
+        assert limiter.limit == expected
+
+    # 현재 허용 수만큼 연속으로 성공해야 하나씩 늘어나고 최대치를 넘지 않음
+    for expected in (2, 2, 3, 3, 3, 4, 4, 4, 4, 4):
+        limiter.acquire()
+        limiter.release()
+        assert limiter.limit == expected
+
+
+def test_limiter_blocks_above_limit():
+    limiter = AdaptiveLimiter(2)
+    limiter.acquire()
+    limiter.release(rate_limited=True)  # 허용 수 1
+    limiter.acquire()
+
+    acquired = threading.Event()
+
+    def worker():
+        limiter.acquire()
+        acquired.set()
+        limiter.release()
+
+    thread = threading.Thread(target=worker)
+    thread.start()
+    assert not acquired.wait(0.1)
+    limiter.release()
+    assert acquired.wait(5)
+    thread.join()
+
+
+def test_pipeline_retries_rate_limits(tmp_path):
+    texts = {f"id{i}": f"text {i}" for i in range(20)}
+    embeddings = FakeEmbeddings(dimension=8, error_rate=0.5, seed=1)
+    pipeline = EmbeddingPipeline(embeddings, 'fake', batch_size=3, max_workers=1, max_retries=20,
+                                 checkpoint_path=str(tmp_path / 'checkpoint.jsonl'), initial_backoff=0.0)
+
+    vectors = pipeline.embed(texts)
+
+    assert pipeline.stats['retries'] > 0
+    assert pipeline.stats['embedded'] == len(texts)
+    assert vectors == {chunk_id: FakeEmbeddings(dimension=8).embed_query(text) for chunk_id, text in texts.items()}
+
+
+def test_pipeline_raises_other_errors_without_retry(tmp_path):
+    pipeline = EmbeddingPipeline(FailingEmbeddings('text 0', dimension=8), 'fake', batch_size=2, max_workers=1,
+                                 checkpoint_path=str(tmp_path / 'checkpoint.jsonl'), initial_backoff=0.0)
+    with pytest.raises(RuntimeError):
+        pipeline.embed({'id0': 'text 0'})
+    assert pipeline.stats['retries'] == 0
+
+
+def test_checkpoint_resume(tmp_path):
+    checkpoint_path = str(tmp_path / 'checkpoint.jsonl')
+    texts = {f"id{i}": f"text {i}" for i in range(10)}
+
+    interrupted = EmbeddingPipeline(FailingEmbeddings('text 5', dimension=8), 'fake', batch_size=2, max_workers=1,
+                                    checkpoint_path=checkpoint_path)
+    with pytest.raises(RuntimeError):
+        interrupted.embed(texts)
+
+    embeddings = FakeEmbeddings(dimension=8)
+    resumed = EmbeddingPipeline(embeddings, 'fake', batch_size=2, max_workers=1, checkpoint_path=checkpoint_path)
+    vectors = resumed.embed(texts)
+
+    # 실패 전에 끝난 배치는 이어서 쓰고, 실패한 배치(id4, id5)와 취소된 배치만 다시 임베딩
+    # (실패 시점에 이미 시작한 다음 배치는 체크포인트에 남을 수 있음)
+    assert resumed.stats['resumed'] >= 4
+    assert resumed.stats['resumed'] + resumed.stats['embedded'] == len(texts)
+    assert resumed.stats['embedded'] == 2 * embeddings.calls
+    assert set(resumed.load_checkpoint()) == set(texts)
+    assert vectors == {chunk_id: embeddings.embed_query(text) for chunk_id, text in texts.items()}
+
+    resumed.clear_checkpoint()
+    assert resumed.load_checkpoint() == {}
+
+
+def test_checkpoint_ignores_other_namespace(tmp_path):
+    checkpoint_path = str(tmp_path / 'checkpoint.jsonl')
+    texts = {f"id{i}": f"text {i}" for i in range(4)}
+    EmbeddingPipeline(FakeEmbeddings(dimension=8), 'old-model', checkpoint_path=checkpoint_path).embed(texts)
+
+    pipeline = EmbeddingPipeline(FakeEmbeddings(dimension=8), 'new-model', checkpoint_path=checkpoint_path)
+    pipeline.embed(texts)
+
+    assert pipeline.stats['resumed'] == 0
+    assert pipeline.stats['embedded'] == len(texts)
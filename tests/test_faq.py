@@ -0,0 +1,100 @@
+# FAQ 사전 계산 테스트
+# test_faq.py
+
+import pytest
+from modules import mmu_faq
+from modules.mmu_faq import FaqTable, FaqRunner
+from modules.mmu_response_generator import ResponseGenerator
+
+class FlakyChain:
+    """질문별로 정해진 횟수만큼 실패한 뒤 답변하는 체인"""
+
+    def __init__(self, failures):
+        self.failures = dict(failures)  # 질문 -> 남은 실패 횟수
+        self.calls = []
+
+    def invoke(self, inputs):
+        question = inputs['question']
+        self.calls.append(question)
+        if self.failures.get(question, 0) > 0:
+            self.failures[question] -= 1
+            raise RuntimeError("429 Resource has been exhausted")
+        return f"📌 답변 요약: {question}에 대한 답변"
+
+
+class StubVectorStore:
+    def __init__(self, index_version):
+        self.index_version = index_version
+
+
+@pytest.fixture(autouse=True)
+def no_retrieval(monkeypatch):
+    """검색 없이 빈 컨텍스트로 답변 생성 (체인만 실패를 흉내 냄)"""
+    monkeypatch.setattr(ResponseGenerator, 'prepare_question', staticmethod(
+        lambda question, vector_store, session=None, use_faq=True: {
+            'response': None, 'context': '', 'docs': [], 'department_info': None
+        }
+    ))
+
+
+@pytest.fixture
+def sleeps(monkeypatch):
+    """재시도 대기 시간 기록 (실제로 기다리지 않음)"""
+    delays = []
+    monkeypatch.setattr(mmu_faq.time, 'sleep', delays.append)
+    return delays
+
+
+def use_chain(monkeypatch, chain):
+    monkeypatch.setattr(ResponseGenerator, 'get_enhanced_rag_chain', staticmethod(lambda chat_model=None: chain))
+
+
+def test_answer_retries_with_exponential_backoff(sleeps):
+    chain = FlakyChain({"수강신청 언제 해요?": 2})
+    entry = FaqRunner.answer("수강신청 언제 해요?", StubVectorStore('v1'), chain, max_retries=3, backoff=0.5)
+
+    assert entry['response'] == "📌 답변 요약: 수강신청 언제 해요?에 대한 답변"
+    assert len(chain.calls) == 3
+    assert sleeps == [0.5, 1.0]
+
+
+def test_answer_raises_after_the_last_retry(sleeps):
+    chain = FlakyChain({"휴학 신청": 10})
+    with pytest.raises(RuntimeError):
+        FaqRunner.answer("휴학 신청", StubVectorStore('v1'), chain, max_retries=2, backoff=1.0)
+    assert len(chain.calls) == 3 and sleeps == [1.0, 2.0]
+
+
+def test_failed_questions_are_retried_on_the_next_run(tmp_path, monkeypatch, sleeps):
+    table = FaqTable(str(tmp_path / 'faq_table.json'))
+    questions = ["수강신청 언제 해요?", "휴학 신청", "재수강 기준"]
+    chain = FlakyChain({"휴학 신청": 2})
+    use_chain(monkeypatch, chain)
+
+    stats = FaqRunner.run(StubVectorStore('v1'), questions, table=table, workers=2, max_retries=1, backoff=0)
+    assert stats['answered'] == 2 and [failure['question'] for failure in stats['failed']] == ["휴학 신청"]
+    assert table.failed == ["휴학 신청"] and not table.is_fresh('v1')  # 실패가 남아 있으면 최신이 아님
+
+    chain.calls.clear()
+    stats = FaqRunner.run(StubVectorStore('v1'), questions, table=table, max_retries=1, backoff=0)
+    assert chain.calls == ["휴학 신청"]  # 같은 버전으로 답변한 질문은 재사용
+    assert stats['reused'] == 2 and stats['answered'] == 3 and not stats['failed']
+    assert table.is_fresh('v1')
+
+
+def test_index_version_change_invalidates_the_table(tmp_path, monkeypatch):
+    path = str(tmp_path / 'faq_table.json')
+    chain = FlakyChain({})
+    use_chain(monkeypatch, chain)
+    FaqRunner.run(StubVectorStore('v1'), ["수강신청 언제 해요?"], table=FaqTable(path), backoff=0)
+
+    table = FaqTable(path)  # 다른 프로세스에서 파일을 읽는 경우
+    assert table.get("수강신청 언제 해요", 'v1')['doc_ids'] == []
+    assert table.get("수강신청 언제 해요?", 'v2') is None
+    assert table.entries('v2') == {} and not table.is_fresh('v2')
+    assert table.stats == {'hits': 1, 'misses': 1}
+
+    chain.calls.clear()
+    stats = FaqRunner.run(StubVectorStore('v2'), ["수강신청 언제 해요?"], table=table, backoff=0)
+    assert chain.calls == ["수강신청 언제 해요?"] and stats['reused'] == 0  # 이전 버전의 답변은 재사용하지 않음
+    assert table.is_fresh('v2') and table.index_version == 'v2'
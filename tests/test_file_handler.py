@@ -0,0 +1,26 @@
+# 문서 수집 테스트
+# test_file_handler.py
+
+from modules.mmu_file_handler import DocumentProcessor
+from modules.mmu_metadata_index import MetadataIndex
+from conftest import DATA_DIR
+
+def test_serial_and_parallel_chunk_ids_match():
+    serial_index, parallel_index = MetadataIndex(), MetadataIndex()
+    serial = list(DocumentProcessor.iter_chunks(serial_index, DATA_DIR, workers=1))
+    parallel = list(DocumentProcessor.iter_chunks(parallel_index, DATA_DIR, workers=2))
+
+    assert serial
+    assert [doc.metadata for doc in serial] == [doc.metadata for doc in parallel]
+    assert [doc.page_content for doc in serial] == [doc.page_content for doc in parallel]
+    for doc in serial:
+        chunk_id = doc.metadata['chunk_id']
+        assert serial_index.lookup(chunk_id) == parallel_index.lookup(chunk_id)
+
+
+def test_parallel_chunking_keeps_file_order(corpus):
+    """작업 프로세스 수가 파일 수보다 적어도 청크가 파일 순서대로 나옴"""
+    serial = [doc.metadata['source'] for doc in DocumentProcessor.iter_chunks(data_dir=str(corpus), workers=1)]
+    parallel = [doc.metadata['source'] for doc in DocumentProcessor.iter_chunks(data_dir=str(corpus), workers=3)]
+    assert parallel == serial
+    assert serial == sorted(serial, key=lambda source: sorted(set(serial)).index(source))
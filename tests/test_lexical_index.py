@@ -0,0 +1,127 @@
+# 어휘 검색 테스트
+# test_lexical_index.py
+
+import pytest
+from langchain_core.documents.base import Document
+from modules.mmu_lexical_index import LexicalIndex, reciprocal_rank_fusion
+from modules.mmu_config import LEXICAL_FAST_PATH_MARGIN
+from modules.mmu_answer_cache import AnswerCache
+from modules.mmu_response_generator import ResponseGenerator
+from modules.mmu_fakes import FakeEmbeddings
+
+TEXTS = {
+    'retake': "재수강한 교과목의 성적은 A0를 초과할 수 없다.",
+    'register': "수강신청은 매 학기 2월과 8월에 한다.",
+    'summer': "계절학기는 6학점까지 수강할 수 있다.",
+    'exam': "학기말시험은 수업일수의 3/4 이상 출석해야 응시할 수 있다."
+}
+
+def make_documents():
+    return {chunk_id: Document(page_content=text, metadata={'chunk_id': chunk_id, 'source': chunk_id})
+            for chunk_id, text in TEXTS.items()}
+
+
+class Docstore:
+    def __init__(self, documents):
+        self.documents = documents
+
+    def search(self, chunk_id):
+        return self.documents.get(chunk_id, f"ID {chunk_id} not found.")
+
+
+class StubVectorStore:
+    """어휘 색인과 가짜 임베딩을 가진 벡터 저장소 (벡터 검색은 호출 기록만 남기고 고정 순서로 반환)"""
+
+    def __init__(self):
+        documents = make_documents()
+        self.index_version = 'v1'
+        self.embedding_function = FakeEmbeddings(dimension=8)
+        self.lexical_index = LexicalIndex.build(documents)
+        self.metadata_index = None
+        self.docstore = Docstore(documents)
+        self.vector_searches = 0
+        self._dense = [documents['exam'], documents['summer'], documents['register'], documents['retake']]
+
+    def similarity_search_by_vector(self, embedding, k=4):
+        self.vector_searches += 1
+        return self._dense[:k]
+
+
+@pytest.fixture(autouse=True)
+def fresh_answer_cache(monkeypatch):
+    monkeypatch.setattr(ResponseGenerator, 'answer_cache', AnswerCache())
+
+
+def test_tokenize_keeps_short_and_long_words():
+    assert LexicalIndex.tokenize("A0를 재수강!") == ['a0', '0를', 'a0를', '재수', '수강', '재수강']
+    assert LexicalIndex.tokenize("A0를초과")[0] == 'a0를초과'  # n-gram 범위보다 긴 단어는 단어 자체도 포함
+
+
+def test_bm25_ranks_rare_exact_terms_first():
+    index = LexicalIndex.build(make_documents())
+    hits = index.search("재수강 성적", 4)
+
+    assert hits[0][0] == 'retake'
+    assert [score for _, score, _ in hits] == sorted((score for _, score, _ in hits), reverse=True)
+    assert all(score > 0 for _, score, _ in hits)
+    assert hits[0][2] == 1.0  # 질의 n-gram을 모두 포함
+    assert index.search("졸업요건", 4) == []  # 말뭉치에 없는 질의
+
+
+def test_coverage_counts_terms_missing_from_the_corpus():
+    index = LexicalIndex.build(make_documents())
+    _, _, coverage = index.search("재수강 졸업", 1)[0]
+    # 질의 n-gram 4개(재수, 수강, 재수강, 졸업) 중 말뭉치에 있는 3개만 포함
+    assert coverage == pytest.approx(3 / 4)
+
+
+def test_save_and_load_round_trip(tmp_path):
+    index = LexicalIndex.build(make_documents())
+    index.save(str(tmp_path))
+    loaded = LexicalIndex.load(str(tmp_path))
+    assert loaded.search("계절학기 학점", 4) == index.search("계절학기 학점", 4)
+    assert LexicalIndex.load(str(tmp_path / 'missing')) is None
+
+
+def test_reciprocal_rank_fusion_rewards_agreement():
+    fused = reciprocal_rank_fusion([['a', 'b', 'c'], ['b', 'd', 'a']], k=60)
+    assert fused == ['b', 'a', 'd', 'c']  # 두 목록에 모두 있는 항목이 앞서고, 한 목록에만 있으면 순위 순
+
+
+def test_confident_lexical_match_skips_the_embedding_call():
+    store = StubVectorStore()
+    lexical_ids, confident = ResponseGenerator.search_lexical("재수강 성적", store)
+    assert confident and lexical_ids[0] == 'retake'
+
+    prepared = ResponseGenerator.prepare_question("재수강 성적", store, use_faq=False)
+
+    assert store.embedding_function.calls == 0
+    assert store.vector_searches == 0
+    assert prepared['embedding'] is None
+    assert prepared['docs'][0].metadata['chunk_id'] == 'retake'
+
+
+def test_low_coverage_query_falls_back_to_hybrid_search():
+    store = StubVectorStore()
+    _, confident = ResponseGenerator.search_lexical("재수강 졸업 요건", store)
+    assert not confident
+
+    prepared = ResponseGenerator.prepare_question("재수강 졸업 요건", store, use_faq=False)
+
+    assert store.embedding_function.calls == 1
+    assert store.vector_searches == 1
+    assert prepared['embedding'] is not None
+    chunk_ids = [doc.metadata['chunk_id'] for doc in prepared['docs']]
+    assert set(chunk_ids) == set(TEXTS)  # 벡터 결과와 어휘 결과를 RRF로 합침
+    assert chunk_ids.index('retake') < chunk_ids.index('register')  # 어휘 1위가 벡터 순위만 따를 때보다 앞으로
+
+
+def test_close_scores_fall_back_to_hybrid_search():
+    store = StubVectorStore()
+    hits = store.lexical_index.search("수강", 4)
+    assert hits[0][2] == 1.0 and hits[0][1] < LEXICAL_FAST_PATH_MARGIN * hits[1][1]  # 모두 포함하지만 2위와 점수 차가 작음
+
+    _, confident = ResponseGenerator.search_lexical("수강", store)
+    assert not confident
+    ResponseGenerator.prepare_question("수강", store, use_faq=False)
+    assert store.embedding_function.calls == 1
@@ -0,0 +1,105 @@
+# 성능 지표 테스트
+# test_metrics.py
+
+import re
+import json
+import urllib.request
+import pytest
+from modules.mmu_metrics import Metrics, QUANTILES
+
+SAMPLE_PATTERN = re.compile(r'^(\w+)\{(.*)\} (\S+)$')
+LABEL_PATTERN = re.compile(r'(\w+)="([^"]*)"')
+
+def parse_prometheus(text):
+    """Prometheus 텍스트 형식을 {(지표 이름, 레이블 튜플): 값}과 {지표 이름: 형식}으로 변환"""
+    samples, types = {}, {}
+    for line in text.splitlines():
+        if line.startswith('# TYPE '):
+            _, _, name, kind = line.split(' ')
+            types[name] = kind
+        elif line and not line.startswith('#'):
+            match = SAMPLE_PATTERN.match(line)
+            assert match, f"잘못된 표본 줄: {line!r}"
+            name, labels, value = match.groups()
+            samples[(name, tuple(sorted(LABEL_PATTERN.findall(labels))))] = float(value)
+    return samples, types
+
+
+@pytest.fixture
+def recorded():
+    metrics = Metrics(window=10)
+    for i in range(100):
+        metrics.record_duration('retrieval', i / 1000)
+    metrics.observe('prompt_chars', 1200)
+    metrics.observe('prompt_chars', 1800)
+    metrics.increment('answer_cache_hits', 3)
+    metrics.register_gauge('hit_rate', lambda: 0.25)
+    metrics.register_gauge('not_ready', lambda: None.hit_rate())  # 아직 초기화되지 않은 대상
+    return metrics
+
+
+def test_quantiles_use_the_recent_window(recorded):
+    stage = recorded.snapshot()['stages']['retrieval']
+    assert stage['count'] == 100  # 누적 횟수와 합계는 전체 관측 기준
+    assert stage['sum'] == pytest.approx(sum(i / 1000 for i in range(100)))
+    assert stage['quantiles'][0.5] == pytest.approx(0.0945)  # 최근 10개(0.090~0.099)의 중앙값
+    assert stage['quantiles'][0.99] <= 0.099
+
+
+def test_span_records_duration():
+    metrics = Metrics()
+    with pytest.raises(ValueError):
+        with metrics.span('llm'):
+            raise ValueError()
+    assert metrics.snapshot()['stages']['llm']['count'] == 1  # 예외가 나도 기록
+
+
+def test_prometheus_round_trip(recorded):
+    snapshot = recorded.snapshot()
+    samples, types = parse_prometheus(recorded.to_prometheus())
+
+    assert types == {
+        'mmu_stage_duration_seconds': 'summary', 'mmu_observed_value': 'summary',
+        'mmu_events_total': 'counter', 'mmu_gauge': 'gauge'
+    }
+    for q in QUANTILES:
+        assert samples[('mmu_stage_duration_seconds', (('quantile', str(q)), ('stage', 'retrieval')))] == pytest.approx(
+            snapshot['stages']['retrieval']['quantiles'][q], abs=1e-6)
+    assert samples[('mmu_stage_duration_seconds_count', (('stage', 'retrieval'),))] == 100
+    assert samples[('mmu_observed_value_sum', (('name', 'prompt_chars'),))] == 3000
+    assert samples[('mmu_events_total', (('name', 'answer_cache_hits'),))] == 3
+    assert samples[('mmu_gauge', (('name', 'hit_rate'),))] == 0.25
+    assert not any(labels == (('name', 'not_ready'),) for _, labels in samples)
+
+
+def test_otel_json_round_trip(recorded):
+    snapshot = recorded.snapshot()
+    exported = json.loads(json.dumps(recorded.to_otel_json(service_name="test")))
+    resource = exported['resourceMetrics'][0]
+    assert resource['resource']['attributes'] == [{'key': 'service.name', 'value': {'stringValue': "test"}}]
+    metrics = {metric['name']: metric for metric in resource['scopeMetrics'][0]['metrics']}
+
+    point, = metrics['mmu.stage.duration']['summary']['dataPoints']
+    assert point['attributes'][0]['value']['stringValue'] == 'retrieval'
+    assert int(point['count']) == 100
+    assert {item['quantile']: item['value'] for item in point['quantileValues']} == snapshot['stages']['retrieval']['quantiles']
+    events = metrics['mmu.events']['sum']
+    assert events['isMonotonic'] and events['aggregationTemporality'] == 2
+    assert [(p['attributes'][0]['value']['stringValue'], p['asDouble']) for p in events['dataPoints']] == [('answer_cache_hits', 3)]
+    assert [p['asDouble'] for p in metrics['mmu.gauge']['gauge']['dataPoints']] == [0.25]
+
+
+def test_http_server_binds_loopback_and_serves_both_formats(recorded):
+    server = recorded.start_http_server(0)
+    try:
+        host, port = server.server_address[:2]
+        assert host == '127.0.0.1'
+        assert recorded.start_http_server(0) is server  # 프로세스당 한 번
+        with urllib.request.urlopen(f"http://127.0.0.1:{port}/metrics") as response:
+            assert parse_prometheus(response.read().decode('utf-8'))[0] == parse_prometheus(recorded.to_prometheus())[0]
+        with urllib.request.urlopen(f"http://127.0.0.1:{port}/metrics.json") as response:
+            assert response.headers['Content-Type'] == 'application/json'
+            assert 'resourceMetrics' in json.load(response)
+    finally:
+        server.shutdown()
+        server.server_close()
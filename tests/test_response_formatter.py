@@ -0,0 +1,84 @@
+# 응답 형식화 테스트
+# test_response_formatter.py
+
+import random
+from modules.mmu_response_formatter import ResponseFormatter, StreamingResponseFormatter
+
+SECTION_MARKERS = ['📌', '📋', '📚', '💡']
+
+def reference_format(response):
+    """스트리밍 포매터 도입 전의 섹션 단위 포매팅 (비교 기준)"""
+    sections, current = [], []
+    for line in response.split('\n'):
+        line = line.strip()
+        if not line:
+            continue
+        if any(line.startswith(marker) for marker in SECTION_MARKERS):
+            if current:
+                sections.append('\n'.join(current))
+                current = []
+            current.append(line)
+            if not line.endswith(':'):
+                current.append('')
+            continue
+        if line.startswith('•'):
+            for point in line.split('•')[1:]:
+                if point.strip():
+                    current.append(f"  • {point.strip()}")
+                    current.append('')
+            continue
+        current.append(line)
+    if current:
+        sections.append('\n'.join(current))
+
+    cleaned, prev_empty = [], False
+    for line in '\n\n'.join(sections).split('\n'):
+        if line.strip():
+            cleaned.append(line)
+            prev_empty = False
+        elif not prev_empty:
+            cleaned.append(line)
+            prev_empty = True
+    return '\n'.join(cleaned)
+
+
+def random_response(rng):
+    """섹션 표시, 제목(:), 한 줄 여러 불릿, 빈 줄, 공백이 섞인 임의의 응답"""
+    pieces = SECTION_MARKERS + ['•', ' • ', ':', '\n', '\n\n', '  ', '\t', '수강신청', '학점', '2월 ', '가능합니다.', '•  ']
+    return ''.join(rng.choice(pieces) for _ in range(rng.randint(0, 40)))
+
+
+def random_chunks(rng, text):
+    """text를 임의의 위치에서 자른 조각 목록 (빈 조각 포함)"""
+    cuts = sorted(rng.randint(0, len(text)) for _ in range(rng.randint(0, 8)))
+    return [text[start:end] for start, end in zip([0] + cuts, cuts + [len(text)])]
+
+
+def test_streamed_output_matches_one_shot_output():
+    rng = random.Random(0)
+    for _ in range(5000):
+        response = random_response(rng)
+        formatter = StreamingResponseFormatter()
+        confirmed = ''
+        for chunk in random_chunks(rng, response):
+            shown = formatter.feed(chunk)
+            assert shown.startswith(formatter.formatted)
+            assert formatter.formatted.startswith(confirmed)  # 확정된 접두부는 이후 조각이 와도 바뀌지 않음
+            confirmed = formatter.formatted
+        result = formatter.finish()
+
+        assert formatter.raw_text == response
+        assert result == ResponseFormatter.format_response(response) == reference_format(response)
+
+
+def test_example_answer():
+    response = ("📌 답변 요약: 수강신청은 2월에 합니다.\n📋 상세 내용:\n• 1차 신청 • 2차 신청\n\n\n"
+                "일반 줄\n💡 추가 안내: 담당부서에 문의하세요.")
+    assert ResponseFormatter.format_response(response) == (
+        "📌 답변 요약: 수강신청은 2월에 합니다.\n\n"
+        "📋 상세 내용:\n"
+        "  • 1차 신청\n\n"
+        "  • 2차 신청\n\n"
+        "일반 줄\n\n"
+        "💡 추가 안내: 담당부서에 문의하세요.\n"
+    )
@@ -0,0 +1,55 @@
+# 카테고리 샤드 라우터 테스트
+# test_shard_router.py
+
+import pytest
+from modules.mmu_shard_router import ShardRouter
+
+KEYWORDS = {'성적': ('학점', '재수강'), '수업': ('휴강', '보강'), '시험': ('중간고사', '기말고사')}
+CENTROIDS = {'성적': [1.0, 0.0, 0.0], '수업': [0.0, 1.0, 0.0], '시험': [0.0, 0.0, 1.0]}
+
+def make_router(centroids=CENTROIDS, **kwargs):
+    return ShardRouter(['성적', '수업', '시험'], centroids, keywords=KEYWORDS, **kwargs)
+
+
+def test_keyword_hits_pick_the_best_categories():
+    router = make_router(max_shards=2, min_hits=2)
+    assert router.route("재수강하면 성적이 몇 학점까지 나오나요?") == ['성적']
+    # 성적 3개, 수업 2개 일치 (시험은 일치 없음)
+    assert router.route("휴강한 수업의 성적과 재수강 학점") == ['성적', '수업']
+
+
+def test_keyword_ties_are_broken_by_centroid_similarity():
+    router = make_router(max_shards=1, min_hits=2)
+    question = "재수강 학점과 휴강 보강"  # 성적, 수업 모두 2개 일치
+    assert router.route(question, embedding=[0.0, 1.0, 0.0]) is None  # max_shards를 넘는 동률은 전체 검색
+    assert make_router(max_shards=2, min_hits=2).route(question, embedding=[0.0, 1.0, 0.0]) == ['수업', '성적']
+
+
+def test_weak_keyword_evidence_searches_all_shards():
+    router = make_router(min_hits=2)
+    assert router.route("학점 알려주세요") is None  # 키워드 하나만 일치
+    assert router.route("학점 알려주세요", embedding=[1.0, 0.0, 0.0]) is None  # 키워드가 맞으면 중심점으로 넘어가지 않음
+    assert make_router(min_hits=1).route("학점 알려주세요") == ['성적']
+
+
+def test_no_keywords_and_no_embedding_searches_all_shards():
+    assert make_router().route("졸업 요건이 뭔가요?") is None
+    assert make_router(centroids=None).route("졸업 요건이 뭔가요?", embedding=[1.0, 0.0, 0.0]) is None
+
+
+def test_centroid_routing_includes_shards_within_the_margin():
+    router = make_router(margin=0.05, max_shards=2)
+    assert router.route("졸업 요건", embedding=[1.0, 0.2, 0.0]) == ['성적']
+
+    close = [1.0, 0.97, 0.0]  # 성적과 수업의 유사도 차이가 0.05 이하
+    similarities = router.similarities(close)
+    assert similarities['성적'] - similarities['수업'] == pytest.approx(0.03 / (1.0 ** 2 + 0.97 ** 2) ** 0.5, abs=1e-6)
+    assert router.route("졸업 요건", embedding=close) == ['성적', '수업']
+
+    assert router.route("졸업 요건", embedding=[1.0, 1.0, 1.0]) is None  # 세 샤드가 모두 비슷하면 전체 검색
+    assert make_router(margin=0.05, max_shards=3).route("졸업 요건", embedding=[1.0, 1.0, 1.0]) is not None
+
+
+def test_compute_centroid_is_the_normalized_mean_direction():
+    centroid = ShardRouter.compute_centroid([[2.0, 0.0], [0.0, 5.0]])
+    assert centroid.tolist() == pytest.approx([2 ** -0.5, 2 ** -0.5])
@@ -0,0 +1,89 @@
+# 공유 벡터 저장소 테스트
+# test_shared_vector_store.py
+
+import gc
+import threading
+import pytest
+from modules.mmu_vector_store import SharedVectorStore
+
+class StubStore:
+    """검색 결과 대신 자신의 버전을 돌려주는 벡터 저장소"""
+
+    def __init__(self, index_version):
+        self.index_version = index_version
+
+    def similarity_search_by_vector(self, embedding, k=4):
+        return [self.index_version] * k
+
+
+@pytest.fixture(autouse=True)
+def reset_shared_store():
+    """테스트마다 프로세스 전역 상태를 비움"""
+    yield
+    gc.collect()
+    SharedVectorStore._pending_releases.clear()
+    SharedVectorStore._shared_store = None
+    SharedVectorStore._ref_count = 0
+    SharedVectorStore._retired = []
+
+
+def test_last_release_frees_the_store():
+    first = SharedVectorStore.acquire(lambda: StubStore('v1'))
+    second = SharedVectorStore.acquire(lambda: pytest.fail("이미 로딩된 저장소를 다시 로딩함"))
+    assert SharedVectorStore.ref_count() == 2
+
+    first.release()
+    first.release()  # 두 번째 해제는 무시
+    assert SharedVectorStore.ref_count() == 1 and SharedVectorStore.is_ready()
+
+    del second
+    gc.collect()
+    assert SharedVectorStore.ref_count() == 0
+    assert not SharedVectorStore.is_ready()
+
+
+def test_gc_release_while_lock_is_held_does_not_deadlock():
+    keep = SharedVectorStore.acquire(lambda: StubStore('v1'))
+    handle = SharedVectorStore.acquire(lambda: StubStore('v1'))
+    handle.cycle = handle  # 순환 참조라 GC가 돌 때에만 정리됨
+    gc.disable()
+    try:
+        del handle
+
+        def collect_under_lock():
+            with SharedVectorStore._lock:
+                gc.collect()  # 같은 스레드가 잡은 잠금 안에서 finalizer 실행
+
+        thread = threading.Thread(target=collect_under_lock, daemon=True)
+        thread.start()
+        thread.join(5)
+        assert not thread.is_alive(), "finalizer가 잠금을 기다리며 멈춤"
+    finally:
+        gc.enable()
+
+    assert SharedVectorStore.ref_count() == 1  # 미뤄 둔 해제가 반영됨
+    assert SharedVectorStore.is_ready()
+    keep.release()
+    assert SharedVectorStore.ref_count() == 0
+
+
+def test_gc_release_during_loading_keeps_the_new_store():
+    """loader 실행 중(잠금 보유) GC가 마지막 이전 핸들을 정리해도 새로 얻은 핸들의 저장소는 유지됨"""
+    old = SharedVectorStore.acquire(lambda: StubStore('v1'))
+    old.cycle = old
+    SharedVectorStore.swap(StubStore('v2'))
+    gc.disable()
+    try:
+        del old
+        with SharedVectorStore._locked():
+            gc.collect()
+            assert SharedVectorStore._ref_count == 1  # 잠금 안에서는 아직 반영되지 않음
+            SharedVectorStore._ref_count += 1
+            handle = SharedVectorStore()
+    finally:
+        gc.enable()
+
+    assert SharedVectorStore.ref_count() == 1
+    assert SharedVectorStore.current_version() == 'v2'
+    handle.release()
+    assert not SharedVectorStore.is_ready()
@@ -0,0 +1,101 @@
+# 동일 질문 요청 병합 테스트
+# test_single_flight.py
+
+import asyncio
+import threading
+import pytest
+from modules.mmu_single_flight import SingleFlight
+
+def test_followers_share_the_leader_stream():
+    registry = SingleFlight()
+    leader, is_leader = registry.join("수강신청 기간")
+    assert is_leader
+
+    results = []
+    started = threading.Barrier(4)
+
+    def follow():
+        flight, is_leader = registry.join("수강신청 기간")
+        started.wait()
+        results.append((flight, is_leader, list(flight.subscribe())))
+
+    threads = [threading.Thread(target=follow) for _ in range(3)]
+    for thread in threads:
+        thread.start()
+    started.wait()  # 구독자가 모두 합류한 뒤 생성
+    for chunk in ("수강신청은 ", "2월에 ", "합니다."):
+        leader.publish(chunk)
+    leader.finish({'response': "수강신청은 2월에 합니다."})
+    for thread in threads:
+        thread.join(5)
+
+    assert [(flight, is_leader) for flight, is_leader, _ in results] == [(leader, False)] * 3
+    assert all(chunks == ["수강신청은 ", "2월에 ", "합니다."] for _, _, chunks in results)
+    assert registry.stats == {'leaders': 1, 'followers': 3}
+    assert leader.wait(1) == {'response': "수강신청은 2월에 합니다."}
+
+
+def test_late_subscriber_replays_from_start():
+    registry = SingleFlight()
+    leader, _ = registry.join("q")
+    leader.publish("a")
+    follower, is_leader = registry.join("q")
+    leader.publish("b")
+    leader.finish()
+
+    assert not is_leader
+    assert list(follower.subscribe()) == ["a", "b"]
+
+
+def test_forget_and_disabled_start_new_flights():
+    registry = SingleFlight()
+    first, _ = registry.join("q")
+    registry.forget(first)
+    second, is_leader = registry.join("q")
+    assert is_leader and second is not first
+    assert len(registry) == 1
+
+    disabled = SingleFlight(enabled=False)
+    assert disabled.join("q")[1] and disabled.join("q")[1]
+    assert len(disabled) == 0
+
+
+def test_failure_reaches_every_subscriber():
+    registry = SingleFlight()
+    leader, _ = registry.join("q")
+    follower, _ = registry.join("q")
+    leader.publish("부분 ")
+    leader.fail(RuntimeError("llm down"))
+
+    received = []
+    with pytest.raises(RuntimeError):
+        for chunk in follower.subscribe():
+            received.append(chunk)
+    assert received == ["부분 "]
+    with pytest.raises(RuntimeError):
+        follower.wait(1)
+
+
+def test_async_subscriber():
+    registry = SingleFlight()
+    leader, _ = registry.join("q")
+
+    async def consume():
+        follower, _ = registry.join("q")
+        return [chunk async for chunk in follower.asubscribe()]
+
+    def produce():
+        for chunk in ("가", "나", "다"):
+            leader.publish(chunk)
+        leader.finish()
+
+    async def main():
+        task = asyncio.create_task(consume())
+        await asyncio.sleep(0)  # 구독자가 대기하기 시작한 뒤 다른 스레드에서 생성
+        thread = threading.Thread(target=produce)
+        thread.start()
+        chunks = await asyncio.wait_for(task, 5)
+        thread.join()
+        return chunks
+
+    assert asyncio.run(main()) == ["가", "나", "다"]
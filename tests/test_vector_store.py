@@ -0,0 +1,76 @@
+# 증분 인덱스 재구성 테스트
+# test_vector_store.py
+
+import pytest
+from modules.mmu_file_handler import DocumentProcessor
+from modules.mmu_vector_store import VectorStoreManager
+from modules.mmu_fakes import FakeEmbeddings
+
+class RecordingEmbeddings(FakeEmbeddings):
+    """임베딩한 문서 텍스트를 기록하는 가짜 임베딩"""
+
+    def __init__(self, **kwargs):
+        super().__init__(**kwargs)
+        self.texts = []
+
+    def embed_documents(self, texts):
+        self.texts.extend(texts)
+        return super().embed_documents(texts)
+
+
+@pytest.fixture
+def build(corpus, tmp_path, monkeypatch):
+    """corpus로 인덱스를 구성하고 (벡터 저장소, 이번 구성에서 임베딩한 텍스트) 반환"""
+    monkeypatch.chdir(tmp_path)  # 임베딩 체크포인트(.cache)를 임시 디렉터리에 둠
+    index_dir = str(tmp_path / 'index')
+
+    def build():
+        embeddings = RecordingEmbeddings(dimension=16)
+        documents = DocumentProcessor.iter_chunks(data_dir=str(corpus), workers=1)
+        vector_store = VectorStoreManager.create_vector_store(
+            documents, embeddings=embeddings, on_error=pytest.fail, index_dir=index_dir, sharded=False, lexical=False
+        )
+        return vector_store, embeddings.texts
+
+    return build
+
+
+def test_unchanged_corpus_reuses_index(build, tmp_path):
+    first, embedded = build()
+    manifest = VectorStoreManager.load_manifest(str(tmp_path / 'index'))
+    assert len(embedded) == len(manifest['chunks']) == first.index.ntotal
+
+    second, embedded = build()
+    assert embedded == []
+    assert second.index_version == first.index_version == manifest['version']
+
+
+def test_changed_file_embeds_only_new_chunks(build, corpus, tmp_path):
+    first, _ = build()
+    chunks_before = set(VectorStoreManager.load_manifest(str(tmp_path / 'index'))['chunks'])
+
+    with open(corpus / '수업.txt', 'a', encoding='utf-8') as file:
+        file.write("\n\n휴강 안내\n휴강한 수업은 학기 중에 보강한다.")
+
+    second, embedded = build()
+    chunks_after = set(VectorStoreManager.load_manifest(str(tmp_path / 'index'))['chunks'])
+
+    assert embedded == ["휴강한 수업은 학기 중에 보강한다."]
+    assert chunks_before < chunks_after and len(chunks_after - chunks_before) == 1
+    assert second.index.ntotal == len(chunks_after)
+    assert second.index_version != first.index_version
+
+    docs = second.similarity_search_by_vector(FakeEmbeddings(dimension=16).embed_query(embedded[0]), k=1)
+    assert docs[0].page_content == embedded[0]
+
+
+def test_removed_file_deletes_its_chunks(build, corpus, tmp_path):
+    build()
+    (corpus / '시험.txt').unlink()
+
+    vector_store, embedded = build()
+    manifest = VectorStoreManager.load_manifest(str(tmp_path / 'index'))
+
+    assert embedded == []
+    assert vector_store.index.ntotal == len(manifest['chunks'])
+    assert all(doc.metadata['category'] != '시험' for doc in vector_store.docstore._dict.values())